@@ -78,7 +78,10 @@ def obtener_ambulancia(id_ambulancia: int = Path(..., gt=0, description="ID de l
     "/{id_ambulancia}",
     response_model=Ambulancia,
     summary="Actualizar ambulancia",
-    description="Actualiza una ambulancia existente.",
+    description=(
+        "Actualiza una ambulancia existente. `disponibilidad=false` la deja fuera de servicio; "
+        "`true` la devuelve al servicio (queda disponible solo si está conectada y no despachada)."
+    ),
 )
 def actualizar_ambulancia(
     id_ambulancia: int = Path(..., gt=0, description="ID de la ambulancia"), 
@@ -89,6 +92,8 @@ def actualizar_ambulancia(
         if ambulancia is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ambulancia no encontrada o conflicto de datos")
         return ambulancia
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     except Exception as e:
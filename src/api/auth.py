@@ -4,9 +4,11 @@ Endpoints de autenticación.
 Este módulo proporciona endpoints para:
 1. Login con credenciales (email/nombreDeUsuario + contraseña)
 2. Verificación de token JWT
+3. Cierre de sesión (revocación del token)
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from src.security.entities.LoginRequest import (
     LoginRequest,
     TokenRequest,
@@ -17,8 +19,10 @@ from src.security.components.servicioAutenticacion import (
     autenticar_usuario,
     generar_token,
     verificar_token,
+    revocar_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from src.api.security import bearer_scheme
 
 auth_router = APIRouter(
     prefix="/auth",
@@ -37,7 +41,7 @@ async def login(login_request: LoginRequest):
         TokenResponse: Token JWT y metadatos
     """
     # Autenticar usuario
-    usuario = autenticar_usuario(
+    usuario = await autenticar_usuario(
         login_request.identificador,
         login_request.contrasena
     )
@@ -90,3 +94,11 @@ async def verify_token(token_request: TokenRequest):
         mensaje="Token válido"
     )
 
+
+@auth_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    """
+    Endpoint para cerrar sesión: el token presentado deja de ser válido.
+    """
+    revocar_token(credentials.credentials)
+    return None
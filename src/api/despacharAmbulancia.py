@@ -2,11 +2,14 @@
 Router para despachar ambulancias y emitir órdenes de despacho.
 """
 
+import logging
 from fastapi import APIRouter, Body, HTTPException, status
 from pydantic import BaseModel, Field
 from src.businessLayer.businessEntities.ordenDespacho import OrdenDespacho
 from src.businessLayer.businessWorkflow.emitirOrdenDespacho import EmitirOrdenDespacho
 
+logger = logging.getLogger(__name__)
+
 despachar_ambulancia_router = APIRouter(
     prefix="/despachar-ambulancia",
     tags=["despachar-ambulancia"],
@@ -38,11 +41,13 @@ async def despachar_ambulancia(
     Despacha una ambulancia para una emergencia.
     """
     try:
-        print(f"[DEBUG] [DESPACHO] Recibida solicitud de despacho:")
-        print(f"[DEBUG] [DESPACHO]   - emergencia_id: {despacho_data.emergencia_id}")
-        print(f"[DEBUG] [DESPACHO]   - ambulancia_id: {despacho_data.ambulancia_id}")
-        print(f"[DEBUG] [DESPACHO]   - operador_ambulancia_id: {despacho_data.operador_ambulancia_id}")
-        print(f"[DEBUG] [DESPACHO]   - operador_emergencia_id: {despacho_data.operador_emergencia_id}")
+        logger.debug(
+            "Solicitud de despacho: emergencia_id=%s, ambulancia_id=%s, operador_ambulancia_id=%s, operador_emergencia_id=%s",
+            despacho_data.emergencia_id,
+            despacho_data.ambulancia_id,
+            despacho_data.operador_ambulancia_id,
+            despacho_data.operador_emergencia_id
+        )
         
         orden_creada = await EmitirOrdenDespacho.emitir_orden_despacho(
             emergencia_id=despacho_data.emergencia_id,
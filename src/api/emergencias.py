@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Body, HTTPException, status, Query, Path
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Union
+from enum import Enum
 from src.businessLayer.businessEntities.emergencia import Emergencia
+from src.businessLayer.businessEntities.emergenciaResumen import EmergenciaResumen
 from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
 from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
 from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
+from src.businessLayer.businessEntities.puntoTrayectoria import PuntoTrayectoria
 from src.businessLayer.businessComponents.entidades.servicioEmergencia import ServicioEmergencia
+from src.businessLayer.businessWorkflow.obtenerTrayectoriaEmergencia import ObtenerTrayectoriaEmergencia
 emergencias_router = APIRouter(
     prefix="/emergencias",
     tags=["emergencias"],
@@ -25,12 +29,30 @@ class EmergenciaUpdate(BaseModel):
     solicitante_id: Optional[int] = Field(None, gt=0, description="ID del solicitante")
 
 
+class TrayectoriaAmbulancia(BaseModel):
+    """Recorrido de una ambulancia despachada a la emergencia."""
+    id_ambulancia: int
+    puntos: List[PuntoTrayectoria]
+
+
+class VistaEmergencia(str, Enum):
+    """Vista de los listados de emergencias."""
+    COMPLETA = "completa"  # Emergencia con solicitud, solicitante y ubicación anidados
+    RESUMEN = "resumen"    # Solo columnas propias: id, estado, prioridad, ids y fechas
+
+
+_DESCRIPCION_VISTA = (
+    "Vista de la respuesta: 'completa' (por defecto) retorna la emergencia con sus objetos anidados; "
+    "'resumen' retorna solo id, estado, tipo, prioridad, ids relacionados y fechas (consulta proyectada, más liviana)."
+)
+
+
 # ======== Endpoints CRUD ========
 # IMPORTANTE: Las rutas específicas deben ir ANTES de las rutas con parámetros dinámicos
 
 @emergencias_router.get(
     "/por-estado/{estado}",
-    response_model=List[Emergencia],
+    response_model=Union[List[EmergenciaResumen], List[Emergencia]],
     summary="Listar emergencias por estado",
     description="Lista emergencias filtradas por estado.",
 )
@@ -38,11 +60,14 @@ def listar_emergencias_por_estado(
     estado: EstadoEmergencia = Path(..., description="Estado de la emergencia"),
     limit: int = Query(50, ge=1, le=100, description="Número máximo de resultados"),
     offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    vista: VistaEmergencia = Query(VistaEmergencia.COMPLETA, description=_DESCRIPCION_VISTA),
 ):
     """
     Lista emergencias filtradas por estado.
     """
     try:
+        if vista == VistaEmergencia.RESUMEN:
+            return ServicioEmergencia.listar_resumen(limit=limit, offset=offset, estado=estado)
         return ServicioEmergencia.obtener_por_estado(estado, limit=limit, offset=offset)
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -52,7 +77,7 @@ def listar_emergencias_por_estado(
 
 @emergencias_router.get(
     "/por-operador/{id_operador}",
-    response_model=List[Emergencia],
+    response_model=Union[List[EmergenciaResumen], List[Emergencia]],
     summary="Listar emergencias por operador",
     description="Lista emergencias asignadas a un operador específico.",
 )
@@ -60,11 +85,14 @@ def listar_emergencias_por_operador(
     id_operador: int = Path(..., gt=0, description="ID del operador"),
     limit: int = Query(50, ge=1, le=100, description="Número máximo de resultados"),
     offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    vista: VistaEmergencia = Query(VistaEmergencia.COMPLETA, description=_DESCRIPCION_VISTA),
 ):
     """
     Lista emergencias asignadas a un operador específico.
     """
     try:
+        if vista == VistaEmergencia.RESUMEN:
+            return ServicioEmergencia.listar_resumen(limit=limit, offset=offset, id_operador=id_operador)
         return ServicioEmergencia.obtener_por_operador(id_operador, limit=limit, offset=offset)
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -74,7 +102,7 @@ def listar_emergencias_por_operador(
 
 @emergencias_router.get(
     "/por-solicitante/{id_solicitante}",
-    response_model=List[Emergencia],
+    response_model=Union[List[EmergenciaResumen], List[Emergencia]],
     summary="Listar emergencias por solicitante",
     description="Lista emergencias realizadas por un solicitante específico.",
 )
@@ -82,11 +110,14 @@ def listar_emergencias_por_solicitante(
     id_solicitante: int = Path(..., gt=0, description="ID del solicitante"),
     limit: int = Query(50, ge=1, le=100, description="Número máximo de resultados"),
     offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    vista: VistaEmergencia = Query(VistaEmergencia.COMPLETA, description=_DESCRIPCION_VISTA),
 ):
     """
     Lista emergencias realizadas por un solicitante específico.
     """
     try:
+        if vista == VistaEmergencia.RESUMEN:
+            return ServicioEmergencia.listar_resumen(limit=limit, offset=offset, id_solicitante=id_solicitante)
         return ServicioEmergencia.obtener_por_solicitante(id_solicitante, limit=limit, offset=offset)
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -121,18 +152,21 @@ def obtener_emergencia_por_solicitud(
 
 @emergencias_router.get(
     "",
-    response_model=List[Emergencia],
+    response_model=Union[List[EmergenciaResumen], List[Emergencia]],
     summary="Listar emergencias",
     description="Lista todas las emergencias con paginación.",
 )
 def listar_emergencias(
     limit: int = Query(50, ge=1, le=100, description="Número máximo de resultados"),
     offset: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    vista: VistaEmergencia = Query(VistaEmergencia.COMPLETA, description=_DESCRIPCION_VISTA),
 ):
     """
     Lista emergencias con paginación.
     """
     try:
+        if vista == VistaEmergencia.RESUMEN:
+            return ServicioEmergencia.listar_resumen(limit=limit, offset=offset)
         return ServicioEmergencia.listar(limit=limit, offset=offset)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -163,6 +197,40 @@ def obtener_emergencia(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@emergencias_router.get(
+    "/{id_emergencia}/trayectoria",
+    response_model=List[TrayectoriaAmbulancia],
+    summary="Obtener trayectoria de la emergencia",
+    description=(
+        "Obtiene el recorrido (submuestreado) de cada ambulancia despachada a la emergencia. "
+        "Por defecto cubre desde la primera orden de despacho hasta el cierre de la emergencia "
+        "(o el momento actual si sigue abierta)."
+    ),
+)
+def obtener_trayectoria_emergencia(
+    id_emergencia: int = Path(..., gt=0, description="ID de la emergencia"),
+    desde: Optional[datetime] = Query(None, description="Inicio del rango (ISO 8601, UTC si no tiene zona)"),
+    hasta: Optional[datetime] = Query(None, description="Fin del rango (ISO 8601, UTC si no tiene zona)"),
+):
+    """
+    Obtiene la trayectoria de las ambulancias de una emergencia.
+    """
+    try:
+        trayectorias = ObtenerTrayectoriaEmergencia.obtener_trayectoria(id_emergencia, desde=desde, hasta=hasta)
+        if trayectorias is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Emergencia no encontrada")
+        return [
+            TrayectoriaAmbulancia(id_ambulancia=id_ambulancia, puntos=puntos)
+            for id_ambulancia, puntos in trayectorias.items()
+        ]
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @emergencias_router.put(
     "/{id_emergencia}",
     response_model=Emergencia,
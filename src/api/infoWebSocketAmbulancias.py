@@ -63,7 +63,7 @@ async def obtener_info_websocket_ambulancia(request: Request) -> WebSocketInfoAm
     # Eliminar trailing slash para evitar doble slash al concatenar
     base_url = base_url.rstrip('/')
 
-    websocket_url = f"{base_url}/ws/ambulancias/{{id_ambulancia}}"
+    websocket_url = f"{base_url}/ws/ambulancias/{{id_ambulancia}}?token={{token}}"
 
     # Nota: Por ahora no tenemos un manager de conexiones para ambulancias,
     # así que retornamos 0. Esto se puede mejorar en el futuro si se necesita
@@ -75,7 +75,7 @@ async def obtener_info_websocket_ambulancia(request: Request) -> WebSocketInfoAm
         conexiones_activas=conexiones_activas,
         descripcion=(
             "Endpoint WebSocket para enviar ubicaciones en tiempo real de ambulancias. "
-            "Al conectarse con su ID, la ambulancia se marca automáticamente como disponible. "
+            "Al conectarse con su ID y el token del operador asignado, la ambulancia se marca automáticamente como disponible. "
             "Debe enviar continuamente mensajes JSON con la ubicación. Al desconectar, "
             "la ambulancia se marca automáticamente como no disponible."
         ),
@@ -74,14 +74,14 @@ async def obtener_info_websocket_solicitante(request: Request) -> WebSocketInfoS
     base_url = base_url.rstrip('/')
     
     # La URL incluye el ID del solicitante como parámetro de ruta
-    websocket_url_template = f"{base_url}/ws/solicitantes/{{id_solicitante}}"
+    websocket_url_template = f"{base_url}/ws/solicitantes/{{id_solicitante}}?token={{token}}"
     
     return WebSocketInfoSolicitanteResponse(
         websocket_url=websocket_url_template,
         conexiones_activas=conexiones_activas,
         descripcion=(
             "Endpoint WebSocket para recibir notificaciones en tiempo real sobre el estado de tus solicitudes. "
-            "Al conectarse usando tu ID de solicitante, recibirás un mensaje de bienvenida y luego comenzarás a recibir "
+            "Al conectarse usando tu ID de solicitante y tu token de acceso, recibirás un mensaje de bienvenida y luego comenzarás a recibir "
             "notificaciones automáticas sobre: "
             "1) Cuando se crea tu solicitud (tipo: 'solicitud_creada'), "
             "2) Cuando un operador se asigna a tu solicitud (tipo: 'operador_asignado'), "
@@ -3,11 +3,16 @@ Endpoints para gestionar salas de LiveKit.
 Proporciona endpoints para listar y obtener información de salas activas.
 """
 
-from fastapi import APIRouter, HTTPException, status, Body
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Body, Request, Header
+from typing import List, Optional
 from pydantic import BaseModel, Field
-from src.businessLayer.businessComponents.llamadas.listarSalas import listar_salas_activas
-from src.businessLayer.businessComponents.llamadas.configLiveKit import get_room_service, LIVEKIT_URL
+from src.businessLayer.businessComponents.llamadas.estadoSalas import get_cache_estado_salas
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import LiveKitNoDisponibleError
+from src.businessLayer.businessComponents.llamadas.configLiveKit import (
+    LIVEKIT_URL,
+    LIVEKIT_API_KEY,
+    LIVEKIT_API_SECRET,
+)
 from src.businessLayer.businessWorkflow.unirseSalaEmergencia import UnirseSalaEmergencia
 from livekit import api
 import logging
@@ -30,6 +35,7 @@ class SalasActivasResponse(BaseModel):
     """Modelo de respuesta con la lista de salas activas."""
     total: int = Field(..., description="Total de salas activas")
     salas: List[SalaInfo] = Field(..., description="Lista de salas activas")
+    degradado: bool = Field(False, description="True si LiveKit no respondió y se muestra el último estado conocido")
 
 
 class UnirseSalaRequest(BaseModel):
@@ -64,56 +70,29 @@ async def listar_salas_activas_endpoint():
         SalasActivasResponse: Lista de salas activas con nombre y personas conectadas.
     """
     try:
-        salas = await listar_salas_activas()
-        svc = get_room_service()
-        
-        # Convertir las salas a modelos de respuesta
-        # Filtrar solo salas de emergencia disponibles
-        salas_info = []
-        for sala in salas:
-            # Solo procesar salas de emergencia
-            es_sala_emergencia = sala.name.startswith("emergencia-")
-            if not es_sala_emergencia:
-                continue  # Ignorar salas que no son de emergencia
-            
-            # Obtener número de participantes usando la API de LiveKit
-            num_participants = 0
-            try:
-                participants_response = await svc.room.list_participants(
-                    api.ListParticipantsRequest(room=sala.name)
-                )
-                if participants_response and hasattr(participants_response, 'participants'):
-                    num_participants = len(participants_response.participants)
-            except Exception as e:
-                logger.warning(f"Error al obtener participantes de sala {sala.name}: {e}")
-                # Si no se pueden obtener participantes, intentar usar el atributo directo
-                if hasattr(sala, 'num_participants'):
-                    num_participants = sala.num_participants
-                elif hasattr(sala, 'participants') and sala.participants:
-                    num_participants = len(sala.participants)
-            
-            # Obtener max_participants de la sala (por defecto 2 para salas de emergencia)
-            max_participants = getattr(sala, 'max_participants', None)
-            if max_participants is None or max_participants <= 0:
-                max_participants = 2  # Valor por defecto para salas de emergencia
-            
-            # Filtrar salas llenas (2 o más participantes)
-            if num_participants >= max_participants:
-                continue  # No incluir salas llenas
-            
-            # Formatear personas conectadas como "X/2"
-            personas_conectadas_str = f"{num_participants}/{max_participants}"
-            
-            # Crear información simplificada de la sala
-            sala_info = SalaInfo(
-                name=sala.name,
-                personas_conectadas=personas_conectadas_str
+        # Estado servido desde memoria (refresco en segundo plano + webhooks de LiveKit)
+        cache_salas = get_cache_estado_salas()
+        salas = await cache_salas.obtener_salas()
+
+        # Filtrar salas llenas y formatear personas conectadas como "X/2"
+        salas_info = [
+            SalaInfo(
+                name=sala.nombre,
+                personas_conectadas=f"{sala.num_participantes}/{sala.max_participantes}"
             )
-            salas_info.append(sala_info)
-        
+            for sala in salas
+            if not sala.llena
+        ]
+
         return SalasActivasResponse(
             total=len(salas_info),
-            salas=salas_info
+            salas=salas_info,
+            degradado=cache_salas.degradado
+        )
+    except LiveKitNoDisponibleError as le:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(le)
         )
     except RuntimeError as re:
         raise HTTPException(
@@ -128,6 +107,42 @@ async def listar_salas_activas_endpoint():
         )
 
 
+@salas_router.post(
+    "/webhook",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Webhook de LiveKit",
+    description=(
+        "Recibe los webhooks de LiveKit (room_started, room_finished, participant_joined, "
+        "participant_left) y actualiza el estado en memoria de las salas. "
+        "La firma se valida con LIVEKIT_API_KEY y LIVEKIT_API_SECRET."
+    ),
+)
+async def webhook_livekit_endpoint(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Endpoint receptor de webhooks de LiveKit.
+    """
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Falta el encabezado Authorization"
+        )
+    cuerpo = (await request.body()).decode("utf-8")
+    try:
+        receptor = api.WebhookReceiver(api.TokenVerifier(LIVEKIT_API_KEY, LIVEKIT_API_SECRET))
+        evento = receptor.receive(cuerpo, authorization)
+    except Exception as e:
+        logger.warning(f"Webhook de LiveKit rechazado: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Webhook inválido"
+        )
+    get_cache_estado_salas().aplicar_evento(evento)
+    return None
+
+
 @salas_router.put(
     "",
     response_model=UnirseSalaResponse,
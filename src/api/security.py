@@ -1,8 +1,11 @@
-from fastapi import Depends, HTTPException, status
+import asyncio
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException, WebSocket, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List, Union
+from typing import List, Optional, Union
 from src.security.components.servicioAutenticacion import verificar_token
 from src.security.entities.Usuario import TipoUsuario
+from src.dataLayer.dataAccesComponets.repositorioUsuarios import obtener_usuario_por_id
 
 bearer_scheme = HTTPBearer(auto_error=True)
 
@@ -77,4 +80,103 @@ def require_role(allowed_roles: Union[TipoUsuario, List[TipoUsuario]]):
         
         return payload
     
-    return role_checker
\ No newline at end of file
+    return role_checker
+
+
+# Códigos de cierre de WebSocket para conexiones rechazadas
+WS_NO_AUTENTICADO = 4401
+WS_PROHIBIDO = 4403
+
+
+@dataclass(frozen=True)
+class ContextoConexion:
+    """
+    Identidad verificada al abrir un WebSocket.
+    Se guarda en `websocket.state.contexto` y los handlers de mensajes confían en ella.
+    """
+    id_usuario: Optional[int]
+    id_persona: Optional[int]
+    tipo_usuario: Optional[str]
+
+    @property
+    def es_administrador(self) -> bool:
+        return self.tipo_usuario == TipoUsuario.ADMINISTRADOR.value
+
+
+def _token_de_websocket(websocket: WebSocket) -> Optional[str]:
+    # Los navegadores no permiten encabezados en WebSocket: se acepta ?token=...
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+    autorizacion = websocket.headers.get("authorization", "")
+    esquema, _, credencial = autorizacion.partition(" ")
+    if esquema.lower() == "bearer" and credencial:
+        return credencial.strip()
+    return None
+
+
+async def autenticar_websocket(
+    websocket: WebSocket,
+    allowed_roles: Union[TipoUsuario, List[TipoUsuario]]
+) -> Optional[ContextoConexion]:
+    """
+    Autentica un WebSocket durante el handshake (antes de `accept()`).
+    
+    Lee el token de `?token=` o del header Authorization, lo verifica (con el cache de
+    tokens) y exige uno de los tipos de usuario permitidos; el administrador siempre
+    es admitido. Si falla, cierra la conexión con WS_NO_AUTENTICADO o WS_PROHIBIDO
+    (ver `cerrar_websocket`) y retorna None.
+    
+    Args:
+        websocket: Conexión WebSocket aún no aceptada
+        allowed_roles: Un tipo de usuario único o una lista de tipos permitidos
+    
+    Returns:
+        ContextoConexion (también guardado en `websocket.state.contexto`), o None si se rechazó
+    """
+    if isinstance(allowed_roles, TipoUsuario):
+        allowed_roles = [allowed_roles]
+    allowed_role_values = {tipo.value for tipo in allowed_roles} | {TipoUsuario.ADMINISTRADOR.value}
+    
+    token = _token_de_websocket(websocket)
+    payload = verificar_token(token) if token else None
+    if not payload:
+        await cerrar_websocket(websocket, WS_NO_AUTENTICADO, "Token inválido o expirado")
+        return None
+    
+    tipo_usuario = payload.get("tipoUsuario")
+    tipo_usuario = tipo_usuario.upper() if isinstance(tipo_usuario, str) else None
+    if tipo_usuario not in allowed_role_values:
+        await cerrar_websocket(websocket, WS_PROHIBIDO, "Tipo de usuario no permitido")
+        return None
+    
+    id_persona = payload.get("id_persona")
+    if id_persona is None and payload.get("id") is not None:
+        # Tokens emitidos antes de incluir id_persona: una sola consulta en el handshake
+        usuario = await asyncio.to_thread(obtener_usuario_por_id, payload["id"])
+        id_persona = usuario.id_persona if usuario else None
+    
+    contexto = ContextoConexion(
+        id_usuario=payload.get("id"),
+        id_persona=id_persona,
+        tipo_usuario=tipo_usuario,
+    )
+    websocket.state.contexto = contexto
+    return contexto
+
+
+async def cerrar_websocket(websocket: WebSocket, codigo: int, motivo: str) -> None:
+    """
+    Acepta y cierra de inmediato un WebSocket con el código indicado.
+    
+    Cerrar antes de `accept()` hace que el servidor responda el handshake con HTTP 403 y
+    el cliente nunca ve el código; aceptando primero, recibe el frame de cierre con el
+    código (4401/4403) y el motivo.
+    """
+    await websocket.accept()
+    await websocket.close(code=codigo, reason=motivo)
+
+
+async def rechazar_websocket(websocket: WebSocket, motivo: str) -> None:
+    """Cierra con WS_PROHIBIDO un WebSocket autenticado que no puede usar el recurso pedido."""
+    await cerrar_websocket(websocket, WS_PROHIBIDO, motivo)
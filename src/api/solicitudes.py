@@ -2,6 +2,7 @@ from fastapi import APIRouter, Body, HTTPException, status
 from pydantic import BaseModel, Field
 from datetime import datetime
 from src.businessLayer.businessWorkflow.solicitarAmbulancia import SolicitarAmbulancia
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import LiveKitNoDisponibleError, LIVEKIT_CB_ESPERA
 
 solicitudes_router = APIRouter(
     prefix="/solicitudes",
@@ -121,6 +122,13 @@ async def solicitar_ambulancia(
             server_url=result["server_url"]
         )
 
+    except LiveKitNoDisponibleError as le:
+        # Modo degradado: LiveKit no responde, se rechaza rápido para que el cliente reintente
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(le),
+            headers={"Retry-After": str(int(LIVEKIT_CB_ESPERA))}
+        )
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     except Exception as e:
@@ -0,0 +1,51 @@
+"""
+Endpoints de introspección de las tareas periódicas de envío.
+Permite ver qué tareas hay registradas en el clúster, qué worker ejecuta cada una
+y las métricas del coordinador de este worker.
+"""
+
+from fastapi import APIRouter, Depends
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from src.api.security import require_role
+from src.security.entities.Usuario import TipoUsuario
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
+
+tareas_router = APIRouter(
+    prefix="/tareas",
+    tags=["tareas"],
+)
+
+
+class TareaInfo(BaseModel):
+    """Modelo de respuesta con el estado de una tarea periódica."""
+    id: int = Field(..., description="ID de la tarea (ID de la emergencia)")
+    datos: Dict[str, Any] = Field(..., description="Datos con los que se ejecuta la tarea")
+    dueno: Optional[str] = Field(None, description="Worker que tiene el lease; None si nadie la ejecuta")
+    local: bool = Field(..., description="True si la tarea se ejecuta en el worker que responde")
+    edad_segundos: float = Field(..., description="Segundos desde que se registró la tarea")
+
+
+class TareasResponse(BaseModel):
+    """Modelo de respuesta con las tareas registradas por grupo."""
+    worker: str = Field(..., description="Worker que responde")
+    grupos: Dict[str, List[TareaInfo]] = Field(..., description="Tareas registradas por grupo")
+    estadisticas: Dict[str, Any] = Field(..., description="Métricas del coordinador de este worker")
+
+
+@tareas_router.get(
+    "",
+    response_model=TareasResponse,
+    summary="Listar tareas periódicas",
+    description=(
+        "Lista las tareas de envío periódico registradas en el clúster, el worker que ejecuta "
+        "cada una y las métricas del coordinador. Solo para administradores."
+    ),
+)
+def listar_tareas(payload: dict = Depends(require_role(TipoUsuario.ADMINISTRADOR))) -> TareasResponse:
+    coordinador = get_coordinador_tareas()
+    return TareasResponse(
+        worker=coordinador.id_worker,
+        grupos=coordinador.describir(),
+        estadisticas=coordinador.estadisticas(),
+    )
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, status, Body, Path, Query
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
@@ -10,6 +11,7 @@ from src.dataLayer.dataAccesComponets.repositorioUsuarios import (
     eliminar_usuario,
     actualizarUsuarioPersona
 )
+from src.security.components.servicioAutenticacion import revocar_tokens_usuario
 
 usuarios_router = APIRouter(
     prefix="/usuarios",
@@ -49,7 +51,8 @@ async def crear_usuario(usuario_data: UsuarioCreate = Body(...)):
             id_persona=None,
             tipoUsuario=None
         )
-        nuevo_usuario = crearUsuario(usuario)
+        # El hash bcrypt bloquea hasta que el pool lo resuelve: fuera del event loop
+        nuevo_usuario = await asyncio.to_thread(crearUsuario, usuario)
         if not nuevo_usuario:
             # Conflicto: usuario/email duplicado
             raise HTTPException(
@@ -143,12 +146,15 @@ async def actualizar_usuario_endpoint(
     cambios: Dict[str, Any] = Body(..., description="Campos a actualizar")
 ):
     try:
-        actualizado = actualizar_usuario(id_usuario, cambios)
+        actualizado = await asyncio.to_thread(actualizar_usuario, id_usuario, cambios)
         if not actualizado:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuario no encontrado o conflicto de datos"
             )
+        if "tipoUsuario" in cambios:
+            # Los tokens emitidos con el rol anterior dejan de ser válidos
+            revocar_tokens_usuario(id_usuario)
         return actualizado
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -172,6 +178,7 @@ async def eliminar_usuario_endpoint(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuario no encontrado"
             )
+        revocar_tokens_usuario(id_usuario)
         return None
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -207,6 +214,8 @@ async def asignar_usuario_a_persona(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuario no encontrado"
             )
+        # Los tokens emitidos con el rol anterior dejan de ser válidos
+        revocar_tokens_usuario(id_usuario)
         return actualizado
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
@@ -2,6 +2,8 @@
 Router para valorar solicitudes y crear emergencias.
 """
 
+import asyncio
+import logging
 from fastapi import APIRouter, Body, HTTPException, status
 from pydantic import BaseModel, Field
 from src.businessLayer.businessEntities.emergencia import Emergencia
@@ -14,6 +16,8 @@ from src.businessLayer.businessComponents.notificaciones.gestorTareasAmbulancias
     iniciar_envio_ambulancias,
 )
 
+logger = logging.getLogger(__name__)
+
 valorar_emergencia_router = APIRouter(
     prefix="/valorar-emergencia",
     tags=["valorar-emergencia"],
@@ -64,19 +68,20 @@ async def valorar_solicitud(
             solicitante_id=valoracion_data.solicitante_id
         )
         
-        # 2. Buscar la ambulancia más cercana (solo una vez)
+        # 2. Buscar la ambulancia más cercana (solo una vez). Corre en el threadpool: con
+        #    grafo vial, el cálculo del ETA no debe bloquear el event loop
         id_ambulancia_cercana = None
         try:
             if emergencia_creada.solicitud and emergencia_creada.solicitud.ubicacion:
-                id_ambulancia_cercana = BuscarAmbulanciaCercana.encontrar_mas_cercana(
+                id_ambulancia_cercana = await asyncio.to_thread(
+                    BuscarAmbulanciaCercana.encontrar_mas_cercana,
                     ubicacion_emergencia=emergencia_creada.solicitud.ubicacion,
                     tipo_ambulancia=emergencia_creada.tipoAmbulancia,
                     nivel_prioridad=emergencia_creada.nivelPrioridad
                 )
         except Exception as e:
             # Si falla la búsqueda de ambulancia, no fallamos la creación de la emergencia.
-            # Solo logueamos el error (aquí print por simplicidad).
-            print(f"Error al buscar ambulancia cercana: {e}")
+            logger.error("Error al buscar ambulancia cercana: %s", e)
 
         # 3. Iniciar el envío periódico de la ubicación de la ambulancia óptima al operador
         #    (solo si se encontró una ambulancia y hay operador asociado)
@@ -86,43 +91,42 @@ async def valorar_solicitud(
                 and emergencia_creada.id is not None
                 and valoracion_data.id_operador is not None
             ):
-                print(f"[INFO] Iniciando envio de ubicacion: operador={valoracion_data.id_operador}, emergencia={emergencia_creada.id}, ambulancia={id_ambulancia_cercana}")
+                logger.info(
+                    "Iniciando envío de ubicación: operador=%s, emergencia=%s, ambulancia=%s",
+                    valoracion_data.id_operador, emergencia_creada.id, id_ambulancia_cercana
+                )
                 resultado = iniciar_envio_ambulancias(
                     id_operador=valoracion_data.id_operador,
                     emergencia_id=emergencia_creada.id,
                     id_ambulancia=id_ambulancia_cercana,
                 )
-                if resultado:
-                    print(f"[OK] Envio de ubicacion iniciado correctamente para emergencia {emergencia_creada.id}")
-                else:
-                    print(f"[WARN] No se pudo iniciar envio de ubicacion (ya existe tarea para emergencia {emergencia_creada.id})")
+                if not resultado:
+                    logger.warning(
+                        "No se pudo iniciar envío de ubicación (ya existe tarea para emergencia %s)",
+                        emergencia_creada.id
+                    )
             else:
-                print(f"[WARN] No se puede iniciar envio de ubicacion: id_ambulancia={id_ambulancia_cercana}, emergencia_id={emergencia_creada.id}, id_operador={valoracion_data.id_operador}")
+                logger.warning(
+                    "No se puede iniciar envío de ubicación: id_ambulancia=%s, emergencia_id=%s, id_operador=%s",
+                    id_ambulancia_cercana, emergencia_creada.id, valoracion_data.id_operador
+                )
         except Exception as e:
             # Si falla el inicio del envío periódico, no rompemos el flujo principal.
-            print(
-                f"[ERROR] Error al iniciar envío de ubicación de ambulancia óptima "
-                f"(emergencia {emergencia_creada.id}, ambulancia {id_ambulancia_cercana}): {e}"
+            logger.exception(
+                "Error al iniciar envío de ubicación de ambulancia óptima (emergencia %s, ambulancia %s): %s",
+                emergencia_creada.id, id_ambulancia_cercana, e
             )
-            import traceback
-            traceback.print_exc()
             
-        # Log para verificar que se está enviando id_ambulancia_cercana
-        print(f"[DEBUG] [VALORACION] Enviando respuesta con id_ambulancia_cercana: {id_ambulancia_cercana}")
-        print(f"[DEBUG] [VALORACION] Tipo de id_ambulancia_cercana: {type(id_ambulancia_cercana)}")
+        logger.debug(
+            "Valoración de emergencia %s respondida con id_ambulancia_cercana=%s",
+            emergencia_creada.id, id_ambulancia_cercana
+        )
         
-        respuesta = ValorarEmergenciaResponse(
+        return ValorarEmergenciaResponse(
             emergencia=emergencia_creada,
             id_ambulancia_cercana=id_ambulancia_cercana
         )
         
-        # Log del modelo serializado
-        respuesta_dict = respuesta.model_dump(mode='json')
-        print(f"[DEBUG] [VALORACION] Respuesta serializada: {respuesta_dict}")
-        print(f"[DEBUG] [VALORACION] id_ambulancia_cercana en respuesta: {respuesta_dict.get('id_ambulancia_cercana')}")
-        
-        return respuesta
-        
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     except RuntimeError as re:
@@ -5,11 +5,18 @@ Este módulo proporciona endpoints WebSocket específicos para comunicación
 en tiempo real relacionada con ambulancias y sus ubicaciones.
 """
 
+import asyncio
+import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Path
+from src.api.security import autenticar_websocket, cerrar_websocket, rechazar_websocket
+from src.security.entities.Usuario import TipoUsuario
+from src.businessLayer.businessComponents.entidades.servicioAmbulancia import ServicioAmbulancia
 from src.businessLayer.businessWorkflow.actualizarDisponibilidadAmbulancia import ActualizarDisponibilidadAmbulancia
 from src.businessLayer.businessWorkflow.procesarUbicacionAmbulancia import ProcesarUbicacionAmbulancia
 import json
 
+logger = logging.getLogger(__name__)
+
 websocket_ambulancias_router = APIRouter(
     prefix="/ws",
     tags=["websocket-ambulancias"]
@@ -31,6 +38,10 @@ async def websocket_ambulancia(
     su ubicación. Al conectar, la ambulancia se marca como disponible.
     Al desconectar, se marca como no disponible.
     
+    Requiere el token del operador de ambulancia asignado a la ambulancia (o de un
+    administrador) en `?token=` o en el header Authorization. La ambulancia se valida
+    una sola vez en el handshake; los mensajes de ubicación no consultan la base de datos.
+    
     Formato del mensaje esperado:
     {
         "ubicacion": {
@@ -45,6 +56,19 @@ async def websocket_ambulancia(
     """
     manager = get_manager_ambulancias()
     
+    # Autenticar y validar la ambulancia una sola vez, antes de aceptar la conexión
+    contexto = await autenticar_websocket(websocket, TipoUsuario.OPERADOR_AMBULANCIA)
+    if contexto is None:
+        return
+    ambulancia = await asyncio.to_thread(ServicioAmbulancia.obtener_por_id, id_ambulancia)
+    if not ambulancia:
+        await cerrar_websocket(websocket, 4004, f"Ambulancia con id {id_ambulancia} no encontrada")
+        return
+    if not contexto.es_administrador and ambulancia.id_operador_ambulancia != contexto.id_persona:
+        await rechazar_websocket(websocket, "La ambulancia no está asignada a este operador")
+        return
+    tipo_ambulancia = ambulancia.tipoAmbulancia
+    
     try:
         # Conectar usando el manager (esto hace accept())
         await manager.connect(websocket, id_ambulancia)
@@ -90,7 +114,9 @@ async def websocket_ambulancia(
                 try:
                     latitud = float(ubicacion_data["latitud"])
                     longitud = float(ubicacion_data["longitud"])
-                    ProcesarUbicacionAmbulancia.procesar_ubicacion(id_ambulancia, latitud, longitud)
+                    ProcesarUbicacionAmbulancia.procesar_ubicacion(
+                        id_ambulancia, latitud, longitud, tipo_ambulancia=tipo_ambulancia
+                    )
                     
                     # Confirmar recepción
                     await websocket.send_text(json.dumps({
@@ -126,8 +152,7 @@ async def websocket_ambulancia(
         except:
             pass
     except Exception as e:
-        # Log del error para debugging
-        print(f"Error en websocket de ambulancia {id_ambulancia}: {e}")
+        logger.error("Error en websocket de ambulancia %s: %s", id_ambulancia, e)
         # Desconectar del manager si hubo error
         manager.disconnect(websocket)
         try:
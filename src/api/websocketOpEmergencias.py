@@ -5,7 +5,10 @@ Este módulo proporciona endpoints WebSocket específicos para comunicación
 en tiempo real relacionada con emergencias.
 """
 
+import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from src.api.security import autenticar_websocket, rechazar_websocket
+from src.security.entities.Usuario import TipoUsuario
 from src.businessLayer.businessComponents.notificaciones.notificadorOperadorEmergencias import get_manager_operadores_emergencia
 import json
 from typing import Optional
@@ -13,6 +16,8 @@ from typing import Optional
 # Obtener el manager de operadores de emergencia desde el módulo de notificación
 manager_operadores_emergencia = get_manager_operadores_emergencia()
 
+logger = logging.getLogger(__name__)
+
 websocket_router = APIRouter(
     prefix="/ws",
     tags=["websocket-operadores-emergencia"]
@@ -31,7 +36,19 @@ async def websocket_operadores_emergencia(
     
     Si se proporciona id_operador, la conexión se asocia a ese ID para recibir
     notificaciones específicas (como información de ambulancias durante la evaluación).
+    
+    Requiere el token de un operador de emergencia (o de un administrador) en `?token=`
+    o en el header Authorization. Si no se indica id_operador, se usa el del token.
     """
+    contexto = await autenticar_websocket(websocket, TipoUsuario.OPERADOR_EMERGENCIA)
+    if contexto is None:
+        return
+    if not contexto.es_administrador:
+        if id_operador is not None and id_operador != contexto.id_persona:
+            await rechazar_websocket(websocket, "No puede conectarse como otro operador")
+            return
+        id_operador = contexto.id_persona
+    
     try:
         # Conectar con el ID del operador si se proporciona
         await manager_operadores_emergencia.connect(websocket, entity_id=id_operador)
@@ -62,8 +79,7 @@ async def websocket_operadores_emergencia(
     except WebSocketDisconnect:
         manager_operadores_emergencia.disconnect(websocket)
     except Exception as e:
-        # Log del error para debugging
-        print(f"Error en websocket de operadores de emergencia: {e}")
+        logger.error("Error en websocket de operadores de emergencia: %s", e)
         try:
             manager_operadores_emergencia.disconnect(websocket)
         except:
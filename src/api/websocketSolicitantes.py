@@ -5,18 +5,64 @@ Este módulo proporciona endpoints WebSocket específicos para comunicación
 en tiempo real relacionada con solicitantes y sus solicitudes.
 """
 
+import asyncio
+import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Path
+from src.api.security import ContextoConexion, autenticar_websocket, rechazar_websocket
+from src.security.entities.Usuario import TipoUsuario
+from src.businessLayer.businessComponents.entidades.servicioEmergencia import ServicioEmergencia
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
 from src.businessLayer.businessComponents.notificaciones.notificadorSolicitante import get_manager_solicitantes
+from src.businessLayer.businessComponents.notificaciones.gestorTareasUbicacionAmbulancia import suspender_envio_por_solicitante
 import json
 
 # Obtener el manager de solicitantes desde el módulo de notificación
 manager_solicitantes = get_manager_solicitantes()
 
+logger = logging.getLogger(__name__)
+
 websocket_solicitantes_router = APIRouter(
     prefix="/ws",
     tags=["websocket-solicitantes"]
 )
 
+
+async def _finalizar_emergencia(
+    websocket: WebSocket,
+    contexto: ContextoConexion,
+    id_solicitante: int,
+    id_emergencia: int,
+) -> None:
+    """
+    Marca la emergencia como RESUELTA si pertenece al solicitante autenticado
+    (o si quien la finaliza es un administrador). Las consultas corren fuera del event loop.
+    """
+    emergencia = None
+    if isinstance(id_emergencia, int) and id_emergencia > 0:
+        emergencia = await asyncio.to_thread(ServicioEmergencia.obtener_resumen_por_id, id_emergencia)
+    if emergencia is None or (
+        not contexto.es_administrador and emergencia.solicitante_id != contexto.id_persona
+    ):
+        logger.warning(
+            "Solicitante %s intentó finalizar la emergencia %s, que no le pertenece",
+            id_solicitante, id_emergencia
+        )
+        await websocket.send_text(json.dumps({
+            "type": "error",
+            "message": f"La emergencia {id_emergencia} no existe o no pertenece a este solicitante"
+        }))
+        return
+    
+    emergencia_actualizada = await asyncio.to_thread(
+        ServicioEmergencia.actualizar, id_emergencia, {"estado": EstadoEmergencia.RESUELTA}
+    )
+    if emergencia_actualizada:
+        # Los envíos de ubicación se detienen al publicarse el cambio de estado
+        logger.info("Emergencia %s finalizada por solicitante %s", id_emergencia, id_solicitante)
+    else:
+        logger.error("No se pudo actualizar la emergencia %s", id_emergencia)
+
+
 @websocket_solicitantes_router.websocket("/solicitantes/{id_solicitante}")
 async def websocket_solicitante(
     websocket: WebSocket,
@@ -29,10 +75,20 @@ async def websocket_solicitante(
     Los solicitantes se conectan aquí usando su ID para recibir notificaciones
     sobre el estado de sus solicitudes.
     
+    Requiere el token del propio solicitante (o de un administrador) en `?token=`
+    o en el header Authorization.
+    
     Args:
         websocket: Conexión WebSocket.
         id_solicitante: ID del solicitante que se conecta.
     """
+    contexto = await autenticar_websocket(websocket, TipoUsuario.SOLICITANTE)
+    if contexto is None:
+        return
+    if not contexto.es_administrador and contexto.id_persona != id_solicitante:
+        await rechazar_websocket(websocket, "No puede conectarse como otro solicitante")
+        return
+    
     try:
         # Conectar el websocket asociado al ID del solicitante
         await manager_solicitantes.connect(websocket, entity_id=id_solicitante)
@@ -63,49 +119,33 @@ async def websocket_solicitante(
                         id_emergencia = mensaje.get("id_emergencia")
                         
                         if id_emergencia:
-                            # Actualizar el estado de la emergencia a RESUELTA
-                            from src.businessLayer.businessComponents.entidades.servicioEmergencia import ServicioEmergencia
-                            from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
-                            
-                            emergencia_actualizada = ServicioEmergencia.actualizar(
-                                id_emergencia,
-                                {"estado": EstadoEmergencia.RESUELTA}
-                            )
-                            
-                            if emergencia_actualizada:
-                                print(f"Emergencia {id_emergencia} finalizada por solicitante {id_solicitante}")
-                            else:
-                                print(f"Error: No se pudo actualizar la emergencia {id_emergencia}")
+                            await _finalizar_emergencia(websocket, contexto, id_solicitante, id_emergencia)
                         else:
-                            print(f"Error: Mensaje de emergencia_finalizada sin id_emergencia")
+                            logger.warning("Mensaje de emergencia_finalizada sin id_emergencia (solicitante %s)", id_solicitante)
                 
                 except json.JSONDecodeError:
                     # Si no es JSON válido, ignorar el mensaje
                     pass
                 except Exception as e:
-                    print(f"Error al procesar mensaje del solicitante {id_solicitante}: {e}")
+                    logger.error("Error al procesar mensaje del solicitante %s: %s", id_solicitante, e)
                 
             except Exception:
                 break
         
-        # Si salimos del bucle, desconectar y detener tareas
+        # Si salimos del bucle, desconectar y suspender tareas (se retoman al reconectar)
         manager_solicitantes.disconnect(websocket)
-        from src.businessLayer.businessComponents.notificaciones.gestorTareasUbicacionAmbulancia import detener_envio_por_solicitante
-        detener_envio_por_solicitante(id_solicitante)
+        suspender_envio_por_solicitante(id_solicitante)
                 
     except WebSocketDisconnect:
         manager_solicitantes.disconnect(websocket)
-        # Verificar si hay tareas de envío de ubicación activas para este solicitante y detenerlas
-        from src.businessLayer.businessComponents.notificaciones.gestorTareasUbicacionAmbulancia import detener_envio_por_solicitante
-        detener_envio_por_solicitante(id_solicitante)
+        # Suspender el envío de ubicación a este solicitante (se retoma al reconectar)
+        suspender_envio_por_solicitante(id_solicitante)
     except Exception as e:
-        # Log del error para debugging
-        print(f"Error en websocket de solicitante {id_solicitante}: {e}")
+        logger.error("Error en websocket de solicitante %s: %s", id_solicitante, e)
         try:
             manager_solicitantes.disconnect(websocket)
-            # Verificar si hay tareas de envío de ubicación activas para este solicitante y detenerlas
-            from src.businessLayer.businessComponents.notificaciones.gestorTareasUbicacionAmbulancia import detener_envio_por_solicitante
-            detener_envio_por_solicitante(id_solicitante)
+            # Suspender el envío de ubicación a este solicitante (se retoma al reconectar)
+            suspender_envio_por_solicitante(id_solicitante)
         except:
             pass
 
@@ -0,0 +1,377 @@
+"""
+Micro-benchmarks de las rutas críticas del flujo de emergencias.
+
+Mide, con datos sintéticos y Redis en memoria (fakeredis):
+- `BuscarAmbulanciaCercana.encontrar_mas_cercana` con flotas de distintos tamaños.
+- `notificador.broadcast` contra sockets simulados, con y sin consumidores lentos.
+- `ServicioUbicacionCache`: guardar (codificar) y obtener (decodificar) una ubicación.
+- `listar_emergencias` (mapeo completo a entidades) frente a `listar_emergencias_resumen`.
+- `MotorEta` sobre un grafo vial sintético (cuadrícula cortada por un río con dos
+  puentes), con y sin cache, y la búsqueda de ambulancias con el grafo cargado.
+
+Cada caso se ejecuta en varias rondas; se reporta la mediana, el mínimo y el p99 del
+tiempo por llamada. Los resultados se pueden guardar como línea base en JSON y comparar
+con una ejecución posterior (por ejemplo, entre ramas):
+
+    python -m src.benchmarks.benchmarkRutasCriticas --guardar base-main.json
+    python -m src.benchmarks.benchmarkRutasCriticas --comparar base-main.json
+
+Ejecuta: python -m src.benchmarks.benchmarkRutasCriticas [--rondas R] [--filtro texto]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+# Entorno aislado (debe fijarse antes de importar la configuración)
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="resq-bench-"), "bench.db")
+os.environ.setdefault("LIVEKIT_API_KEY", "benchmark-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "benchmark-secret-de-al-menos-32-bytes")
+os.environ.setdefault("LIVEKIT_URL", "http://127.0.0.1:7880")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import fakeredis
+
+from src.businessLayer.businessComponents.cache import configRedis
+from src.businessLayer.businessComponents.cache.servicioUbicacionCache import ServicioUbicacionCache
+from src.businessLayer.businessComponents.entidades.buscarAmbulanciaCercana import BuscarAmbulanciaCercana
+from src.businessLayer.businessComponents.notificaciones.estrategias import EstrategiaBroadcast
+from src.businessLayer.businessComponents.notificaciones.notificador import notificador
+from src.businessLayer.businessComponents.rutas import motorEta
+from src.businessLayer.businessComponents.rutas.grafoVial import GrafoVial
+from src.businessLayer.businessEntities.emergencia import Emergencia
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
+from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
+from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
+from src.businessLayer.businessEntities.enums.tipoDocumento import TipoDocumento
+from src.businessLayer.businessEntities.operadorEmergencia import OperadorEmergencia
+from src.businessLayer.businessEntities.solicitante import Solicitante
+from src.businessLayer.businessEntities.solicitud import Solicitud
+from src.businessLayer.businessEntities.ubicacion import Ubicacion
+from src.dataLayer.bd import inicializar_base_datos
+from src.dataLayer.dataAccesComponets import repositorioEmergencias
+from src.dataLayer.dataAccesComponets import repositorioOperadorEmergencia
+from src.dataLayer.dataAccesComponets import repositorioSolicitantes
+from src.dataLayer.dataAccesComponets import repositorioSolicitudes
+
+# Centro de la zona simulada (Bogotá) y radio aproximado en grados
+CENTRO = (4.7110, -74.0721)
+RADIO_GRADOS = 0.15
+
+TAMANOS_FLOTA = (10, 100, 1000, 5000)
+CONEXIONES_BROADCAST = 200
+# Fracción de sockets lentos y su demora por envío
+FRACCION_LENTOS = 0.05
+DEMORA_LENTO = 0.002
+EMERGENCIAS_SEMBRADAS = 300
+# Cuadrícula del grafo vial sintético (nodos por lado) y separación entre calles en grados
+LADO_GRAFO = 150
+PASO_GRAFO = 2 * RADIO_GRADOS / LADO_GRAFO
+
+# Variación (en %) a partir de la cual la comparación marca un cambio
+UMBRAL_CAMBIO = 10.0
+
+
+def _medir(funcion: Callable[[], object], rondas: int, llamadas: int) -> dict:
+    """
+    Ejecuta `funcion` `llamadas` veces por ronda, durante `rondas` rondas (tras una ronda
+    de calentamiento), y retorna estadísticas del tiempo por llamada en milisegundos.
+    """
+    for _ in range(llamadas):
+        funcion()
+    tiempos = []
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / llamadas)
+    tiempos.sort()
+    ultimo = len(tiempos) - 1
+    mediana = tiempos[ultimo // 2]
+    return {
+        "rondas": rondas,
+        "llamadas_por_ronda": llamadas,
+        "mediana_ms": round(mediana * 1000, 4),
+        "min_ms": round(tiempos[0] * 1000, 4),
+        "p99_ms": round(tiempos[min(ultimo, int(round(0.99 * ultimo)))] * 1000, 4),
+        "ops_por_segundo": round(1 / mediana, 1) if mediana else None,
+    }
+
+
+def _ubicacion_aleatoria() -> Ubicacion:
+    return Ubicacion(
+        latitud=CENTRO[0] + random.uniform(-RADIO_GRADOS, RADIO_GRADOS),
+        longitud=CENTRO[1] + random.uniform(-RADIO_GRADOS, RADIO_GRADOS),
+        fechaHora=datetime.now(timezone.utc),
+    )
+
+
+def _poblar_flota(cliente, tamano: int) -> None:
+    cliente.flushdb()
+    tipos = [t.value for t in TipoAmbulancia]
+    for id_ambulancia in range(1, tamano + 1):
+        ubicacion = _ubicacion_aleatoria()
+        ServicioUbicacionCache.guardar_ubicacion(
+            id_ambulancia, ubicacion.latitud, ubicacion.longitud, tipos[id_ambulancia % len(tipos)]
+        )
+
+
+def benchmark_ambulancia_cercana(cliente, rondas: int) -> Dict[str, dict]:
+    resultados = {}
+    for tamano in TAMANOS_FLOTA:
+        _poblar_flota(cliente, tamano)
+        emergencia = _ubicacion_aleatoria()
+        llamadas = max(1, 2000 // tamano)
+        resultados[f"ambulancia_cercana[flota={tamano}]"] = _medir(
+            lambda: BuscarAmbulanciaCercana.encontrar_mas_cercana(
+                emergencia, TipoAmbulancia.BASICA, NivelPrioridad.ALTA
+            ),
+            rondas,
+            llamadas,
+        )
+    return resultados
+
+
+class _SocketSimulado:
+    """Sustituto de WebSocket: `send_text` cede el control y, si es lento, espera `demora`."""
+
+    def __init__(self, demora: float = 0.0):
+        self.demora = demora
+        self.enviados = 0
+
+    async def send_text(self, mensaje: str) -> None:
+        self.enviados += 1
+        await asyncio.sleep(self.demora)
+
+
+def benchmark_broadcast(rondas: int) -> Dict[str, dict]:
+    resultados = {}
+    mensaje = json.dumps({"type": "nueva_solicitud", "data": {"id": 1, "room": "emergencia-bench"}})
+    loop = asyncio.new_event_loop()
+    try:
+        for nombre, lentos in (
+            ("broadcast[rapidos]", 0),
+            ("broadcast[5%_lentos]", int(CONEXIONES_BROADCAST * FRACCION_LENTOS)),
+        ):
+            manager = notificador(estrategia=EstrategiaBroadcast())
+            for i in range(CONEXIONES_BROADCAST):
+                manager.conexiones_activas.add(_SocketSimulado(DEMORA_LENTO if i < lentos else 0.0))
+            llamadas = 20 if lentos else 200
+            resultado = _medir(lambda: loop.run_until_complete(manager.broadcast(mensaje)), rondas, llamadas)
+            resultado["conexiones"] = CONEXIONES_BROADCAST
+            resultado["lentas"] = lentos
+            resultados[nombre] = resultado
+    finally:
+        loop.close()
+    return resultados
+
+
+def benchmark_ubicacion_cache(cliente, rondas: int) -> Dict[str, dict]:
+    cliente.flushdb()
+    marca = datetime.now(timezone.utc)
+    ServicioUbicacionCache.guardar_ubicacion(7, CENTRO[0], CENTRO[1], TipoAmbulancia.BASICA.value, marca)
+    return {
+        "ubicacion_cache.guardar": _medir(
+            lambda: ServicioUbicacionCache.guardar_ubicacion(
+                7, CENTRO[0], CENTRO[1], TipoAmbulancia.BASICA.value, marca
+            ),
+            rondas,
+            2000,
+        ),
+        "ubicacion_cache.obtener": _medir(lambda: ServicioUbicacionCache.obtener_ubicacion(7), rondas, 2000),
+    }
+
+
+def _persona(prefijo: str, indice: int) -> dict:
+    return {
+        "nombre": prefijo,
+        "apellido": f"Bench{indice}",
+        "fechaNacimiento": date(1985, 1, 1),
+        "tipoDocumento": TipoDocumento.CEDULA,
+        "numeroDocumento": f"{prefijo[:3].upper()}{indice:06d}",
+    }
+
+
+def _sembrar_emergencias(cantidad: int) -> None:
+    operador = repositorioOperadorEmergencia.crear_operador(
+        OperadorEmergencia(**_persona("Operador", 0), disponibilidad=True)
+    )
+    for i in range(cantidad):
+        solicitante = repositorioSolicitantes.crear_solicitante(
+            Solicitante(**_persona("Solicitante", i), padecimientos=["asma"])
+        )
+        solicitud = repositorioSolicitudes.crear_solicitud_con_ubicacion(Solicitud(
+            solicitante=solicitante, fechaHora=datetime.now(timezone.utc), ubicacion=_ubicacion_aleatoria()
+        ))
+        repositorioEmergencias.crear_emergencia(Emergencia(
+            solicitud=solicitud,
+            estado=EstadoEmergencia.VALORADA,
+            tipoAmbulancia=TipoAmbulancia.BASICA,
+            nivelPrioridad=NivelPrioridad.ALTA,
+            descripcion="Benchmark",
+            id_operador=operador.id,
+            solicitante=solicitante,
+        ))
+
+
+def benchmark_listar_emergencias(rondas: int) -> Dict[str, dict]:
+    _sembrar_emergencias(EMERGENCIAS_SEMBRADAS)
+    return {
+        "listar_emergencias[limit=50]": _medir(
+            lambda: repositorioEmergencias.listar_emergencias(limit=50), rondas, 5
+        ),
+        "listar_emergencias_resumen[limit=50]": _medir(
+            lambda: repositorioEmergencias.listar_emergencias_resumen(limit=50), rondas, 20
+        ),
+    }
+
+
+def _grafo_sintetico() -> GrafoVial:
+    """
+    Cuadrícula de calles de doble sentido a 30 km/h, cortada por un río (columna central)
+    que solo se cruza por dos puentes.
+    """
+    def nodo(fila: int, columna: int) -> int:
+        return fila * LADO_GRAFO + columna
+
+    coordenadas = [
+        (CENTRO[0] - RADIO_GRADOS + fila * PASO_GRAFO, CENTRO[1] - RADIO_GRADOS + columna * PASO_GRAFO)
+        for fila in range(LADO_GRAFO)
+        for columna in range(LADO_GRAFO)
+    ]
+    segundos = PASO_GRAFO * 111320 / (30 / 3.6)
+    rio = LADO_GRAFO // 2
+    puentes = {LADO_GRAFO // 4, 3 * LADO_GRAFO // 4}
+    aristas = []
+    for fila in range(LADO_GRAFO):
+        for columna in range(LADO_GRAFO):
+            vecinos = []
+            if fila + 1 < LADO_GRAFO:
+                vecinos.append(nodo(fila + 1, columna))
+            if columna + 1 < LADO_GRAFO and (columna != rio or fila in puentes):
+                vecinos.append(nodo(fila, columna + 1))
+            for vecino in vecinos:
+                aristas.append((nodo(fila, columna), vecino, segundos))
+                aristas.append((vecino, nodo(fila, columna), segundos))
+    return GrafoVial.desde_aristas(coordenadas, aristas)
+
+
+def benchmark_eta_vial(cliente, rondas: int) -> Dict[str, dict]:
+    motor = motorEta.MotorEta(_grafo_sintetico())
+    emergencia = _ubicacion_aleatoria()
+    origenes = {}
+    for i in range(motor.max_candidatas):
+        ubicacion = _ubicacion_aleatoria()
+        origenes[i] = (ubicacion.latitud, ubicacion.longitud)
+    destino = (emergencia.latitud, emergencia.longitud)
+
+    def sin_cache():
+        motor.limpiar()
+        motor.etas(destino, origenes)
+
+    resultados = {
+        f"eta_vial[sin_cache,nodos={motor.grafo.nodos}]": _medir(sin_cache, rondas, 5),
+        "eta_vial[con_cache]": _medir(lambda: motor.etas(destino, origenes), rondas, 2000),
+    }
+    _poblar_flota(cliente, 1000)
+    anterior = motorEta._motor_eta
+    motorEta._motor_eta = motor
+    try:
+        resultados["ambulancia_cercana[flota=1000,grafo]"] = _medir(
+            lambda: BuscarAmbulanciaCercana.encontrar_mas_cercana(
+                _ubicacion_aleatoria(), TipoAmbulancia.BASICA, NivelPrioridad.ALTA
+            ),
+            rondas,
+            5,
+        )
+    finally:
+        motorEta._motor_eta = anterior
+    return resultados
+
+
+def _commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _comparar(actual: Dict[str, dict], base: Dict[str, dict]) -> None:
+    print(f"\n{'benchmark':<40}{'base_ms':>12}{'actual_ms':>12}{'cambio':>10}")
+    for nombre, resultado in actual.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            print(f"{nombre:<40}{'-':>12}{resultado['mediana_ms']:>12}{'nuevo':>10}")
+            continue
+        cambio = (resultado["mediana_ms"] - anterior["mediana_ms"]) / anterior["mediana_ms"] * 100
+        marca = ""
+        if cambio >= UMBRAL_CAMBIO:
+            marca = " (peor)"
+        elif cambio <= -UMBRAL_CAMBIO:
+            marca = " (mejor)"
+        print(f"{nombre:<40}{anterior['mediana_ms']:>12}{resultado['mediana_ms']:>12}{cambio:>+9.1f}%{marca}")
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de las rutas críticas de ResQ")
+    parser.add_argument("--rondas", type=int, default=15, help="Rondas medidas por caso")
+    parser.add_argument("--filtro", help="Ejecuta solo los grupos cuyo nombre contenga el texto")
+    parser.add_argument("--guardar", help="Ruta donde guardar los resultados como línea base (JSON)")
+    parser.add_argument("--comparar", help="Línea base (JSON) con la que comparar los resultados")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    random.seed(args.semilla)
+    cliente = fakeredis.FakeRedis(decode_responses=True)
+    configRedis._redis_client = cliente
+    inicializar_base_datos()
+
+    grupos = {
+        "ambulancia_cercana": lambda: benchmark_ambulancia_cercana(cliente, args.rondas),
+        "broadcast": lambda: benchmark_broadcast(args.rondas),
+        "ubicacion_cache": lambda: benchmark_ubicacion_cache(cliente, args.rondas),
+        "listar_emergencias": lambda: benchmark_listar_emergencias(args.rondas),
+        "eta_vial": lambda: benchmark_eta_vial(cliente, args.rondas),
+    }
+    resultados: Dict[str, dict] = {}
+    for nombre, grupo in grupos.items():
+        if args.filtro and args.filtro not in nombre:
+            continue
+        resultados.update(grupo())
+
+    print(f"{'benchmark':<40}{'mediana_ms':>12}{'min_ms':>12}{'p99_ms':>12}{'ops/s':>14}")
+    for nombre, resultado in resultados.items():
+        print(
+            f"{nombre:<40}{resultado['mediana_ms']:>12}{resultado['min_ms']:>12}"
+            f"{resultado['p99_ms']:>12}{str(resultado['ops_por_segundo']):>14}"
+        )
+
+    documento = {
+        "fecha": datetime.now(timezone.utc).isoformat(),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            _comparar(resultados, json.load(archivo)["resultados"])
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(documento, archivo, indent=2, ensure_ascii=False)
+    return documento
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
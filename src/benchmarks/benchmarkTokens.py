@@ -0,0 +1,80 @@
+"""
+Micro-benchmark de emisión de tokens de LiveKit.
+
+Compara tokens por segundo del camino original (`api.AccessToken` + `api.VideoGrants`
+por cada token) contra el servicio de tokens con plantilla y firma precalculadas.
+
+Ejecuta: python -m src.benchmarks.benchmarkTokens [iteraciones]
+"""
+
+import datetime
+import os
+import sys
+import time
+import uuid
+
+# Credenciales de prueba si el entorno no define unas (deben fijarse antes de importar la configuración)
+os.environ.setdefault("LIVEKIT_API_KEY", "benchmark-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "benchmark-secret-de-al-menos-32-bytes")
+os.environ.setdefault("LIVEKIT_URL", "http://127.0.0.1:7880")
+
+from livekit import api
+
+from src.businessLayer.businessComponents.llamadas.configLiveKit import (
+    LIVEKIT_API_KEY,
+    LIVEKIT_API_SECRET,
+)
+from src.businessLayer.businessComponents.llamadas.servicioTokens import (
+    emitir_token,
+    emitir_tokens_lote,
+    generar_identidad,
+)
+
+
+def _token_original(nombre: str, nombre_sala: str) -> str:
+    identidad = f"{nombre}-{uuid.uuid4().hex[:8]}"
+    return (
+        api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
+        .with_identity(identidad)
+        .with_grants(
+            api.VideoGrants(
+                room_join=True,
+                room=nombre_sala,
+                can_publish=True,
+                can_subscribe=True,
+                can_publish_data=False,
+                can_publish_sources=["microphone"],
+            )
+        )
+        .with_ttl(datetime.timedelta(hours=1))
+        .to_jwt()
+    )
+
+
+def _token_servicio(nombre: str, nombre_sala: str) -> str:
+    return emitir_token(generar_identidad(nombre), nombre_sala)
+
+
+def _medir(nombre: str, funcion, iteraciones: int) -> float:
+    inicio = time.perf_counter()
+    funcion(iteraciones)
+    duracion = time.perf_counter() - inicio
+    tokens_por_segundo = iteraciones / duracion
+    print(f"{nombre:<28} {tokens_por_segundo:>12,.0f} tokens/s")
+    return tokens_por_segundo
+
+
+def main(iteraciones: int = 20000) -> None:
+    sala = "emergencia-benchmark"
+    # Calentar (carga del firmador, caches de módulos)
+    _token_original("Ana", sala)
+    _token_servicio("Ana", sala)
+
+    original = _medir("AccessToken (original)", lambda n: [_token_original("Ana", sala) for _ in range(n)], iteraciones)
+    servicio = _medir("servicioTokens", lambda n: [_token_servicio("Ana", sala) for _ in range(n)], iteraciones)
+    lote = _medir("servicioTokens (lote)", lambda n: emitir_tokens_lote([("Ana", sala)] * n), iteraciones)
+    print(f"Mejora: x{servicio / original:.2f} (individual), x{lote / original:.2f} (lote)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
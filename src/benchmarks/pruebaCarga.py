@@ -0,0 +1,487 @@
+"""
+Prueba de carga de extremo a extremo del flujo de emergencias.
+
+Levanta la API completa con uvicorn en un hilo aparte, sobre una base de datos de prueba,
+Redis en memoria (fakeredis) y un servicio de salas de LiveKit simulado (con latencia
+configurable), y la ejercita como lo harían los clientes reales:
+- N ambulancias conectadas a /ws/ambulancias/{id} enviando su ubicación GPS.
+- M solicitantes conectados a /ws/solicitantes/{id} que crean solicitudes y esperan
+  a que se les asigne una ambulancia.
+- K operadores conectados a /ws/operadores-emergencia que, al recibir una solicitud,
+  la valoran (/valorar-emergencia) y despachan la ambulancia sugerida (/despachar-ambulancia).
+
+La base por defecto es un SQLite temporal; con SQLite todas las sesiones comparten una
+conexión (StaticPool) y algunas escrituras concurrentes fallan. Para cifras representativas
+apunta CARGA_DATABASE_URL a un PostgreSQL vacío.
+
+Al final reporta, por flujo, el throughput y los percentiles de latencia medidos por los
+clientes, junto con el resumen por etapa que el servidor expone en /health.
+
+Ejecuta: python -m src.benchmarks.pruebaCarga [--ambulancias N] [--solicitantes M] [--operadores K]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional
+
+# Entorno aislado (debe fijarse antes de importar la aplicación). Nunca se usa el
+# DATABASE_URL del entorno para no sembrar datos de prueba en una base real.
+os.environ["DATABASE_URL"] = os.getenv("CARGA_DATABASE_URL") or (
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="resq-carga-"), "carga.db")
+)
+os.environ.setdefault("LIVEKIT_API_KEY", "benchmark-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "benchmark-secret-de-al-menos-32-bytes")
+os.environ.setdefault("LIVEKIT_URL", "http://127.0.0.1:7880")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import fakeredis
+import httpx
+import uvicorn
+import websockets
+from livekit import api
+
+from src.businessLayer.businessComponents.cache import configRedis
+from src.businessLayer.businessComponents.llamadas import configLiveKit
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import (
+    ClienteLiveKitProtegido,
+    get_circuito_livekit,
+)
+from src.businessLayer.businessEntities.ambulancia import Ambulancia
+from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
+from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
+from src.businessLayer.businessEntities.enums.tipoDocumento import TipoDocumento
+from src.businessLayer.businessEntities.operadorAmbulancia import OperadorAmbulancia
+from src.businessLayer.businessEntities.operadorEmergencia import OperadorEmergencia
+from src.businessLayer.businessEntities.solicitante import Solicitante
+from src.dataLayer.bd import inicializar_base_datos
+from src.dataLayer.dataAccesComponets import repositorioAmbulancia
+from src.dataLayer.dataAccesComponets import repositorioOperadorAmbulancia
+from src.dataLayer.dataAccesComponets import repositorioOperadorEmergencia
+from src.dataLayer.dataAccesComponets import repositorioSolicitantes
+from src.security.components.servicioAutenticacion import generar_token
+
+# Centro de la zona simulada (Bogotá) y radio aproximado en grados
+CENTRO = (4.7110, -74.0721)
+RADIO_GRADOS = 0.08
+
+PERCENTILES = (50, 95, 99)
+
+
+class _ServicioSalasSimulado:
+    """Sustituto del servicio `.room` de LiveKit: guarda las salas en memoria con latencia fija."""
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self._salas: Dict[str, api.Room] = {}
+
+    async def create_room(self, request: api.CreateRoomRequest) -> api.Room:
+        await asyncio.sleep(self.latencia)
+        sala = api.Room(
+            sid=f"RM_{len(self._salas)}",
+            name=request.name,
+            max_participants=request.max_participants,
+            empty_timeout=request.empty_timeout,
+            metadata=request.metadata,
+        )
+        self._salas[request.name] = sala
+        return sala
+
+    async def delete_room(self, request: api.DeleteRoomRequest) -> api.DeleteRoomResponse:
+        await asyncio.sleep(self.latencia)
+        self._salas.pop(request.room, None)
+        return api.DeleteRoomResponse()
+
+    async def list_rooms(self, request: api.ListRoomsRequest) -> api.ListRoomsResponse:
+        await asyncio.sleep(self.latencia)
+        salas = [s for n, s in self._salas.items() if not request.names or n in request.names]
+        return api.ListRoomsResponse(rooms=salas)
+
+    async def list_participants(self, request: api.ListParticipantsRequest) -> api.ListParticipantsResponse:
+        await asyncio.sleep(self.latencia)
+        return api.ListParticipantsResponse()
+
+    async def update_room_metadata(self, request: api.UpdateRoomMetadataRequest) -> api.Room:
+        await asyncio.sleep(self.latencia)
+        sala = self._salas.get(request.room) or api.Room(name=request.room)
+        sala.metadata = request.metadata
+        return sala
+
+
+class _ClienteLiveKitSimulado:
+    def __init__(self, latencia: float):
+        self.room = _ServicioSalasSimulado(latencia)
+
+
+def _preparar_dependencias(latencia_livekit: float) -> None:
+    """Sustituye Redis por fakeredis y LiveKit por el servicio simulado (pasando por el circuito)."""
+    configRedis._redis_client = fakeredis.FakeRedis(decode_responses=True)
+    configLiveKit._livekit_api = ClienteLiveKitProtegido(
+        _ClienteLiveKitSimulado(latencia_livekit), get_circuito_livekit()
+    )
+    configLiveKit._livekit_health_checked = True
+
+
+def _persona(prefijo: str, indice: int) -> dict:
+    return {
+        "nombre": prefijo,
+        "apellido": f"Carga{indice}",
+        "fechaNacimiento": date(1985, 1, 1),
+        "tipoDocumento": TipoDocumento.CEDULA,
+        "numeroDocumento": f"{prefijo[:3].upper()}{indice:06d}",
+    }
+
+
+def _sembrar_datos(ambulancias: int, solicitantes: int, operadores: int) -> dict:
+    """
+    Crea las entidades de la prueba y un token por cliente (sin usuarios en la base:
+    el token lleva id_persona y tipoUsuario, que es lo que validan los endpoints).
+    """
+    inicializar_base_datos()
+    tipos = list(TipoAmbulancia)
+    datos = {"ambulancias": [], "solicitantes": [], "operadores": []}
+
+    for i in range(ambulancias):
+        operador = repositorioOperadorAmbulancia.crear_operador(
+            OperadorAmbulancia(**_persona("Conductor", i), licencia=f"LIC{i:06d}")
+        )
+        ambulancia = repositorioAmbulancia.crear_ambulancia(Ambulancia(
+            placa=f"CRG{i:05d}",
+            tipoAmbulancia=tipos[i % len(tipos)],
+            id_operador_ambulancia=operador.id,
+        ))
+        token = generar_token({
+            "id": 100000 + i, "id_persona": operador.id,
+            "email": f"ambulancia{i}@carga.resq", "tipoUsuario": "OPERADOR_AMBULANCIA",
+        })
+        datos["ambulancias"].append((ambulancia.id, operador.id, token))
+
+    for i in range(solicitantes):
+        solicitante = repositorioSolicitantes.crear_solicitante(Solicitante(**_persona("Solicitante", i)))
+        token = generar_token({
+            "id": 200000 + i, "id_persona": solicitante.id,
+            "email": f"solicitante{i}@carga.resq", "tipoUsuario": "SOLICITANTE",
+        })
+        datos["solicitantes"].append((solicitante.id, token))
+
+    for i in range(operadores):
+        operador = repositorioOperadorEmergencia.crear_operador(
+            OperadorEmergencia(**_persona("Operador", i), disponibilidad=True)
+        )
+        token = generar_token({
+            "id": 300000 + i, "id_persona": operador.id,
+            "email": f"operador{i}@carga.resq", "tipoUsuario": "OPERADOR_EMERGENCIA",
+        })
+        datos["operadores"].append((operador.id, token))
+
+    return datos
+
+
+def _punto_aleatorio() -> dict:
+    return {
+        "latitud": CENTRO[0] + random.uniform(-RADIO_GRADOS, RADIO_GRADOS),
+        "longitud": CENTRO[1] + random.uniform(-RADIO_GRADOS, RADIO_GRADOS),
+    }
+
+
+class Mediciones:
+    """Latencias observadas por los clientes, agrupadas por flujo."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+
+    def observar(self, flujo: str, segundos: float) -> None:
+        self.latencias[flujo].append(segundos)
+
+    def error(self, flujo: str) -> None:
+        self.errores[flujo] += 1
+
+    def resumen(self, duracion: float) -> Dict[str, dict]:
+        resultado = {}
+        for flujo in sorted(set(self.latencias) | set(self.errores)):
+            valores = sorted(self.latencias.get(flujo, []))
+            fila = {
+                "cuenta": len(valores),
+                "errores": self.errores.get(flujo, 0),
+                "por_segundo": round(len(valores) / duracion, 2) if duracion else 0.0,
+            }
+            for p in PERCENTILES:
+                fila[f"p{p}_ms"] = round(_percentil(valores, p) * 1000, 2) if valores else None
+            fila["max_ms"] = round(valores[-1] * 1000, 2) if valores else None
+            resultado[flujo] = fila
+        return resultado
+
+
+def _percentil(ordenadas: List[float], p: int) -> float:
+    ultimo = len(ordenadas) - 1
+    return ordenadas[min(ultimo, int(round(p / 100 * ultimo)))]
+
+
+class PruebaCarga:
+    """Clientes simulados que comparten el estado necesario para medir los flujos cruzados."""
+
+    def __init__(self, base_url: str, datos: dict, args: argparse.Namespace):
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://", 1)
+        self.datos = datos
+        self.args = args
+        self.mediciones = Mediciones()
+        self.operador_de_ambulancia = {id_amb: id_op for id_amb, id_op, _ in datos["ambulancias"]}
+        # id_solicitante -> instante en que envió su solicitud en curso (una a la vez)
+        self.inicio_solicitud: Dict[int, float] = {}
+        # id_solicitante -> instante en que el operador pidió el despacho
+        self.inicio_despacho: Dict[int, float] = {}
+        # id_solicitante -> futuro que se resuelve cuando recibe la asignación
+        self.asignaciones: Dict[int, asyncio.Future] = {}
+        self.fin = asyncio.Event()
+        self.http: Optional[httpx.AsyncClient] = None
+
+    async def _post(self, flujo: str, ruta: str, cuerpo: dict) -> Optional[dict]:
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self.http.post(ruta, json=cuerpo)
+        except httpx.HTTPError:
+            self.mediciones.error(flujo)
+            return None
+        if respuesta.status_code >= 400:
+            self.mediciones.error(flujo)
+            return None
+        self.mediciones.observar(flujo, time.perf_counter() - inicio)
+        return respuesta.json()
+
+    async def ambulancia(self, id_ambulancia: int, token: str) -> None:
+        """Envía su ubicación cada `intervalo_gps` segundos y mide el tiempo hasta el acuse."""
+        url = f"{self.ws_url}/ws/ambulancias/{id_ambulancia}?token={token}"
+        async with websockets.connect(url, max_queue=None) as ws:
+            json.loads(await ws.recv())  # bienvenida
+            posicion = _punto_aleatorio()
+            acuses: asyncio.Queue = asyncio.Queue()
+
+            async def _recibir():
+                async for mensaje in ws:
+                    tipo = json.loads(mensaje).get("type")
+                    if tipo in ("ubicacion_recibida", "error"):
+                        await acuses.put(tipo)
+                    elif tipo == "orden_despacho":
+                        orden = json.loads(mensaje)["data"]
+                        inicio = self.inicio_despacho.pop(orden["solicitante"]["id"], None)
+                        if inicio is not None:
+                            self.mediciones.observar("despacho.orden_recibida", time.perf_counter() - inicio)
+
+            receptor = asyncio.create_task(_recibir())
+            try:
+                while not self.fin.is_set():
+                    posicion["latitud"] += random.uniform(-0.0005, 0.0005)
+                    posicion["longitud"] += random.uniform(-0.0005, 0.0005)
+                    inicio = time.perf_counter()
+                    await ws.send(json.dumps({"ubicacion": posicion}))
+                    try:
+                        tipo = await asyncio.wait_for(acuses.get(), timeout=self.args.timeout)
+                    except asyncio.TimeoutError:
+                        self.mediciones.error("ambulancia.gps")
+                        continue
+                    if tipo == "error":
+                        self.mediciones.error("ambulancia.gps")
+                    else:
+                        self.mediciones.observar("ambulancia.gps", time.perf_counter() - inicio)
+                    try:
+                        await asyncio.wait_for(self.fin.wait(), timeout=self.args.intervalo_gps)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                receptor.cancel()
+
+    async def solicitante(self, id_solicitante: int, token: str) -> None:
+        """Crea `solicitudes` solicitudes seguidas y mide hasta recibir la ambulancia asignada."""
+        url = f"{self.ws_url}/ws/solicitantes/{id_solicitante}?token={token}"
+        async with websockets.connect(url, max_queue=None) as ws:
+            json.loads(await ws.recv())  # bienvenida
+            loop = asyncio.get_running_loop()
+
+            async def _recibir():
+                async for mensaje in ws:
+                    tipo = json.loads(mensaje).get("type")
+                    futuro = self.asignaciones.get(id_solicitante)
+                    if tipo == "EstadoEmergencia.ASIGNADA" and futuro is not None and not futuro.done():
+                        futuro.set_result(time.perf_counter())
+
+            receptor = asyncio.create_task(_recibir())
+            try:
+                for _ in range(self.args.solicitudes):
+                    if self.fin.is_set():
+                        break
+                    self.asignaciones[id_solicitante] = loop.create_future()
+                    inicio = self.inicio_solicitud[id_solicitante] = time.perf_counter()
+                    respuesta = await self._post(
+                        "solicitud.crear",
+                        "/solicitudes/solicitar-ambulancia",
+                        {"id_solicitante": id_solicitante, "ubicacion": _punto_aleatorio()},
+                    )
+                    if respuesta is None:
+                        continue
+                    try:
+                        asignada = await asyncio.wait_for(
+                            self.asignaciones[id_solicitante], timeout=self.args.timeout
+                        )
+                        self.mediciones.observar("extremo_a_extremo", asignada - inicio)
+                    except asyncio.TimeoutError:
+                        self.mediciones.error("extremo_a_extremo")
+            finally:
+                receptor.cancel()
+
+    async def operador(self, indice: int, id_operador: int, token: str) -> None:
+        """
+        Atiende las solicitudes que le corresponden (reparto por id de solicitud entre
+        los K operadores, ya que todos reciben el broadcast): valora y despacha.
+        """
+        url = f"{self.ws_url}/ws/operadores-emergencia?token={token}"
+        total = len(self.datos["operadores"])
+        pendientes = set()
+        async with websockets.connect(url, max_queue=None) as ws:
+            json.loads(await ws.recv())  # bienvenida
+            async for mensaje in ws:
+                evento = json.loads(mensaje)
+                if evento.get("type") != "nueva_solicitud":
+                    continue
+                solicitud = evento["data"]
+                inicio = self.inicio_solicitud.get(solicitud["solicitante"]["id"])
+                if inicio is not None:
+                    self.mediciones.observar("solicitud.notificada", time.perf_counter() - inicio)
+                if solicitud["id"] % total != indice:
+                    continue
+                tarea = asyncio.create_task(self._atender(id_operador, solicitud))
+                pendientes.add(tarea)
+                tarea.add_done_callback(pendientes.discard)
+
+    async def _atender(self, id_operador: int, solicitud: dict) -> None:
+        await asyncio.sleep(self.args.tiempo_valoracion)
+        valoracion = await self._post("operador.valorar", "/valorar-emergencia", {
+            "solicitud_id": solicitud["id"],
+            "tipoAmbulancia": random.choice(list(TipoAmbulancia)).value,
+            "nivelPrioridad": NivelPrioridad.ALTA.value,
+            "descripcion": "Prueba de carga",
+            "id_operador": id_operador,
+            "solicitante_id": solicitud["solicitante"]["id"],
+        })
+        if valoracion is None:
+            return
+        id_ambulancia = valoracion.get("id_ambulancia_cercana")
+        if id_ambulancia is None:
+            self.mediciones.error("operador.sin_ambulancia")
+            return
+        self.inicio_despacho[solicitud["solicitante"]["id"]] = time.perf_counter()
+        await self._post("operador.despachar", "/despachar-ambulancia", {
+            "emergencia_id": valoracion["emergencia"]["id"],
+            "ambulancia_id": id_ambulancia,
+            "operador_ambulancia_id": self.operador_de_ambulancia[id_ambulancia],
+            "operador_emergencia_id": id_operador,
+        })
+
+    async def ejecutar(self) -> dict:
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.args.timeout) as http:
+            self.http = http
+            fondo = [
+                asyncio.create_task(self.operador(i, id_op, token))
+                for i, (id_op, token) in enumerate(self.datos["operadores"])
+            ]
+            fondo += [
+                asyncio.create_task(self.ambulancia(id_amb, token))
+                for id_amb, _, token in self.datos["ambulancias"]
+            ]
+            # Dejar que la flota reporte su primera ubicación antes de recibir solicitudes
+            await asyncio.sleep(self.args.intervalo_gps + 0.2)
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(
+                self.solicitante(id_sol, token) for id_sol, token in self.datos["solicitantes"]
+            ))
+            duracion = time.perf_counter() - inicio
+
+            self.fin.set()
+            for tarea in fondo:
+                tarea.cancel()
+            await asyncio.gather(*fondo, return_exceptions=True)
+
+            salud = (await http.get("/health")).json()
+        return {
+            "duracion_s": round(duracion, 3),
+            "flujos": self.mediciones.resumen(duracion),
+            "etapas_servidor": salud.get("latencias", {}),
+        }
+
+
+def _iniciar_servidor(puerto: int) -> uvicorn.Server:
+    """Arranca la API en un hilo propio (su propio event loop) y espera a que acepte conexiones."""
+    from src.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=puerto, log_level="warning", access_log=False)
+    servidor = uvicorn.Server(config)
+    hilo = threading.Thread(target=servidor.run, name="servidor-carga", daemon=True)
+    hilo.start()
+    while not servidor.started:
+        if not hilo.is_alive():
+            raise RuntimeError("El servidor no pudo iniciar")
+        time.sleep(0.05)
+    servidor.hilo = hilo
+    return servidor
+
+
+def _imprimir(resultado: dict) -> None:
+    columnas = ["cuenta", "errores", "por_segundo"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+    print(f"\nDuración de la fase de solicitudes: {resultado['duracion_s']} s\n")
+    print(f"{'flujo':<26}" + "".join(f"{c:>12}" for c in columnas))
+    for flujo, fila in resultado["flujos"].items():
+        print(f"{flujo:<26}" + "".join(f"{str(fila[c]):>12}" for c in columnas))
+
+    print("\nEtapas medidas en el servidor (ms):")
+    print(f"{'etapa':<34}{'cuenta':>10}{'errores':>10}{'p50_ms':>10}{'p99_ms':>10}")
+    for etapa, fila in resultado["etapas_servidor"].items():
+        print(
+            f"{etapa:<34}{fila['cuenta']:>10}{fila['errores']:>10}"
+            f"{str(fila['p50_ms']):>10}{str(fila['p99_ms']):>10}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Prueba de carga de extremo a extremo de ResQ")
+    parser.add_argument("--ambulancias", type=int, default=20, help="Ambulancias enviando GPS (N)")
+    parser.add_argument("--solicitantes", type=int, default=10, help="Solicitantes concurrentes (M)")
+    parser.add_argument("--operadores", type=int, default=3, help="Operadores de emergencia (K)")
+    parser.add_argument("--solicitudes", type=int, default=3, help="Solicitudes por solicitante")
+    parser.add_argument("--intervalo-gps", type=float, default=1.0, help="Segundos entre ubicaciones")
+    parser.add_argument("--tiempo-valoracion", type=float, default=0.0, help="Pausa del operador antes de valorar")
+    parser.add_argument("--latencia-livekit", type=float, default=0.02, help="Latencia simulada de LiveKit (s)")
+    parser.add_argument("--timeout", type=float, default=15.0, help="Espera máxima por respuesta (s)")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--json", help="Ruta donde guardar el resultado en JSON")
+    args = parser.parse_args(argv)
+
+    _preparar_dependencias(args.latencia_livekit)
+    datos = _sembrar_datos(args.ambulancias, args.solicitantes, args.operadores)
+    servidor = _iniciar_servidor(args.puerto)
+    try:
+        prueba = PruebaCarga(f"http://127.0.0.1:{args.puerto}", datos, args)
+        resultado = asyncio.run(prueba.ejecutar())
+    finally:
+        servidor.should_exit = True
+        servidor.hilo.join(timeout=10)
+
+    resultado["parametros"] = vars(args)
+    _imprimir(resultado)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    return resultado
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,230 @@
+"""
+Cache de lectura (read-through) para entidades consultadas por ID.
+
+Mantiene en memoria del proceso las entidades Pydantic que se consultan una y otra vez
+durante el ciclo de vida de una emergencia (solicitantes, operadores, ubicaciones),
+con expiración por TTL y desalojo LRU. Opcionalmente usa Redis como segundo nivel
+compartido entre workers.
+
+Los repositorios invalidan (o reescriben) la entrada al actualizar o eliminar, por lo
+que el proceso que escribe nunca lee un valor viejo. Otros workers pueden ver el valor
+anterior como máximo durante el TTL del primer nivel.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Optional, Tuple, Type, TypeVar
+from dotenv import load_dotenv
+from pydantic import BaseModel
+import redis
+
+from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Configuración del cache de entidades
+CACHE_ENTIDADES_TTL: float = float(os.getenv("CACHE_ENTIDADES_TTL", "30"))
+CACHE_ENTIDADES_MAX: int = int(os.getenv("CACHE_ENTIDADES_MAX", "2048"))
+# Segundo nivel en Redis (compartido entre workers); deshabilitado por defecto
+CACHE_ENTIDADES_REDIS: bool = os.getenv("CACHE_ENTIDADES_REDIS", "false").lower() in ("true", "1", "yes")
+CACHE_ENTIDADES_REDIS_TTL: int = int(os.getenv("CACHE_ENTIDADES_REDIS_TTL", "300"))
+
+T = TypeVar("T", bound=BaseModel)
+
+# Registro de caches creados (para exponer estadísticas)
+_caches: Dict[str, "CacheEntidades"] = {}
+
+
+class CacheEntidades(Generic[T]):
+    """
+    Cache TTL + LRU de entidades Pydantic indexadas por ID entero.
+    Es seguro entre hilos (los endpoints síncronos de FastAPI corren en un threadpool).
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        modelo: Type[T],
+        max_entradas: int = CACHE_ENTIDADES_MAX,
+        ttl_segundos: float = CACHE_ENTIDADES_TTL,
+        usar_redis: bool = CACHE_ENTIDADES_REDIS,
+    ):
+        """
+        Args:
+            nombre: Nombre del cache (se usa en las keys de Redis y en las estadísticas)
+            modelo: Clase Pydantic de la entidad cacheada
+            max_entradas: Número máximo de entradas en memoria antes de desalojar (LRU)
+            ttl_segundos: Tiempo de vida de cada entrada en memoria
+            usar_redis: Si True, usa Redis como segundo nivel compartido
+        """
+        self.nombre = nombre
+        self.modelo = modelo
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.usar_redis = usar_redis
+        # id -> (instante de expiración, entidad)
+        self._entradas: "OrderedDict[int, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Contadores
+        self.aciertos = 0
+        self.aciertos_redis = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+        _caches[nombre] = self
+
+    def _get_key_redis(self, clave: int) -> str:
+        """
+        Genera la key de Redis para una entidad.
+
+        Returns:
+            Key de Redis en formato: cache:{nombre}:{clave}
+        """
+        return f"cache:{self.nombre}:{clave}"
+
+    def _leer_memoria(self, clave: int) -> Optional[T]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            expira, entidad = entrada
+            if expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entidad
+
+    def _escribir_memoria(self, clave: int, entidad: T) -> None:
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl_segundos, entidad)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def _leer_redis(self, clave: int) -> Optional[T]:
+        if not self.usar_redis:
+            return None
+        try:
+            datos_json = get_redis_client().get(self._get_key_redis(clave))
+            if datos_json is None:
+                return None
+            return self.modelo.model_validate_json(datos_json)
+        except (redis.RedisError, ValueError):
+            # Redis es solo un acelerador: ante cualquier fallo se consulta la BD
+            return None
+
+    def _escribir_redis(self, clave: int, entidad: T) -> None:
+        if not self.usar_redis:
+            return
+        try:
+            get_redis_client().set(
+                self._get_key_redis(clave),
+                entidad.model_dump_json(),
+                ex=CACHE_ENTIDADES_REDIS_TTL,
+            )
+        except redis.RedisError:
+            pass
+
+    def _borrar_redis(self, clave: int) -> None:
+        if not self.usar_redis:
+            return
+        try:
+            get_redis_client().delete(self._get_key_redis(clave))
+        except redis.RedisError:
+            pass
+
+    def obtener(self, clave: int, cargador: Callable[[int], Optional[T]]) -> Optional[T]:
+        """
+        Obtiene una entidad del cache o, si no está, la carga con `cargador` y la guarda.
+        Los resultados None (no encontrado) no se cachean.
+
+        Retorna una copia para que las modificaciones del llamador no alteren el cache.
+
+        Args:
+            clave: ID de la entidad
+            cargador: Función que consulta la fuente de datos (BD) por ID
+
+        Returns:
+            Copia de la entidad, o None si no existe
+        """
+        entidad = self._leer_memoria(clave)
+        if entidad is not None:
+            self.aciertos += 1
+            return entidad.model_copy(deep=True)
+
+        entidad = self._leer_redis(clave)
+        if entidad is not None:
+            self.aciertos_redis += 1
+            self._escribir_memoria(clave, entidad)
+            return entidad.model_copy(deep=True)
+
+        self.fallos += 1
+        entidad = cargador(clave)
+        if entidad is None:
+            return None
+        self.guardar(clave, entidad)
+        return entidad
+
+    def guardar(self, clave: int, entidad: T) -> None:
+        """
+        Escribe una entidad en el cache (write-through tras crear/actualizar en la BD).
+
+        Args:
+            clave: ID de la entidad
+            entidad: Entidad con los datos ya persistidos
+        """
+        copia = entidad.model_copy(deep=True)
+        self._escribir_memoria(clave, copia)
+        self._escribir_redis(clave, copia)
+
+    def invalidar(self, clave: int) -> None:
+        """
+        Elimina una entidad del cache (memoria y Redis).
+
+        Args:
+            clave: ID de la entidad
+        """
+        with self._lock:
+            self._entradas.pop(clave, None)
+        self._borrar_redis(clave)
+        self.invalidaciones += 1
+
+    def limpiar(self) -> None:
+        """Vacía el cache en memoria del proceso (no toca Redis)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores del cache.
+
+        Returns:
+            Diccionario con tamaño, aciertos, fallos, desalojos e invalidaciones
+        """
+        consultas = self.aciertos + self.aciertos_redis + self.fallos
+        return {
+            "tamano": len(self._entradas),
+            "max_entradas": self.max_entradas,
+            "ttl_segundos": self.ttl_segundos,
+            "redis": self.usar_redis,
+            "aciertos": self.aciertos,
+            "aciertos_redis": self.aciertos_redis,
+            "fallos": self.fallos,
+            "tasa_aciertos": round((self.aciertos + self.aciertos_redis) / consultas, 4) if consultas else 0.0,
+            "desalojos": self.desalojos,
+            "invalidaciones": self.invalidaciones,
+        }
+
+
+def obtener_estadisticas_caches() -> Dict[str, dict]:
+    """
+    Retorna las estadísticas de todos los caches de entidades registrados.
+
+    Returns:
+        Diccionario {nombre_cache: estadisticas}
+    """
+    return {nombre: cache.estadisticas() for nombre, cache in _caches.items()}
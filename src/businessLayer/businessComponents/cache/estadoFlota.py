@@ -0,0 +1,389 @@
+"""
+Estado en vivo de la flota: disponibilidad de las ambulancias en Redis.
+
+La disponibilidad cambia con cada conexión y desconexión del WebSocket de la ambulancia
+(enlaces móviles inestables) y con cada despacho. En lugar de escribir la base de datos
+en cada cambio, el valor vive en Redis junto a las ubicaciones y se vuelca a la base de
+datos por lotes en segundo plano:
+
+- flota:conectadas      set de ambulancias con el WebSocket abierto (en cualquier worker)
+- flota:asignadas       hash id_ambulancia -> id_emergencia de las ambulancias despachadas
+- flota:fuera_servicio  set de ambulancias que un operador marcó como no disponibles
+                        (PUT /ambulancias/{id} con disponibilidad=false)
+- flota:disponibilidad  hash id_ambulancia -> "1"/"0": conectada, no asignada y en servicio;
+                        es lo que leen la búsqueda de la más cercana y la validación del despacho
+- flota:pendientes      set de ambulancias cuyo valor aún no está en la base de datos
+- flota:presencia:{id}  clave con TTL que el worker que tiene el WebSocket renueva
+
+Un barrido periódico concilia el estado con los sockets: renueva la presencia de las
+ambulancias conectadas a este worker (y las vuelve a marcar conectadas si faltaban), y
+marca desconectadas, borrando su ubicación, las que ya no tienen presencia porque el
+worker que las tenía cayó sin correr el handler de desconexión.
+
+Una ambulancia despachada no vuelve a estar disponible al reconectarse; solo al liberarse
+(la emergencia terminó). El volcado toma los pendientes con SPOP, así que con varios
+workers cada cambio se escribe una sola vez; si la escritura falla se reencolan.
+Si Redis no responde, el cambio se escribe directamente en la base de datos.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+import redis
+from dotenv import load_dotenv
+from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.cache.servicioUbicacionCache import ServicioUbicacionCache
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+from src.dataLayer.dataAccesComponets.repositorioAmbulancia import actualizar_disponibilidad_ambulancias
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre volcados de la disponibilidad a la base de datos
+FLOTA_VOLCADO_SEGUNDOS: float = float(os.getenv("FLOTA_VOLCADO_SEGUNDOS", "5"))
+# Máximo de ambulancias escritas por transacción en cada volcado
+FLOTA_VOLCADO_LOTE: int = int(os.getenv("FLOTA_VOLCADO_LOTE", "500"))
+# Intervalo del barrido que concilia las ambulancias conectadas con los sockets
+FLOTA_BARRIDO_SEGUNDOS: float = float(os.getenv("FLOTA_BARRIDO_SEGUNDOS", "15"))
+
+CLAVE_CONECTADAS = "flota:conectadas"
+CLAVE_ASIGNADAS = "flota:asignadas"
+CLAVE_FUERA_SERVICIO = "flota:fuera_servicio"
+CLAVE_DISPONIBILIDAD = "flota:disponibilidad"
+CLAVE_PENDIENTES = "flota:pendientes"
+PREFIJO_PRESENCIA = "flota:presencia:"
+
+
+class EstadoFlota:
+    """
+    Disponibilidad de las ambulancias en Redis con volcado por lotes a la base de datos.
+    """
+
+    def __init__(
+        self,
+        intervalo: float = FLOTA_VOLCADO_SEGUNDOS,
+        lote: int = FLOTA_VOLCADO_LOTE,
+        intervalo_barrido: float = FLOTA_BARRIDO_SEGUNDOS,
+    ):
+        self.intervalo = intervalo
+        self.lote = lote
+        self.intervalo_barrido = intervalo_barrido
+        # La presencia sobrevive a dos barridos perdidos del worker dueño
+        self.ttl_presencia = max(1, int(round(intervalo_barrido * 3)))
+        self._conectadas_locales: Optional[Callable[[], Iterable[int]]] = None
+        self._tarea_volcado: Optional[asyncio.Task] = None
+        self._tarea_barrido: Optional[asyncio.Task] = None
+
+        # Contadores
+        self.cambios = 0
+        self.volcadas = 0
+        self.volcados = 0
+        self.errores_volcado = 0
+        self.escrituras_directas = 0
+        self.barridos = 0
+        self.desconectadas_por_barrido = 0
+        self.reconectadas_por_barrido = 0
+
+    def _guardar(
+        self,
+        id_ambulancia: int,
+        conectada: Optional[bool] = None,
+        id_emergencia: Optional[int] = None,
+        liberar: bool = False,
+        en_servicio: Optional[bool] = None,
+    ) -> bool:
+        """
+        Aplica el cambio, recalcula la disponibilidad de la ambulancia y la marca como
+        pendiente de volcar. Retorna la disponibilidad resultante.
+
+        La lectura del estado y la escritura de la disponibilidad forman una sola
+        transacción con WATCH: si otro worker cambia las ambulancias conectadas,
+        asignadas o fuera de servicio entre la lectura y el EXEC, se reintenta (una conexión no puede
+        publicar como disponible una ambulancia que otro worker acaba de asignar).
+        """
+        presencia = f"{PREFIJO_PRESENCIA}{id_ambulancia}"
+
+        def aplicar(pipe: redis.client.Pipeline) -> bool:
+            # Tras WATCH el pipeline ejecuta los comandos de inmediato
+            esta_conectada = bool(pipe.sismember(CLAVE_CONECTADAS, id_ambulancia))
+            esta_asignada = bool(pipe.hexists(CLAVE_ASIGNADAS, id_ambulancia))
+            esta_fuera_servicio = bool(pipe.sismember(CLAVE_FUERA_SERVICIO, id_ambulancia))
+            if conectada is not None:
+                esta_conectada = conectada
+            if id_emergencia is not None:
+                esta_asignada = True
+            elif liberar:
+                esta_asignada = False
+            if en_servicio is not None:
+                esta_fuera_servicio = not en_servicio
+            disponible = esta_conectada and not esta_asignada and not esta_fuera_servicio
+
+            pipe.multi()
+            if conectada is True:
+                pipe.sadd(CLAVE_CONECTADAS, id_ambulancia)
+                pipe.set(presencia, 1, ex=self.ttl_presencia)
+            elif conectada is False:
+                pipe.srem(CLAVE_CONECTADAS, id_ambulancia)
+                pipe.delete(presencia)
+            if id_emergencia is not None:
+                pipe.hset(CLAVE_ASIGNADAS, id_ambulancia, id_emergencia)
+            elif liberar:
+                pipe.hdel(CLAVE_ASIGNADAS, id_ambulancia)
+            if en_servicio is True:
+                pipe.srem(CLAVE_FUERA_SERVICIO, id_ambulancia)
+            elif en_servicio is False:
+                pipe.sadd(CLAVE_FUERA_SERVICIO, id_ambulancia)
+            pipe.hset(CLAVE_DISPONIBILIDAD, id_ambulancia, "1" if disponible else "0")
+            pipe.sadd(CLAVE_PENDIENTES, id_ambulancia)
+            return disponible
+
+        disponible = get_redis_client().transaction(
+            aplicar, CLAVE_CONECTADAS, CLAVE_ASIGNADAS, CLAVE_FUERA_SERVICIO, value_from_callable=True
+        )
+        self.cambios += 1
+        return disponible
+
+    def _cambiar(self, id_ambulancia: int, disponible_sin_redis: bool, **cambio) -> bool:
+        try:
+            return self._guardar(id_ambulancia, **cambio)
+        except redis.RedisError as e:
+            logger.warning(
+                "Redis no disponible para el estado de la ambulancia %s, se escribe en la base de datos: %s",
+                id_ambulancia, e
+            )
+            actualizar_disponibilidad_ambulancias({id_ambulancia: disponible_sin_redis})
+            self.escrituras_directas += 1
+            return disponible_sin_redis
+
+    def marcar_conectada(self, id_ambulancia: int) -> bool:
+        """La ambulancia abrió su WebSocket: queda disponible si no está despachada."""
+        return self._cambiar(id_ambulancia, True, conectada=True)
+
+    def marcar_desconectada(self, id_ambulancia: int) -> bool:
+        """La ambulancia cerró su WebSocket: deja de estar disponible."""
+        return self._cambiar(id_ambulancia, False, conectada=False)
+
+    def asignar(self, id_ambulancia: int, id_emergencia: int) -> bool:
+        """La ambulancia fue despachada a la emergencia: deja de estar disponible."""
+        return self._cambiar(id_ambulancia, False, id_emergencia=id_emergencia)
+
+    def liberar(self, id_ambulancia: int) -> bool:
+        """La emergencia terminó: la ambulancia vuelve a estar disponible si está conectada."""
+        return self._cambiar(id_ambulancia, True, liberar=True)
+
+    def fijar_en_servicio(self, id_ambulancia: int, en_servicio: bool) -> bool:
+        """
+        Un operador marca la ambulancia como fuera de servicio (o la devuelve al servicio).
+        Fuera de servicio nunca está disponible; en servicio vuelve a estarlo solo si está
+        conectada y no despachada. Retorna la disponibilidad resultante.
+        """
+        return self._cambiar(id_ambulancia, en_servicio, en_servicio=en_servicio)
+
+    def disponibilidades(self, ids: Iterable[int]) -> Dict[int, Optional[bool]]:
+        """
+        Lee en una sola consulta la disponibilidad de varias ambulancias.
+
+        Returns:
+            Diccionario id -> True/False, o None si la ambulancia no tiene estado en Redis
+            (no se ha conectado desde que se vació Redis) o Redis no está disponible;
+            en ese caso quien consulta usa la disponibilidad de la base de datos
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        try:
+            valores = get_redis_client().hmget(CLAVE_DISPONIBILIDAD, ids)
+        except (redis.RedisError, ValueError) as e:
+            log_muestreado(
+                logger, logging.WARNING, "estado_flota_lectura",
+                "Redis no disponible para leer la disponibilidad de la flota, se usa la base de datos: %s", e
+            )
+            return {id_amb: None for id_amb in ids}
+        return {id_amb: None if valor is None else valor == "1" for id_amb, valor in zip(ids, valores)}
+
+    def esta_disponible(self, id_ambulancia: int) -> Optional[bool]:
+        """Disponibilidad de la ambulancia, o None si no tiene estado en Redis o Redis no responde."""
+        return self.disponibilidades([id_ambulancia])[id_ambulancia]
+
+    def emergencia_asignada(self, id_ambulancia: int) -> Optional[int]:
+        """ID de la emergencia a la que está despachada la ambulancia, o None."""
+        valor = get_redis_client().hget(CLAVE_ASIGNADAS, id_ambulancia)
+        return int(valor) if valor is not None else None
+
+    def volcar(self) -> int:
+        """
+        Escribe en la base de datos la disponibilidad de las ambulancias pendientes,
+        por lotes de `lote`. Retorna cuántas se escribieron.
+        """
+        client = get_redis_client()
+        total = 0
+        while True:
+            ids: List[str] = client.spop(CLAVE_PENDIENTES, self.lote) or []
+            if not ids:
+                return total
+            valores = client.hmget(CLAVE_DISPONIBILIDAD, ids)
+            disponibilidades = {
+                int(id_amb): valor == "1" for id_amb, valor in zip(ids, valores) if valor is not None
+            }
+            try:
+                actualizar_disponibilidad_ambulancias(disponibilidades)
+            except Exception:
+                # Reencolar para el siguiente volcado
+                client.sadd(CLAVE_PENDIENTES, *ids)
+                raise
+            total += len(disponibilidades)
+            self.volcadas += len(disponibilidades)
+            self.volcados += 1
+            if len(ids) < self.lote:
+                return total
+
+    def barrer(self, conectadas_locales: Iterable[int] = ()) -> dict:
+        """
+        Concilia las ambulancias conectadas con los sockets abiertos.
+
+        Args:
+            conectadas_locales: Ambulancias con el WebSocket abierto en este worker
+
+        Returns:
+            Diccionario con las ambulancias reconectadas y desconectadas en el barrido
+        """
+        client = get_redis_client()
+        locales = set(conectadas_locales)
+
+        # Renovar la presencia de las locales y detectar las que faltan en el conjunto
+        if locales:
+            orden = sorted(locales)
+            with client.pipeline(transaction=False) as pipe:
+                for id_amb in orden:
+                    pipe.set(f"{PREFIJO_PRESENCIA}{id_amb}", 1, ex=self.ttl_presencia)
+                    pipe.sismember(CLAVE_CONECTADAS, id_amb)
+                resultados = pipe.execute()
+            faltantes = [id_amb for id_amb, presente in zip(orden, resultados[1::2]) if not presente]
+        else:
+            faltantes = []
+        for id_amb in faltantes:
+            self.marcar_conectada(id_amb)
+
+        # Desconectar las que ningún worker renueva
+        miembros = [int(m) for m in client.smembers(CLAVE_CONECTADAS)]
+        candidatas = [id_amb for id_amb in miembros if id_amb not in locales]
+        huerfanas: List[int] = []
+        if candidatas:
+            with client.pipeline(transaction=False) as pipe:
+                for id_amb in candidatas:
+                    pipe.exists(f"{PREFIJO_PRESENCIA}{id_amb}")
+                huerfanas = [id_amb for id_amb, existe in zip(candidatas, pipe.execute()) if not existe]
+        for id_amb in huerfanas:
+            self.marcar_desconectada(id_amb)
+            ServicioUbicacionCache.eliminar_ubicacion(id_amb)
+            logger.info("Ambulancia %s marcada como desconectada: sin presencia de ningún worker", id_amb)
+
+        self.barridos += 1
+        self.reconectadas_por_barrido += len(faltantes)
+        self.desconectadas_por_barrido += len(huerfanas)
+        return {"reconectadas": faltantes, "desconectadas": huerfanas}
+
+    async def _barrer_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_barrido)
+            try:
+                locales = list(self._conectadas_locales()) if self._conectadas_locales else []
+                await asyncio.to_thread(self.barrer, locales)
+            except Exception as e:
+                logger.warning("No se pudo barrer el estado de la flota: %s", e)
+
+    async def _volcar_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await asyncio.to_thread(self.volcar)
+            except Exception as e:
+                self.errores_volcado += 1
+                logger.warning("No se pudo volcar la disponibilidad de la flota: %s", e)
+
+    async def iniciar(self, conectadas_locales: Optional[Callable[[], Iterable[int]]] = None) -> None:
+        """
+        Arranca el volcado y el barrido periódicos en segundo plano.
+
+        Args:
+            conectadas_locales: Retorna las ambulancias con el WebSocket abierto en este worker
+        """
+        if conectadas_locales is not None:
+            self._conectadas_locales = conectadas_locales
+        if self._tarea_volcado is None or self._tarea_volcado.done():
+            self._tarea_volcado = asyncio.create_task(self._volcar_periodicamente())
+        if self._tarea_barrido is None or self._tarea_barrido.done():
+            self._tarea_barrido = asyncio.create_task(self._barrer_periodicamente())
+
+    async def detener(self) -> None:
+        """Detiene las tareas periódicas y vuelca lo pendiente."""
+        for tarea in (self._tarea_volcado, self._tarea_barrido):
+            if tarea is not None:
+                tarea.cancel()
+                try:
+                    await tarea
+                except asyncio.CancelledError:
+                    pass
+        self._tarea_volcado = None
+        self._tarea_barrido = None
+        try:
+            await asyncio.to_thread(self.volcar)
+        except Exception as e:
+            logger.warning("No se pudo volcar la disponibilidad de la flota al detener: %s", e)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna el estado de la flota y los contadores del volcado.
+
+        Returns:
+            Diccionario con conectadas, asignadas, disponibles, pendientes y contadores
+        """
+        resultado = {
+            "cambios": self.cambios,
+            "volcadas": self.volcadas,
+            "volcados": self.volcados,
+            "errores_volcado": self.errores_volcado,
+            "escrituras_directas": self.escrituras_directas,
+            "barridos": self.barridos,
+            "reconectadas_por_barrido": self.reconectadas_por_barrido,
+            "desconectadas_por_barrido": self.desconectadas_por_barrido,
+        }
+        try:
+            client = get_redis_client()
+            with client.pipeline(transaction=False) as pipe:
+                pipe.scard(CLAVE_CONECTADAS)
+                pipe.hlen(CLAVE_ASIGNADAS)
+                pipe.scard(CLAVE_FUERA_SERVICIO)
+                pipe.hvals(CLAVE_DISPONIBILIDAD)
+                pipe.scard(CLAVE_PENDIENTES)
+                conectadas, asignadas, fuera_servicio, valores, pendientes = pipe.execute()
+            resultado.update({
+                "conectadas": conectadas,
+                "asignadas": asignadas,
+                "fuera_servicio": fuera_servicio,
+                "disponibles": sum(1 for v in valores if v == "1"),
+                "pendientes": pendientes,
+            })
+        except redis.RedisError as e:
+            resultado["error"] = str(e)
+        return resultado
+
+
+# Instancia global del estado de la flota (singleton pattern)
+_estado_flota: Optional[EstadoFlota] = None
+
+
+def get_estado_flota() -> EstadoFlota:
+    """
+    Obtiene la instancia global del estado en vivo de la flota.
+
+    Returns:
+        Instancia de EstadoFlota
+    """
+    global _estado_flota
+    if _estado_flota is None:
+        _estado_flota = EstadoFlota()
+    return _estado_flota
@@ -0,0 +1,309 @@
+"""
+Historial de ubicaciones de las ambulancias (trayectorias).
+
+Cada ubicación recibida pasa por un submuestreo: se guarda si pasaron al menos
+HISTORIAL_INTERVALO_SEGUNDOS o la ambulancia se movió al menos HISTORIAL_DISTANCIA_METROS
+desde el último punto guardado. Los puntos guardados se agregan con XADD a un Redis
+Stream por ambulancia (historial:ambulancia:{id}, recortado a HISTORIAL_MAXLEN), de modo
+que la ingesta solo paga una escritura en Redis.
+
+Un volcado en segundo plano lee los streams con un grupo de consumidores (cada punto lo
+vuelca un solo worker), los inserta por lotes en la tabla historial_ubicaciones
+(particionada por día en PostgreSQL) y los confirma con XACK. Si la inserción falla, los
+puntos quedan pendientes y se reintentan; los pendientes de un worker caído los reclama
+otro con XAUTOCLAIM. Una vez al día se eliminan las particiones más viejas que
+HISTORIAL_RETENCION_DIAS.
+
+Las consultas por rango combinan la base de datos con los puntos del stream que aún
+no se volcaron.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import socket
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+import redis
+from dotenv import load_dotenv
+from src.businessLayer.businessEntities.puntoTrayectoria import PuntoTrayectoria
+from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.dataLayer.dataAccesComponets.repositorioHistorialUbicaciones import (
+    insertar_puntos,
+    obtener_trayectoria,
+    eliminar_particiones_anteriores,
+)
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Submuestreo: se guarda un punto si pasó este tiempo desde el anterior...
+HISTORIAL_INTERVALO_SEGUNDOS: float = float(os.getenv("HISTORIAL_INTERVALO_SEGUNDOS", "10"))
+# ...o si la ambulancia se movió al menos esta distancia
+HISTORIAL_DISTANCIA_METROS: float = float(os.getenv("HISTORIAL_DISTANCIA_METROS", "50"))
+# Puntos que se conservan en el stream de cada ambulancia
+HISTORIAL_MAXLEN: int = int(os.getenv("HISTORIAL_MAXLEN", "2000"))
+# Intervalo entre volcados a la base de datos
+HISTORIAL_VOLCADO_SEGUNDOS: float = float(os.getenv("HISTORIAL_VOLCADO_SEGUNDOS", "5"))
+# Máximo de puntos leídos por stream en cada volcado
+HISTORIAL_VOLCADO_LOTE: int = int(os.getenv("HISTORIAL_VOLCADO_LOTE", "1000"))
+# Días de historial que se conservan en la base de datos (0: sin límite)
+HISTORIAL_RETENCION_DIAS: int = int(os.getenv("HISTORIAL_RETENCION_DIAS", "30"))
+
+PREFIJO_STREAM = "historial:ambulancia:"
+CLAVE_AMBULANCIAS = "historial:ambulancias"
+GRUPO_VOLCADO = "volcado"
+
+RADIO_TIERRA_METROS = 6371000.0
+
+
+def _distancia_metros(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # Aproximación equirrectangular: suficiente para distancias de submuestreo
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return RADIO_TIERRA_METROS * math.hypot(x, y)
+
+
+class HistorialUbicaciones:
+    """
+    Ingesta submuestreada en Redis Streams y volcado por lotes a la base de datos.
+    """
+
+    def __init__(
+        self,
+        intervalo: float = HISTORIAL_INTERVALO_SEGUNDOS,
+        distancia: float = HISTORIAL_DISTANCIA_METROS,
+        maxlen: int = HISTORIAL_MAXLEN,
+        intervalo_volcado: float = HISTORIAL_VOLCADO_SEGUNDOS,
+        lote: int = HISTORIAL_VOLCADO_LOTE,
+        retencion_dias: int = HISTORIAL_RETENCION_DIAS,
+        consumidor: Optional[str] = None,
+    ):
+        self.intervalo = intervalo
+        self.distancia = distancia
+        self.maxlen = maxlen
+        self.intervalo_volcado = intervalo_volcado
+        self.lote = lote
+        self.retencion_dias = retencion_dias
+        self.consumidor = consumidor or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        # id_ambulancia -> (instante, latitud, longitud) del último punto guardado
+        self._ultimos: Dict[int, Tuple[datetime, float, float]] = {}
+        self._grupos_creados: Set[str] = set()
+        self._ultima_retencion: Optional[date] = None
+        self._tarea_volcado: Optional[asyncio.Task] = None
+
+        # Contadores
+        self.recibidos = 0
+        self.guardados = 0
+        self.volcados = 0
+        self.errores_volcado = 0
+
+    @staticmethod
+    def _clave(id_ambulancia: int) -> str:
+        return f"{PREFIJO_STREAM}{id_ambulancia}"
+
+    def _debe_guardar(self, id_ambulancia: int, latitud: float, longitud: float, instante: datetime) -> bool:
+        ultimo = self._ultimos.get(id_ambulancia)
+        if ultimo is None:
+            return True
+        instante_anterior, lat_anterior, lon_anterior = ultimo
+        if (instante - instante_anterior).total_seconds() >= self.intervalo:
+            return True
+        return _distancia_metros(lat_anterior, lon_anterior, latitud, longitud) >= self.distancia
+
+    def registrar(self, id_ambulancia: int, latitud: float, longitud: float, instante: datetime) -> bool:
+        """
+        Registra una ubicación recibida; solo la guarda si supera el submuestreo.
+
+        Returns:
+            True si el punto se agregó al stream de la ambulancia
+
+        Raises:
+            redis.RedisError: Si hay error al escribir en Redis
+        """
+        self.recibidos += 1
+        if not self._debe_guardar(id_ambulancia, latitud, longitud, instante):
+            return False
+
+        with get_redis_client().pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                self._clave(id_ambulancia),
+                {"latitud": latitud, "longitud": longitud, "fechaHora": instante.isoformat()},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+            pipe.sadd(CLAVE_AMBULANCIAS, id_ambulancia)
+            pipe.execute()
+        self._ultimos[id_ambulancia] = (instante, latitud, longitud)
+        self.guardados += 1
+        return True
+
+    @staticmethod
+    def _punto(id_ambulancia: int, campos: dict) -> Optional[PuntoTrayectoria]:
+        try:
+            return PuntoTrayectoria(
+                id_ambulancia=id_ambulancia,
+                latitud=float(campos["latitud"]),
+                longitud=float(campos["longitud"]),
+                fechaHora=datetime.fromisoformat(campos["fechaHora"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _asegurar_grupo(self, client: redis.Redis, clave: str) -> None:
+        if clave in self._grupos_creados:
+            return
+        try:
+            client.xgroup_create(clave, GRUPO_VOLCADO, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._grupos_creados.add(clave)
+
+    def _leer_pendientes(self, client: redis.Redis, clave: str) -> List[Tuple[str, dict]]:
+        """
+        Entradas del stream que este consumidor debe volcar: primero las propias sin
+        confirmar (un volcado anterior falló), luego las de consumidores inactivos y por
+        último las nuevas.
+        """
+        entradas = []
+        for _, mensajes in client.xreadgroup(GRUPO_VOLCADO, self.consumidor, {clave: "0"}, count=self.lote) or []:
+            entradas.extend(mensajes)
+        if not entradas:
+            try:
+                reclamadas = client.xautoclaim(
+                    clave, GRUPO_VOLCADO, self.consumidor,
+                    min_idle_time=int(self.intervalo_volcado * 10 * 1000), start_id="0-0", count=self.lote,
+                )
+                entradas.extend(reclamadas[1])
+            except redis.ResponseError:
+                pass  # Redis < 6.2: los pendientes de un worker caído se reclaman manualmente
+        if not entradas:
+            for _, mensajes in client.xreadgroup(GRUPO_VOLCADO, self.consumidor, {clave: ">"}, count=self.lote) or []:
+                entradas.extend(mensajes)
+        return entradas
+
+    def volcar(self) -> int:
+        """
+        Vuelca a la base de datos los puntos pendientes de todos los streams, un lote
+        (una transacción) por pasada. Retorna cuántos puntos se escribieron.
+        """
+        client = get_redis_client()
+        puntos: List[PuntoTrayectoria] = []
+        confirmar: Dict[str, List[str]] = {}
+        for miembro in client.smembers(CLAVE_AMBULANCIAS):
+            id_ambulancia = int(miembro)
+            clave = self._clave(id_ambulancia)
+            self._asegurar_grupo(client, clave)
+            for id_entrada, campos in self._leer_pendientes(client, clave):
+                if not campos:
+                    continue  # Entrada recortada por MAXLEN antes de volcarse
+                punto = self._punto(id_ambulancia, campos)
+                if punto is not None:
+                    puntos.append(punto)
+                confirmar.setdefault(clave, []).append(id_entrada)
+
+        if puntos:
+            insertar_puntos(puntos)
+        if confirmar:
+            with client.pipeline(transaction=False) as pipe:
+                for clave, ids in confirmar.items():
+                    pipe.xack(clave, GRUPO_VOLCADO, *ids)
+                pipe.execute()
+        self.volcados += len(puntos)
+        return len(puntos)
+
+    def aplicar_retencion(self, hoy: Optional[date] = None) -> int:
+        """Elimina, una vez por día, las particiones anteriores a la retención."""
+        hoy = hoy or datetime.now(timezone.utc).date()
+        if self.retencion_dias <= 0 or self._ultima_retencion == hoy:
+            return 0
+        eliminadas = eliminar_particiones_anteriores(hoy - timedelta(days=self.retencion_dias))
+        self._ultima_retencion = hoy
+        if eliminadas:
+            logger.info("Eliminadas %d particiones del historial de ubicaciones", eliminadas)
+        return eliminadas
+
+    def trayectoria(self, id_ambulancia: int, desde: datetime, hasta: datetime) -> List[PuntoTrayectoria]:
+        """
+        Puntos de la ambulancia entre `desde` y `hasta`, ordenados por fecha: los ya
+        volcados a la base de datos más los que siguen solo en el stream.
+        """
+        puntos = {p.fechaHora: p for p in obtener_trayectoria(id_ambulancia, desde, hasta)}
+        try:
+            # Los IDs del stream son milisegundos desde epoch del momento del XADD
+            inicio = int(desde.timestamp() * 1000)
+            fin = int(hasta.timestamp() * 1000) + int(self.intervalo_volcado * 1000) + 1000
+            for _, campos in get_redis_client().xrange(self._clave(id_ambulancia), min=inicio, max=fin):
+                punto = self._punto(id_ambulancia, campos)
+                if punto is not None and desde <= punto.fechaHora <= hasta:
+                    puntos.setdefault(punto.fechaHora, punto)
+        except redis.RedisError as e:
+            logger.warning("No se pudo leer el historial reciente de la ambulancia %s: %s", id_ambulancia, e)
+        return [puntos[fecha] for fecha in sorted(puntos)]
+
+    async def _volcar_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_volcado)
+            try:
+                await asyncio.to_thread(self.volcar)
+                await asyncio.to_thread(self.aplicar_retencion)
+            except Exception as e:
+                self.errores_volcado += 1
+                logger.warning("No se pudo volcar el historial de ubicaciones: %s", e)
+
+    async def iniciar(self) -> None:
+        """Arranca el volcado periódico en segundo plano."""
+        if self._tarea_volcado is None or self._tarea_volcado.done():
+            self._tarea_volcado = asyncio.create_task(self._volcar_periodicamente())
+
+    async def detener(self) -> None:
+        """Detiene el volcado periódico y vuelca lo pendiente."""
+        if self._tarea_volcado is not None:
+            self._tarea_volcado.cancel()
+            try:
+                await self._tarea_volcado
+            except asyncio.CancelledError:
+                pass
+            self._tarea_volcado = None
+        try:
+            await asyncio.to_thread(self.volcar)
+        except Exception as e:
+            logger.warning("No se pudo volcar el historial de ubicaciones al detener: %s", e)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de ingesta y volcado.
+
+        Returns:
+            Diccionario con puntos recibidos, guardados (tras el submuestreo) y volcados
+        """
+        return {
+            "consumidor": self.consumidor,
+            "recibidos": self.recibidos,
+            "guardados": self.guardados,
+            "tasa_submuestreo": round(self.guardados / self.recibidos, 4) if self.recibidos else 0.0,
+            "volcados": self.volcados,
+            "errores_volcado": self.errores_volcado,
+        }
+
+
+# Instancia global del historial (singleton pattern)
+_historial_ubicaciones: Optional[HistorialUbicaciones] = None
+
+
+def get_historial_ubicaciones() -> HistorialUbicaciones:
+    """
+    Obtiene la instancia global del historial de ubicaciones.
+
+    Returns:
+        Instancia de HistorialUbicaciones
+    """
+    global _historial_ubicaciones
+    if _historial_ubicaciones is None:
+        _historial_ubicaciones = HistorialUbicaciones()
+    return _historial_ubicaciones
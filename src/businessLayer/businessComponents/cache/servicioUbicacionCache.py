@@ -1,13 +1,27 @@
 """
 Servicio de cache para ubicaciones de ambulancias usando Redis.
 Almacena solo la última ubicación de cada ambulancia en memoria.
+
+Cada ubicación expira a los UBICACION_TTL_SEGUNDOS si la ambulancia deja de reportar
+(p. ej. el proceso cayó antes de que corriera el handler de desconexión), y las búsquedas
+ignoran las que tienen más de UBICACION_FRESCURA_SEGUNDOS (`es_reciente`).
 """
 
 import json
+import os
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
+from dotenv import load_dotenv
 from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
 
+# Cargar variables de entorno
+load_dotenv()
+
+# Vida de la última ubicación en Redis si la ambulancia no vuelve a reportar (0: sin expiración)
+UBICACION_TTL_SEGUNDOS: int = int(os.getenv("UBICACION_TTL_SEGUNDOS", "300"))
+# Antigüedad máxima de una ubicación para considerar la ambulancia en las búsquedas
+UBICACION_FRESCURA_SEGUNDOS: float = float(os.getenv("UBICACION_FRESCURA_SEGUNDOS", "60"))
+
 
 class ServicioUbicacionCache:
     """
@@ -63,8 +77,8 @@ class ServicioUbicacionCache:
         key = ServicioUbicacionCache._get_key(id_ambulancia)
         client = get_redis_client()
         
-        # Guardar en Redis (sin TTL, ya que solo necesitamos la última ubicación)
-        client.set(key, json.dumps(datos))
+        # Guardar en Redis; expira si la ambulancia deja de reportar
+        client.set(key, json.dumps(datos), ex=UBICACION_TTL_SEGUNDOS or None)
 
     @staticmethod
     def obtener_ubicacion(id_ambulancia: int) -> Optional[Dict[str, Any]]:
@@ -108,3 +122,35 @@ class ServicioUbicacionCache:
         client = get_redis_client()
         client.delete(key)
 
+    @staticmethod
+    def edad_segundos(datos: Dict[str, Any], ahora: Optional[datetime] = None) -> Optional[float]:
+        """
+        Calcula la antigüedad de una ubicación guardada.
+
+        Args:
+            datos: Ubicación tal como la retorna `obtener_ubicacion`
+            ahora: Instante de referencia (si None, usa el actual)
+
+        Returns:
+            Segundos desde el timestamp de la ubicación, o None si no tiene uno válido
+        """
+        try:
+            timestamp = datetime.fromisoformat(datos["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return ((ahora or datetime.now(timezone.utc)) - timestamp).total_seconds()
+
+    @staticmethod
+    def es_reciente(
+        datos: Dict[str, Any],
+        ahora: Optional[datetime] = None,
+        frescura: float = UBICACION_FRESCURA_SEGUNDOS,
+    ) -> bool:
+        """
+        Indica si la ubicación tiene como máximo `frescura` segundos.
+        Una ubicación sin timestamp válido no se considera reciente.
+        """
+        edad = ServicioUbicacionCache.edad_segundos(datos, ahora)
+        return edad is not None and edad <= frescura
@@ -1,15 +1,26 @@
 """
 Componente para encontrar la ambulancia más cercana a una emergencia.
 Optimizado para tiempo de respuesta mínimo usando solo Redis.
+
+Si hay un grafo vial cargado (ver rutas.motorEta), las candidatas más cercanas en línea
+recta se reordenan por su tiempo de llegada por las calles.
 """
 
 import json
+import logging
 import math
+from datetime import datetime, timezone
 from typing import Optional, List, Tuple
 from src.businessLayer.businessEntities.ubicacion import Ubicacion
 from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
 from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
 from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
+from src.businessLayer.businessComponents.cache.servicioUbicacionCache import ServicioUbicacionCache
+from src.businessLayer.businessComponents.rutas.motorEta import get_motor_eta
+from src.businessLayer.businessComponents.telemetria.latencias import medir
+
+logger = logging.getLogger(__name__)
 
 
 class BuscarAmbulanciaCercana:
@@ -106,7 +117,9 @@ class BuscarAmbulanciaCercana:
     ) -> Optional[int]:
         """
         Encuentra la ambulancia más cercana a la ubicación de la emergencia.
-        Solo considera ambulancias conectadas (con ubicación en Redis) del tipo requerido.
+        Solo considera ambulancias conectadas (con ubicación en Redis) del tipo requerido
+        que hayan reportado su ubicación en los últimos UBICACION_FRESCURA_SEGUNDOS
+        y que no estén marcadas como no disponibles en el estado de la flota.
         
         Args:
             ubicacion_emergencia: Ubicación de la emergencia
@@ -119,6 +132,17 @@ class BuscarAmbulanciaCercana:
         Raises:
             ValueError: Si la ubicación de emergencia es inválida
         """
+        with medir("valoracion.ambulancia_cercana"):
+            return BuscarAmbulanciaCercana._encontrar_mas_cercana(
+                ubicacion_emergencia, tipo_ambulancia, nivel_prioridad
+            )
+
+    @staticmethod
+    def _encontrar_mas_cercana(
+        ubicacion_emergencia: Ubicacion,
+        tipo_ambulancia: TipoAmbulancia,
+        nivel_prioridad: NivelPrioridad
+    ) -> Optional[int]:
         # Validar ubicación de emergencia
         if not ubicacion_emergencia or not ubicacion_emergencia.latitud or not ubicacion_emergencia.longitud:
             raise ValueError("La ubicación de emergencia debe tener latitud y longitud válidas")
@@ -135,18 +159,29 @@ class BuscarAmbulanciaCercana:
         # Filtrar por tipo de ambulancia y calcular distancias
         tipo_requerido = tipo_ambulancia.value
         candidatas = []
+        coordenadas = {}
+        ahora = datetime.now(timezone.utc)
         
-        print(f"[DEBUG] Buscando ambulancia tipo: {tipo_requerido}")
-        print(f"[DEBUG] Ubicación emergencia: lat={lat_emergencia}, lon={lon_emergencia}")
-        print(f"[DEBUG] Total ambulancias conectadas: {len(ambulancias_conectadas)}")
+        # El detalle por ambulancia solo se arma si el nivel DEBUG está habilitado
+        detalle = logger.isEnabledFor(logging.DEBUG)
+        if detalle:
+            logger.debug(
+                "Buscando ambulancia tipo %s para lat=%s, lon=%s entre %d conectadas",
+                tipo_requerido, lat_emergencia, lon_emergencia, len(ambulancias_conectadas)
+            )
         
         for id_ambulancia, datos in ambulancias_conectadas:
             # Filtrar por tipo de ambulancia
             tipo_ambulancia_actual = datos.get('tipoAmbulancia')
-            print(f"[DEBUG] Ambulancia {id_ambulancia}: tipo={tipo_ambulancia_actual}, lat={datos.get('latitud')}, lon={datos.get('longitud')}")
-            
             if tipo_ambulancia_actual != tipo_requerido:
-                print(f"[DEBUG] Ambulancia {id_ambulancia} descartada: tipo {tipo_ambulancia_actual} != {tipo_requerido}")
+                if detalle:
+                    logger.debug("Ambulancia %s descartada: tipo %s != %s", id_ambulancia, tipo_ambulancia_actual, tipo_requerido)
+                continue
+            
+            # Descartar posiciones viejas (la ambulancia dejó de reportar)
+            if not ServicioUbicacionCache.es_reciente(datos, ahora):
+                if detalle:
+                    logger.debug("Ambulancia %s descartada: ubicación de %s", id_ambulancia, datos.get('timestamp'))
                 continue
             
             # Obtener coordenadas
@@ -154,7 +189,8 @@ class BuscarAmbulanciaCercana:
             lon_ambulancia = datos.get('longitud')
             
             if lat_ambulancia is None or lon_ambulancia is None:
-                print(f"[DEBUG] Ambulancia {id_ambulancia} descartada: coordenadas inválidas")
+                if detalle:
+                    logger.debug("Ambulancia %s descartada: coordenadas inválidas", id_ambulancia)
                 continue
             
             # Calcular distancia
@@ -162,28 +198,61 @@ class BuscarAmbulanciaCercana:
                 lat_emergencia, lon_emergencia,
                 lat_ambulancia, lon_ambulancia
             )
-            
-            print(f"[DEBUG] Ambulancia {id_ambulancia}: distancia={distancia:.4f} km")
+            if detalle:
+                logger.debug("Ambulancia %s: distancia=%.4f km", id_ambulancia, distancia)
             
             # Agregar a candidatas (sin early exit para asegurar que siempre se seleccione la más cercana)
             candidatas.append((distancia, id_ambulancia))
+            coordenadas[id_ambulancia] = (lat_ambulancia, lon_ambulancia)
         
+        # Descartar las no disponibles (despachadas) según el estado en vivo de la flota;
+        # las que no tienen estado en Redis se mantienen como candidatas
+        if candidatas:
+            disponibilidades = get_estado_flota().disponibilidades(id_amb for _, id_amb in candidatas)
+            if detalle:
+                for _, id_amb in candidatas:
+                    if disponibilidades.get(id_amb) is False:
+                        logger.debug("Ambulancia %s descartada: no disponible", id_amb)
+            candidatas = [c for c in candidatas if disponibilidades.get(c[1]) is not False]
+
         # Si no hay candidatas del tipo requerido
         if not candidatas:
-            print(f"[DEBUG] No hay candidatas del tipo {tipo_requerido}")
+            logger.debug("No hay candidatas disponibles del tipo %s", tipo_requerido)
             return None
         
-        print(f"[DEBUG] Candidatas encontradas: {len(candidatas)}")
-        for dist, id_amb in candidatas:
-            print(f"[DEBUG]   - Ambulancia {id_amb}: {dist:.4f} km")
-        
         # Ordenar por distancia (ascendente) y retornar la más cercana
         # Si hay empates en distancia, ordenar también por ID para consistencia
         candidatas.sort(key=lambda x: (x[0], x[1]))
         
         id_seleccionada = candidatas[0][1]
         distancia_seleccionada = candidatas[0][0]
-        print(f"[DEBUG] Ambulancia seleccionada: {id_seleccionada} (distancia: {distancia_seleccionada:.4f} km)")
+
+        # Con grafo vial: entre las más cercanas en línea recta, elegir la que llega antes
+        # por las calles (las que no tienen ruta se descartan si alguna la tiene)
+        motor = get_motor_eta()
+        if motor.habilitado and len(candidatas) > 1:
+            cercanas = candidatas[:motor.max_candidatas]
+            with medir("valoracion.eta_vial"):
+                etas = motor.etas(
+                    (lat_emergencia, lon_emergencia),
+                    {id_amb: coordenadas[id_amb] for _, id_amb in cercanas},
+                )
+            con_ruta = [
+                (etas[id_amb], distancia, id_amb)
+                for distancia, id_amb in cercanas
+                if etas.get(id_amb) is not None
+            ]
+            if con_ruta:
+                eta_seleccionada, distancia_seleccionada, id_seleccionada = min(con_ruta)
+                logger.debug(
+                    "ETA por la red vial de la ambulancia %s: %.0f s (%d evaluadas)",
+                    id_seleccionada, eta_seleccionada, len(cercanas)
+                )
+
+        logger.debug(
+            "Ambulancia seleccionada: %s (distancia: %.4f km, candidatas: %d)",
+            id_seleccionada, distancia_seleccionada, len(candidatas)
+        )
         
         return id_seleccionada
 
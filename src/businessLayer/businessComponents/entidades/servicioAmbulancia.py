@@ -12,6 +12,7 @@ from src.dataLayer.dataAccesComponets.repositorioAmbulancia import (
     actualizar_ambulancia as repo_actualizar_ambulancia,
     eliminar_ambulancia as repo_eliminar_ambulancia,
 )
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
 
 
 class ServicioAmbulancia:
@@ -113,11 +114,19 @@ class ServicioAmbulancia:
     def actualizar(id_ambulancia: int, cambios: Dict[str, Any]) -> Optional[Ambulancia]:
         """
         Actualiza campos de la ambulancia.
+        La disponibilidad no se escribe en la base de datos: vive en el estado en vivo de
+        la flota (Redis), que la vuelca por lotes. `disponibilidad=False` deja la ambulancia
+        fuera de servicio; `True` la devuelve al servicio, y queda disponible solo si está
+        conectada y no despachada.
         """
         if not isinstance(id_ambulancia, int) or id_ambulancia <= 0:
             raise ValueError("id_ambulancia inválido")
         if not isinstance(cambios, dict) or not cambios:
             raise ValueError("Debe proporcionar un diccionario de cambios")
+        cambios = dict(cambios)
+        en_servicio = cambios.pop("disponibilidad", None)
+        if en_servicio is not None and not isinstance(en_servicio, bool):
+            raise ValueError("disponibilidad inválida")
         
         # Validar y convertir enum si es necesario
         if "tipoAmbulancia" in cambios:
@@ -132,7 +141,14 @@ class ServicioAmbulancia:
             if not cambios["placa"]:
                 raise ValueError("La placa no puede estar vacía")
         
-        return repo_actualizar_ambulancia(id_ambulancia, cambios)
+        if cambios:
+            actualizada = repo_actualizar_ambulancia(id_ambulancia, cambios)
+        else:
+            actualizada = repo_obtener_por_id(id_ambulancia)
+        if actualizada is None or en_servicio is None:
+            return actualizada
+        disponible = get_estado_flota().fijar_en_servicio(id_ambulancia, en_servicio)
+        return actualizada.model_copy(update={"disponibilidad": disponible})
 
     @staticmethod
     def eliminar(id_ambulancia: int) -> bool:
@@ -6,6 +6,7 @@ Orquesta validaciones y delega persistencia al repositorio.
 from typing import List, Optional, Dict, Any
 
 from src.businessLayer.businessEntities.emergencia import Emergencia
+from src.businessLayer.businessEntities.emergenciaResumen import EmergenciaResumen
 from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
 from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
 from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
@@ -20,7 +21,11 @@ from src.dataLayer.dataAccesComponets.repositorioEmergencias import (
     obtener_emergencias_por_solicitud as repo_obtener_emergencias_por_solicitud,
     actualizar_emergencia as repo_actualizar_emergencia,
     eliminar_emergencia as repo_eliminar_emergencia,
+    listar_emergencias_resumen as repo_listar_emergencias_resumen,
+    obtener_emergencia_resumen_por_id as repo_obtener_emergencia_resumen_por_id,
 )
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
+from src.businessLayer.businessComponents.eventos.busEventos import CambioEstadoEmergencia, get_bus_eventos
 
 
 class ServicioEmergencia:
@@ -130,6 +135,47 @@ class ServicioEmergencia:
             raise ValueError("id_solicitud inválido")
         return repo_obtener_emergencias_por_solicitud(id_solicitud)
 
+    @staticmethod
+    def listar_resumen(
+        limit: int = 50,
+        offset: int = 0,
+        estado: Optional[EstadoEmergencia] = None,
+        id_operador: Optional[int] = None,
+        id_solicitante: Optional[int] = None,
+    ) -> List[EmergenciaResumen]:
+        """
+        Lista emergencias en vista resumida (sin solicitud, solicitante ni ubicación).
+        Pensado para tableros que solo necesitan id, estado, prioridad y fechas.
+        """
+        if isinstance(estado, str):
+            estado = EstadoEmergencia(estado)
+        if estado is not None and not isinstance(estado, EstadoEmergencia):
+            raise ValueError("estado inválido")
+        if id_operador is not None and (not isinstance(id_operador, int) or id_operador <= 0):
+            raise ValueError("id_operador inválido")
+        if id_solicitante is not None and (not isinstance(id_solicitante, int) or id_solicitante <= 0):
+            raise ValueError("id_solicitante inválido")
+        if limit <= 0:
+            limit = 50
+        if offset < 0:
+            offset = 0
+        return repo_listar_emergencias_resumen(
+            limit=limit,
+            offset=offset,
+            estado=estado,
+            id_operador=id_operador,
+            id_solicitante=id_solicitante,
+        )
+
+    @staticmethod
+    def obtener_resumen_por_id(id_emergencia: int) -> Optional[EmergenciaResumen]:
+        """
+        Obtiene la vista resumida de una emergencia (sin cargar sus relaciones).
+        """
+        if not isinstance(id_emergencia, int) or id_emergencia <= 0:
+            raise ValueError("id_emergencia inválido")
+        return repo_obtener_emergencia_resumen_por_id(id_emergencia)
+
     @staticmethod
     def actualizar(id_emergencia: int, cambios: Dict[str, Any]) -> Optional[Emergencia]:
         """
@@ -168,7 +214,21 @@ class ServicioEmergencia:
             if not isinstance(cambios["id_operador"], int) or cambios["id_operador"] <= 0:
                 raise ValueError("id_operador inválido")
         
-        return repo_actualizar_emergencia(id_emergencia, cambios)
+        estado_anterior = None
+        if "estado" in cambios:
+            anterior = repo_obtener_emergencia_por_id(id_emergencia)
+            estado_anterior = anterior.estado if anterior is not None else None
+
+        actualizada = repo_actualizar_emergencia(id_emergencia, cambios)
+        if actualizada is not None and "estado" in cambios and cambios["estado"] != estado_anterior:
+            # Los suscriptores del bus hacen el trabajo derivado (detener envíos, liberar ambulancia...)
+            get_bus_eventos().publicar(CambioEstadoEmergencia(
+                id_emergencia=id_emergencia,
+                estado_anterior=estado_anterior,
+                estado_nuevo=cambios["estado"],
+                emergencia=actualizada,
+            ))
+        return actualizada
 
     @staticmethod
     def eliminar(id_emergencia: int) -> bool:
@@ -177,5 +237,8 @@ class ServicioEmergencia:
         """
         if not isinstance(id_emergencia, int) or id_emergencia <= 0:
             raise ValueError("id_emergencia inválido")
-        return repo_eliminar_emergencia(id_emergencia)
+        eliminada = repo_eliminar_emergencia(id_emergencia)
+        if eliminada:
+            get_coordinador_tareas().finalizar_emergencia(id_emergencia)
+        return eliminada
 
@@ -1,7 +1,7 @@
 from typing import List, Optional, Dict, Any
 from src.businessLayer.businessEntities.solicitud import Solicitud
 from src.dataLayer.dataAccesComponets.repositorioSolicitudes import (
-    crear_solicitud as repo_crear_solicitud,
+    crear_solicitud_con_ubicacion as repo_crear_solicitud_con_ubicacion,
     obtener_solicitud_por_id as repo_obtener_por_id,
     listar_solicitudes as repo_listar_solicitudes,
     obtener_solicitudes_por_solicitante as repo_obtener_por_solicitante,
@@ -20,7 +20,7 @@ class ServicioSolicitud:
     def crear(solicitud: Solicitud) -> Optional[Solicitud]:
         """
         Crea una nueva solicitud.
-        Si la ubicación no tiene ID, la crea primero en la base de datos.
+        Si la ubicación no tiene ID, la crea en la misma transacción que la solicitud.
         Retorna la Solicitud con id asignado o None si hay error.
         """
         if not isinstance(solicitud, Solicitud):
@@ -33,17 +33,8 @@ class ServicioSolicitud:
             raise ValueError("El solicitante debe tener un ID (debe existir en la base de datos)")
         if not solicitud.fechaHora:
             raise ValueError("La solicitud debe tener una fecha y hora")
-        
-        # Si la ubicación no tiene ID, crearla primero
-        if not solicitud.ubicacion.id:
-            from src.dataLayer.dataAccesComponets.repositorioUbicacion import crear_ubicacion as repo_crear_ubicacion
-            ubicacion_creada = repo_crear_ubicacion(solicitud.ubicacion)
-            if ubicacion_creada is None:
-                raise ValueError("Error al crear la ubicación")
-            # Actualizar la solicitud con la ubicación que tiene ID
-            solicitud.ubicacion = ubicacion_creada
-        
-        return repo_crear_solicitud(solicitud)
+
+        return repo_crear_solicitud_con_ubicacion(solicitud)
 
     @staticmethod
     def obtener_por_id(id_solicitud: int) -> Optional[Solicitud]:
@@ -0,0 +1,238 @@
+"""
+Bus interno de eventos de dominio para los cambios de estado de las emergencias.
+
+`ServicioEmergencia.actualizar` publica un `CambioEstadoEmergencia` cada vez que el estado
+de una emergencia cambia (VALORADA -> ASIGNADA -> RESUELTA/CANCELADA), sin importar desde
+dónde se haya pedido el cambio. Los suscriptores son corrutinas que reaccionan al evento
+(detener los envíos de ubicación, liberar la ambulancia, ...) fuera de la petición que
+lo originó.
+
+- `publicar` es seguro desde cualquier hilo: encola el evento en el event loop del bus.
+- Un único despachador entrega los eventos en orden de publicación, de modo que los
+  suscriptores ven las transiciones de una emergencia en el orden en que ocurrieron.
+- El error o la demora de un suscriptor no afecta a los demás: cada entrega tiene un
+  tiempo máximo (EVENTOS_TIMEOUT_SEGUNDOS) y sus excepciones se registran y se cuentan.
+- Si el bus no está iniciado (scripts, consola) los eventos se descartan y se cuentan.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable, List, Optional
+from dotenv import load_dotenv
+from src.businessLayer.businessEntities.emergencia import Emergencia
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tiempo máximo que puede tardar un suscriptor en procesar un evento
+EVENTOS_TIMEOUT_SEGUNDOS: float = float(os.getenv("EVENTOS_TIMEOUT_SEGUNDOS", "10"))
+# Eventos pendientes de entregar; por encima se descartan los nuevos
+EVENTOS_MAX_PENDIENTES: int = int(os.getenv("EVENTOS_MAX_PENDIENTES", "10000"))
+
+
+@dataclass(frozen=True)
+class CambioEstadoEmergencia:
+    """Evento publicado cuando una emergencia cambia de estado."""
+    id_emergencia: int
+    estado_anterior: Optional[EstadoEmergencia]
+    estado_nuevo: EstadoEmergencia
+    emergencia: Optional[Emergencia] = None
+    fecha: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+ManejadorEvento = Callable[[CambioEstadoEmergencia], Awaitable[None]]
+
+
+@dataclass
+class Suscripcion:
+    """Un suscriptor y los estados nuevos que le interesan (None: todos)."""
+    nombre: str
+    manejador: ManejadorEvento
+    estados: Optional[frozenset] = None
+
+    def acepta(self, evento: CambioEstadoEmergencia) -> bool:
+        return self.estados is None or evento.estado_nuevo in self.estados
+
+
+class BusEventosEmergencia:
+    """
+    Bus de eventos en proceso con entrega asíncrona y ordenada.
+    """
+
+    def __init__(
+        self,
+        timeout: float = EVENTOS_TIMEOUT_SEGUNDOS,
+        max_pendientes: int = EVENTOS_MAX_PENDIENTES,
+    ):
+        self.timeout = timeout
+        self.max_pendientes = max_pendientes
+        self._suscripciones: List[Suscripcion] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cola: Optional[asyncio.Queue] = None
+        self._despachador: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.publicados = 0
+        self.entregados = 0
+        self.errores = 0
+        self.demorados = 0
+        self.descartados = 0
+
+    def suscribir(
+        self,
+        nombre: str,
+        manejador: ManejadorEvento,
+        estados: Optional[Iterable[EstadoEmergencia]] = None,
+    ) -> None:
+        """
+        Registra un suscriptor. Registrar dos veces el mismo nombre lo reemplaza.
+
+        Args:
+            nombre: Identifica al suscriptor en los logs
+            manejador: Corrutina que recibe el evento
+            estados: Estados nuevos que le interesan; None para recibir todos
+        """
+        suscripcion = Suscripcion(nombre, manejador, frozenset(estados) if estados is not None else None)
+        self._suscripciones = [s for s in self._suscripciones if s.nombre != nombre] + [suscripcion]
+
+    def publicar(self, evento: CambioEstadoEmergencia) -> bool:
+        """
+        Encola el evento para sus suscriptores. No espera a que se procese.
+
+        Returns:
+            True si el evento se encoló, False si se descartó
+        """
+        with self._lock:
+            self.publicados += 1
+            loop, cola = self._loop, self._cola
+        if loop is None or cola is None or loop.is_closed():
+            self._descartar(evento, "el bus no está iniciado")
+            return False
+        if cola.qsize() >= self.max_pendientes:
+            self._descartar(evento, "hay demasiados eventos pendientes")
+            return False
+
+        try:
+            en_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            en_loop = False
+        if en_loop:
+            cola.put_nowait(evento)
+        else:
+            loop.call_soon_threadsafe(cola.put_nowait, evento)
+        return True
+
+    def _descartar(self, evento: CambioEstadoEmergencia, motivo: str) -> None:
+        with self._lock:
+            self.descartados += 1
+        logger.warning(
+            "Evento %s de la emergencia %s descartado: %s",
+            evento.estado_nuevo.value, evento.id_emergencia, motivo
+        )
+
+    async def _entregar(self, suscripcion: Suscripcion, evento: CambioEstadoEmergencia) -> None:
+        try:
+            await asyncio.wait_for(suscripcion.manejador(evento), timeout=self.timeout)
+            self.entregados += 1
+        except asyncio.TimeoutError:
+            self.demorados += 1
+            logger.error(
+                "El suscriptor %s superó %.1fs con el evento %s de la emergencia %s",
+                suscripcion.nombre, self.timeout, evento.estado_nuevo.value, evento.id_emergencia
+            )
+        except Exception as e:
+            self.errores += 1
+            logger.error(
+                "Error en el suscriptor %s con el evento %s de la emergencia %s: %s",
+                suscripcion.nombre, evento.estado_nuevo.value, evento.id_emergencia, e
+            )
+
+    async def procesar(self, evento: CambioEstadoEmergencia) -> None:
+        """Entrega el evento a sus suscriptores, uno detrás de otro en orden de registro."""
+        for suscripcion in list(self._suscripciones):
+            if suscripcion.acepta(evento):
+                await self._entregar(suscripcion, evento)
+
+    async def _despachar(self, cola: asyncio.Queue) -> None:
+        while True:
+            evento = await cola.get()
+            try:
+                await self.procesar(evento)
+            finally:
+                cola.task_done()
+
+    async def iniciar(self) -> None:
+        """Arranca el despachador en el event loop actual."""
+        if self._despachador is not None and not self._despachador.done():
+            return
+        cola: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._cola = cola
+        self._despachador = asyncio.create_task(self._despachar(cola))
+
+    async def detener(self, espera: float = 5.0) -> None:
+        """
+        Entrega los eventos pendientes (como máximo durante `espera` segundos) y detiene
+        el despachador. Los eventos publicados después se descartan.
+        """
+        if self._despachador is None:
+            return
+        cola = self._cola
+        with self._lock:
+            self._loop = None
+            self._cola = None
+        try:
+            await asyncio.wait_for(cola.join(), timeout=espera)
+        except asyncio.TimeoutError:
+            logger.warning("Se detuvo el bus de eventos con %d eventos sin entregar", cola.qsize())
+        self._despachador.cancel()
+        try:
+            await self._despachador
+        except asyncio.CancelledError:
+            pass
+        self._despachador = None
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores del bus.
+
+        Returns:
+            Diccionario con suscriptores, pendientes y contadores de entrega
+        """
+        cola = self._cola
+        return {
+            "activo": self._despachador is not None and not self._despachador.done(),
+            "suscriptores": [s.nombre for s in self._suscripciones],
+            "pendientes": cola.qsize() if cola is not None else 0,
+            "publicados": self.publicados,
+            "entregados": self.entregados,
+            "errores": self.errores,
+            "demorados": self.demorados,
+            "descartados": self.descartados,
+        }
+
+
+# Instancia global del bus (singleton pattern)
+_bus_eventos: Optional[BusEventosEmergencia] = None
+
+
+def get_bus_eventos() -> BusEventosEmergencia:
+    """
+    Obtiene la instancia global del bus de eventos de emergencias.
+
+    Returns:
+        Instancia de BusEventosEmergencia
+    """
+    global _bus_eventos
+    if _bus_eventos is None:
+        _bus_eventos = BusEventosEmergencia()
+    return _bus_eventos
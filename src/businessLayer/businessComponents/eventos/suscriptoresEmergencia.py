@@ -0,0 +1,87 @@
+"""
+Suscriptores del bus de eventos que hacen el trabajo derivado de los cambios de estado
+de una emergencia:
+
+- ASIGNADA: se detiene el envío de ambulancias cercanas al operador que valoraba la
+  emergencia y la ambulancia despachada queda asignada (no disponible) en el estado de la flota.
+- RESUELTA / CANCELADA: se eliminan todas las tareas de envío periódico de la emergencia
+  (en cualquier worker) y la ambulancia despachada se libera.
+
+Los manejadores son corrutinas pero su trabajo (base de datos y Redis) es bloqueante: se
+ejecuta con asyncio.to_thread para no detener el event loop y para que el tiempo máximo
+del bus pueda cortar la espera. El hilo de un suscriptor demorado termina por su cuenta.
+"""
+
+import asyncio
+import logging
+from typing import List
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
+from src.businessLayer.businessComponents.entidades.servicioOrdenDespacho import ServicioOrdenDespacho
+from src.businessLayer.businessComponents.eventos.busEventos import CambioEstadoEmergencia, get_bus_eventos
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
+from src.businessLayer.businessComponents.notificaciones.gestorTareasAmbulancias import detener_envio_ambulancias
+
+logger = logging.getLogger(__name__)
+
+# Estados en los que la emergencia terminó y ya no hay trabajo pendiente
+ESTADOS_FINALES = (EstadoEmergencia.RESUELTA, EstadoEmergencia.CANCELADA)
+
+
+def _ambulancias_despachadas(id_emergencia: int) -> List[int]:
+    """IDs de las ambulancias con orden de despacho para la emergencia, la más reciente primero."""
+    ordenes = ServicioOrdenDespacho.obtener_por_emergencia(id_emergencia)
+    ordenes = sorted(ordenes, key=lambda o: o.id or 0, reverse=True)
+    ids = []
+    for orden in ordenes:
+        ambulancia = getattr(orden, "ambulancia", None)
+        if ambulancia is not None and ambulancia.id is not None and ambulancia.id not in ids:
+            ids.append(ambulancia.id)
+    return ids
+
+
+def _reservar_ambulancia(id_emergencia: int) -> None:
+    ids = _ambulancias_despachadas(id_emergencia)
+    if not ids:
+        logger.warning("La emergencia %s pasó a ASIGNADA sin orden de despacho", id_emergencia)
+        return
+    get_estado_flota().asignar(ids[0], id_emergencia)
+    logger.debug("Ambulancia %s reservada para la emergencia %s", ids[0], id_emergencia)
+
+
+def _liberar_ambulancias(id_emergencia: int) -> None:
+    flota = get_estado_flota()
+    for id_ambulancia in _ambulancias_despachadas(id_emergencia):
+        if flota.emergencia_asignada(id_ambulancia) not in (None, id_emergencia):
+            continue  # Ya fue despachada a otra emergencia
+        flota.liberar(id_ambulancia)
+        logger.debug("Ambulancia %s liberada (emergencia %s)", id_ambulancia, id_emergencia)
+
+
+async def detener_busqueda_ambulancias(evento: CambioEstadoEmergencia) -> None:
+    """La emergencia ya tiene ambulancia: el operador deja de recibir las cercanas."""
+    await detener_envio_ambulancias(emergencia_id=evento.id_emergencia)
+
+
+async def reservar_ambulancia(evento: CambioEstadoEmergencia) -> None:
+    """Marca como no disponible la ambulancia de la última orden de despacho."""
+    await asyncio.to_thread(_reservar_ambulancia, evento.id_emergencia)
+
+
+async def detener_envios_emergencia(evento: CambioEstadoEmergencia) -> None:
+    """La emergencia terminó: sus tareas de envío periódico dejan de tener sentido."""
+    await asyncio.to_thread(get_coordinador_tareas().finalizar_emergencia, evento.id_emergencia)
+
+
+async def liberar_ambulancia(evento: CambioEstadoEmergencia) -> None:
+    """Libera las ambulancias despachadas a la emergencia (disponibles si siguen conectadas)."""
+    await asyncio.to_thread(_liberar_ambulancias, evento.id_emergencia)
+
+
+def registrar_suscriptores() -> None:
+    """Registra en el bus global los suscriptores de los cambios de estado."""
+    bus = get_bus_eventos()
+    bus.suscribir("detener_busqueda_ambulancias", detener_busqueda_ambulancias, [EstadoEmergencia.ASIGNADA])
+    bus.suscribir("reservar_ambulancia", reservar_ambulancia, [EstadoEmergencia.ASIGNADA])
+    bus.suscribir("detener_envios_emergencia", detener_envios_emergencia, ESTADOS_FINALES)
+    bus.suscribir("liberar_ambulancia", liberar_ambulancia, ESTADOS_FINALES)
@@ -41,6 +41,8 @@ def get_room_service():
     """
     Obtiene o crea la instancia del cliente de API de LiveKit y retorna el servicio de salas.
     Implementa el patrón singleton para reutilizar la conexión.
+    Los RPCs del cliente pasan por la capa de resiliencia (plazo por llamada,
+    concurrencia acotada y circuit breaker; ver resilienciaLiveKit).
     
     Returns:
         Instancia del servicio de salas de LiveKit (accesible a través de .aroom)
@@ -49,22 +51,30 @@ def get_room_service():
         ValueError: Si las variables de entorno no están configuradas.
     """
     global _livekit_api
+
+    # Camino rápido: el cliente ya existe (la configuración se validó al crearlo)
+    if _livekit_api is not None:
+        return _livekit_api
     
     # Importar aquí para evitar problemas de carga circular
     from livekit import api
+    from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import (
+        ClienteLiveKitProtegido,
+        get_circuito_livekit,
+    )
     
     # Validar configuración antes de crear el servicio
     validate_livekit_config()
     
     base_url = _livekit_effective_url or _normalize_livekit_url(LIVEKIT_URL)
 
-    if _livekit_api is None:
-        # Crear el cliente de API de LiveKit
-        _livekit_api = api.LiveKitAPI(
-            url=base_url,
-            api_key=LIVEKIT_API_KEY,
-            api_secret=LIVEKIT_API_SECRET
-        )
+    # Crear el cliente de API de LiveKit
+    cliente = api.LiveKitAPI(
+        url=base_url,
+        api_key=LIVEKIT_API_KEY,
+        api_secret=LIVEKIT_API_SECRET
+    )
+    _livekit_api = ClienteLiveKitProtegido(cliente, get_circuito_livekit())
     
     # Retornar el cliente completo (el servicio de salas está en .room)
     return _livekit_api
@@ -7,12 +7,18 @@ from livekit import api
 import logging
 from typing import Optional
 from src.businessLayer.businessComponents.llamadas.configLiveKit import get_room_service
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import LiveKitNoDisponibleError
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 
-async def crearSala(nombreSala: str, max_participants: int) -> api.Room:
+async def crearSala(
+    nombreSala: str,
+    max_participants: int,
+    empty_timeout: Optional[int] = None,
+    metadata: Optional[str] = None,
+) -> api.Room:
     """
     Crea una sala de LiveKit con un nombre y un límite de participantes
     específicos, de forma asíncrona.
@@ -22,6 +28,9 @@ async def crearSala(nombreSala: str, max_participants: int) -> api.Room:
             Debe ser una cadena no vacía y válida para LiveKit.
         max_participants: El número máximo de participantes permitidos.
             Debe ser un entero positivo mayor que 0.
+        empty_timeout: Segundos que la sala puede permanecer vacía antes de que
+            LiveKit la cierre. Si es None se usa el valor por defecto del servidor.
+        metadata: Metadata inicial de la sala (opcional).
 
     Returns:
         api.Room: El objeto Room con los detalles de la sala creada.
@@ -53,6 +62,10 @@ async def crearSala(nombreSala: str, max_participants: int) -> api.Room:
         name=nombreSala,
         max_participants=max_participants,
     )
+    if empty_timeout is not None:
+        request.empty_timeout = empty_timeout
+    if metadata is not None:
+        request.metadata = metadata
     
     try:
         logger.info(f"Intentando crear sala '{nombreSala}' con máximo {max_participants} participantes")
@@ -72,6 +85,9 @@ async def crearSala(nombreSala: str, max_participants: int) -> api.Room:
             raise ValueError(f"Argumentos inválidos: {e}") from e
         logger.error(f"Error al crear sala '{nombreSala}' (Twirp {e.code}): {e}")
         raise RuntimeError(f"Error al crear la sala: {str(e)}") from e
+    except LiveKitNoDisponibleError:
+        # Fallo rápido: se propaga para que la API responda en modo degradado
+        raise
     except Exception as e:
         logger.error(f"Error inesperado al crear sala '{nombreSala}': {e}", exc_info=True)
         raise RuntimeError(f"Error al crear la sala: {str(e)}") from e
@@ -112,6 +128,74 @@ async def obtenerSala(nombreSala: str) -> Optional[api.Room]:
             return None
         logger.error(f"Error al obtener sala '{nombreSala}' (Twirp {e.code}): {e}", exc_info=True)
         raise RuntimeError(f"Error al obtener la sala: {str(e)}") from e
+    except LiveKitNoDisponibleError:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener sala '{nombreSala}': {e}", exc_info=True)
         raise RuntimeError(f"Error al obtener la sala: {str(e)}") from e
+
+
+async def eliminarSala(nombreSala: str) -> None:
+    """
+    Elimina una sala de LiveKit. Si la sala no existe, no hace nada.
+
+    Args:
+        nombreSala: El nombre de la sala a eliminar.
+
+    Raises:
+        ValueError: Si nombreSala es inválido.
+        RuntimeError: Si hay un error al eliminar la sala.
+    """
+    if not nombreSala or not isinstance(nombreSala, str):
+        raise ValueError("nombreSala debe ser una cadena de texto no vacía")
+
+    nombreSala = nombreSala.strip()
+    if not nombreSala:
+        raise ValueError("nombreSala no puede estar vacío")
+
+    try:
+        svc = get_room_service()
+        await svc.room.delete_room(api.DeleteRoomRequest(room=nombreSala))
+        logger.info(f"Sala '{nombreSala}' eliminada")
+    except api.TwirpError as e:
+        if e.code == api.TwirpErrorCode.NOT_FOUND:
+            logger.info(f"Sala '{nombreSala}' no encontrada al eliminar")
+            return
+        logger.error(f"Error al eliminar sala '{nombreSala}' (Twirp {e.code}): {e}", exc_info=True)
+        raise RuntimeError(f"Error al eliminar la sala: {str(e)}") from e
+    except LiveKitNoDisponibleError:
+        raise
+    except Exception as e:
+        logger.error(f"Error al eliminar sala '{nombreSala}': {e}", exc_info=True)
+        raise RuntimeError(f"Error al eliminar la sala: {str(e)}") from e
+
+
+async def actualizarMetadataSala(nombreSala: str, metadata: str) -> None:
+    """
+    Reemplaza la metadata de una sala existente.
+
+    Args:
+        nombreSala: El nombre de la sala.
+        metadata: Nueva metadata (cadena vacía para limpiarla).
+
+    Raises:
+        ValueError: Si nombreSala es inválido.
+        RuntimeError: Si hay un error al actualizar la sala.
+    """
+    if not nombreSala or not isinstance(nombreSala, str):
+        raise ValueError("nombreSala debe ser una cadena de texto no vacía")
+
+    nombreSala = nombreSala.strip()
+    if not nombreSala:
+        raise ValueError("nombreSala no puede estar vacío")
+
+    try:
+        svc = get_room_service()
+        await svc.room.update_room_metadata(
+            api.UpdateRoomMetadataRequest(room=nombreSala, metadata=metadata)
+        )
+    except LiveKitNoDisponibleError:
+        raise
+    except Exception as e:
+        logger.error(f"Error al actualizar metadata de sala '{nombreSala}': {e}", exc_info=True)
+        raise RuntimeError(f"Error al actualizar la sala: {str(e)}") from e
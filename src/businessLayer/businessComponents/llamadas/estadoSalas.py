@@ -0,0 +1,348 @@
+"""
+Cache en memoria del estado de las salas de emergencia de LiveKit.
+
+Sirve el listado de salas activas sin consultar LiveKit en cada petición. El estado
+se mantiene de dos formas complementarias:
+- Una tarea en segundo plano que refresca la instantánea completa periódicamente.
+- Los webhooks de LiveKit (participant_joined/left, room_started/finished), que
+  actualizan la instantánea de forma incremental entre refrescos.
+
+Los webhooks que llegan mientras un refresco está en curso se vuelven a aplicar sobre
+la instantánea nueva, para que el refresco no los pise con datos consultados antes.
+Un webhook llega a un solo worker, así que el refresco pasa a
+LIVEKIT_SALAS_REFRESCO_WEBHOOKS (solo corrige eventos perdidos) únicamente en el worker
+que los está recibiendo: el que recibió uno dentro de ese intervalo, o todos si
+LIVEKIT_WEBHOOKS indica que este proceso recibe todos los webhooks. Los demás siguen
+refrescando a LIVEKIT_SALAS_REFRESCO.
+
+Si la instantánea está vencida (por ejemplo, sin tarea de refresco), se reconstruye
+en la petición consultando los participantes de todas las salas de forma concurrente,
+con un límite de RPCs simultáneos.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+from livekit import api
+
+from src.businessLayer.businessComponents.llamadas.configLiveKit import get_room_service
+from src.businessLayer.businessComponents.llamadas.listarSalas import listar_salas_activas
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import LiveKitNoDisponibleError
+from src.businessLayer.businessComponents.llamadas.poolSalas import (
+    METADATA_SALA_EN_POOL,
+    MAX_PARTICIPANTES_EMERGENCIA,
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Intervalo del refresco en segundo plano y edad máxima aceptada de la instantánea
+LIVEKIT_SALAS_REFRESCO: float = float(os.getenv("LIVEKIT_SALAS_REFRESCO", "2"))
+# Intervalo del refresco cuando los webhooks mantienen la instantánea al día
+LIVEKIT_SALAS_REFRESCO_WEBHOOKS: float = float(os.getenv("LIVEKIT_SALAS_REFRESCO_WEBHOOKS", "30"))
+# Este proceso recibe todos los webhooks de LiveKit (un solo worker); si no, el refresco
+# solo se espacia mientras el worker siga recibiendo webhooks
+LIVEKIT_WEBHOOKS: bool = os.getenv("LIVEKIT_WEBHOOKS", "false").lower() in ("true", "1", "yes")
+# Máximo de RPCs list_participants simultáneos al reconstruir la instantánea
+LIVEKIT_SALAS_CONCURRENCIA: int = int(os.getenv("LIVEKIT_SALAS_CONCURRENCIA", "10"))
+
+PREFIJO_SALA_EMERGENCIA = "emergencia-"
+
+
+@dataclass
+class EstadoSala:
+    """Estado conocido de una sala de emergencia."""
+    nombre: str
+    max_participantes: int
+    participantes: Set[str] = field(default_factory=set)
+
+    @property
+    def num_participantes(self) -> int:
+        return len(self.participantes)
+
+    @property
+    def llena(self) -> bool:
+        return self.num_participantes >= self.max_participantes
+
+
+def _es_sala_emergencia(sala: api.Room) -> bool:
+    # Las salas que siguen en el pool aún no tienen solicitud asociada
+    return sala.name.startswith(PREFIJO_SALA_EMERGENCIA) and sala.metadata != METADATA_SALA_EN_POOL
+
+
+def _max_participantes(sala: api.Room) -> int:
+    max_participants = getattr(sala, "max_participants", None)
+    if max_participants is None or max_participants <= 0:
+        return MAX_PARTICIPANTES_EMERGENCIA
+    return max_participants
+
+
+class CacheEstadoSalas:
+    """
+    Instantánea de las salas de emergencia y sus participantes.
+    """
+
+    def __init__(
+        self,
+        edad_maxima: float = LIVEKIT_SALAS_REFRESCO,
+        concurrencia: int = LIVEKIT_SALAS_CONCURRENCIA,
+        intervalo_webhooks: float = LIVEKIT_SALAS_REFRESCO_WEBHOOKS,
+        webhooks: bool = LIVEKIT_WEBHOOKS,
+    ):
+        """
+        Args:
+            edad_maxima: Segundos que la instantánea se considera vigente
+            concurrencia: Máximo de consultas de participantes simultáneas
+            intervalo_webhooks: Segundos entre refrescos cuando hay webhooks
+            webhooks: Este proceso recibe todos los webhooks (si es False, el refresco solo
+                se espacia mientras lleguen webhooks a este worker)
+        """
+        self.edad_maxima = edad_maxima
+        self._edad_base = edad_maxima
+        self.concurrencia = max(1, concurrencia)
+        self.intervalo_webhooks = intervalo_webhooks
+        self.webhooks_activos = webhooks
+        # Instante (monotónico) del último webhook recibido por este worker
+        self._ultimo_webhook: Optional[float] = None
+        self._salas: Dict[str, EstadoSala] = {}
+        self._actualizado_en: Optional[float] = None
+        # Webhooks recibidos durante cada refresco en curso, para reaplicarlos al terminar
+        self._eventos_en_refresco: List[List[api.WebhookEvent]] = []
+        # Una sola reconstrucción a la vez: las peticiones concurrentes esperan la misma
+        self._lock = asyncio.Lock()
+        self._tarea: Optional[asyncio.Task] = None
+        # Métricas
+        self.aciertos = 0
+        self.fallos = 0
+        self.refrescos = 0
+        self.eventos_webhook = 0
+        self.eventos_reaplicados = 0
+        self.respuestas_degradadas = 0
+
+    def _vigente(self) -> bool:
+        return (
+            self._actualizado_en is not None
+            and time.monotonic() - self._actualizado_en < self.edad_maxima
+        )
+
+    async def _consultar_participantes(
+        self, svc, semaforo: asyncio.Semaphore, sala: api.Room
+    ) -> EstadoSala:
+        estado = EstadoSala(nombre=sala.name, max_participantes=_max_participantes(sala))
+        async with semaforo:
+            try:
+                respuesta = await svc.room.list_participants(
+                    api.ListParticipantsRequest(room=sala.name)
+                )
+                estado.participantes = {p.identity for p in respuesta.participants}
+            except Exception as e:
+                logger.warning(f"Error al obtener participantes de sala {sala.name}: {e}")
+                # Sin la lista, se usa el conteo que reporta list_rooms (identidades desconocidas)
+                estado.participantes = {f"desconocido-{i}" for i in range(sala.num_participants)}
+        return estado
+
+    async def refrescar(self) -> None:
+        """
+        Reconstruye la instantánea: lista las salas y consulta sus participantes
+        de forma concurrente (limitado por `concurrencia`).
+
+        Raises:
+            RuntimeError: Si no se pudieron listar las salas
+        """
+        eventos: List[api.WebhookEvent] = []
+        self._eventos_en_refresco.append(eventos)
+        try:
+            salas = [sala for sala in await listar_salas_activas() if _es_sala_emergencia(sala)]
+            svc = get_room_service()
+            semaforo = asyncio.Semaphore(self.concurrencia)
+            estados = await asyncio.gather(
+                *(self._consultar_participantes(svc, semaforo, sala) for sala in salas)
+            )
+        finally:
+            self._eventos_en_refresco.remove(eventos)
+
+        nuevas = {estado.nombre: estado for estado in estados}
+        # Los webhooks recibidos durante la consulta pueden ser posteriores a lo consultado
+        for evento in eventos:
+            self._aplicar(nuevas, evento)
+        self.eventos_reaplicados += len(eventos)
+        self._salas = nuevas
+        self._actualizado_en = time.monotonic()
+        self.refrescos += 1
+
+    async def obtener_salas(self) -> List[EstadoSala]:
+        """
+        Retorna las salas de emergencia conocidas, reconstruyendo la instantánea
+        solo si está vencida.
+
+        Returns:
+            Lista de EstadoSala
+        """
+        if self._vigente():
+            self.aciertos += 1
+        else:
+            async with self._lock:
+                # Otra petición pudo haberla reconstruido mientras se esperaba el lock
+                if self._vigente():
+                    self.aciertos += 1
+                else:
+                    self.fallos += 1
+                    try:
+                        await self.refrescar()
+                    except LiveKitNoDisponibleError:
+                        # Modo degradado: se sirve la última instantánea conocida
+                        if self._actualizado_en is None:
+                            raise
+                        self.respuestas_degradadas += 1
+                        logger.warning("LiveKit no disponible: se sirve el último estado conocido de las salas")
+        return list(self._salas.values())
+
+    @property
+    def degradado(self) -> bool:
+        """True si la instantánea está vencida (LiveKit no pudo consultarse)."""
+        return not self._vigente()
+
+    def obtener_sala(self, nombre_sala: str) -> Optional[EstadoSala]:
+        """
+        Retorna el estado de una sala solo si la instantánea está vigente y la contiene.
+        No consulta LiveKit.
+
+        Args:
+            nombre_sala: Nombre de la sala
+
+        Returns:
+            EstadoSala, o None si la instantánea está vencida o la sala no es conocida
+        """
+        if not self._vigente():
+            return None
+        return self._salas.get(nombre_sala)
+
+    def aplicar_evento(self, evento: api.WebhookEvent) -> None:
+        """
+        Aplica un webhook de LiveKit a la instantánea.
+
+        Args:
+            evento: Evento ya verificado por WebhookReceiver
+        """
+        self._ultimo_webhook = time.monotonic()
+        sala = evento.room
+        if not sala.name or not _es_sala_emergencia(sala):
+            return
+        self.eventos_webhook += 1
+        self._aplicar(self._salas, evento)
+        for eventos in self._eventos_en_refresco:
+            eventos.append(evento)
+
+    @staticmethod
+    def _aplicar(salas: Dict[str, EstadoSala], evento: api.WebhookEvent) -> None:
+        sala = evento.room
+        if evento.event == "room_finished":
+            salas.pop(sala.name, None)
+            return
+
+        estado = salas.get(sala.name)
+        if estado is None:
+            estado = EstadoSala(nombre=sala.name, max_participantes=_max_participantes(sala))
+            salas[sala.name] = estado
+
+        identidad = evento.participant.identity
+        if evento.event == "participant_joined" and identidad:
+            estado.participantes.add(identidad)
+        elif evento.event == "participant_left" and identidad:
+            estado.participantes.discard(identidad)
+
+    def _recibe_webhooks(self) -> bool:
+        """True si este worker recibe los webhooks (todos, o alguno en el último intervalo)."""
+        if self.webhooks_activos:
+            return True
+        return (
+            self._ultimo_webhook is not None
+            and time.monotonic() - self._ultimo_webhook < self.intervalo_webhooks
+        )
+
+    def _siguiente_espera(self, intervalo: float) -> float:
+        """Intervalo hasta el próximo refresco; con webhooks, el refresco es solo de respaldo."""
+        espera = max(intervalo, self.intervalo_webhooks) if self._recibe_webhooks() else intervalo
+        # Se tolera un ciclo perdido antes de reconstruir en la petición
+        self.edad_maxima = max(self._edad_base, espera * 2)
+        return espera
+
+    async def _refrescar_periodicamente(self, intervalo: float) -> None:
+        while True:
+            try:
+                await self.refrescar()
+            except Exception as e:
+                logger.warning(f"No se pudo refrescar el estado de las salas: {e}")
+            await asyncio.sleep(self._siguiente_espera(intervalo))
+
+    async def iniciar(self, intervalo: float = LIVEKIT_SALAS_REFRESCO) -> None:
+        """
+        Inicia el refresco periódico en segundo plano.
+
+        Args:
+            intervalo: Segundos entre refrescos sin webhooks (con webhooks se usa
+                `intervalo_webhooks`); la vigencia de la instantánea se ajusta al doble
+        """
+        if self._tarea is not None:
+            return
+        self._siguiente_espera(intervalo)
+        self._tarea = asyncio.create_task(self._refrescar_periodicamente(intervalo))
+
+    async def detener(self) -> None:
+        """Detiene el refresco periódico."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna las métricas del cache.
+
+        Returns:
+            Diccionario con salas conocidas, edad de la instantánea, aciertos y fallos
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            "salas": len(self._salas),
+            "edad_segundos": (
+                round(time.monotonic() - self._actualizado_en, 3)
+                if self._actualizado_en is not None else None
+            ),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            "refrescos": self.refrescos,
+            "eventos_webhook": self.eventos_webhook,
+            "eventos_reaplicados": self.eventos_reaplicados,
+            "webhooks_activos": self.webhooks_activos,
+            "recibe_webhooks": self._recibe_webhooks(),
+            "respuestas_degradadas": self.respuestas_degradadas,
+        }
+
+
+# Instancia global del cache (singleton pattern)
+_cache_estado_salas: Optional[CacheEstadoSalas] = None
+
+
+def get_cache_estado_salas() -> CacheEstadoSalas:
+    """
+    Obtiene la instancia global del cache de estado de salas.
+
+    Returns:
+        Instancia de CacheEstadoSalas
+    """
+    global _cache_estado_salas
+    if _cache_estado_salas is None:
+        _cache_estado_salas = CacheEstadoSalas()
+    return _cache_estado_salas
@@ -7,6 +7,7 @@ from livekit import api
 import logging
 from typing import List
 from src.businessLayer.businessComponents.llamadas.configLiveKit import get_room_service
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import LiveKitNoDisponibleError
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -34,6 +35,8 @@ async def listar_salas_activas() -> List[api.Room]:
     except api.TwirpError as e:
         logger.error(f"Error al listar salas (Twirp {e.code}): {e}", exc_info=True)
         raise RuntimeError(f"Error al listar salas: {str(e)}") from e
+    except LiveKitNoDisponibleError:
+        raise
     except Exception as e:
         logger.error(f"Error inesperado al listar salas: {e}", exc_info=True)
         raise RuntimeError(f"Error al listar salas: {str(e)}") from e
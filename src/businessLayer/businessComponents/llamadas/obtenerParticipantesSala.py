@@ -4,7 +4,9 @@ Módulo para obtener información de participantes de una sala de LiveKit.
 
 from livekit import api
 import logging
+from typing import Tuple
 from src.businessLayer.businessComponents.llamadas.configLiveKit import get_room_service
+from src.businessLayer.businessComponents.llamadas.estadoSalas import get_cache_estado_salas
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +84,50 @@ async def obtener_max_participantes(nombre_sala: str) -> int:
         return 2
 
 
+async def obtener_info_sala(nombre_sala: str) -> Tuple[int, int]:
+    """
+    Obtiene el número de participantes y el máximo permitido de una sala.
+    Usa el estado en memoria de las salas si está vigente; si no, hace una sola
+    consulta a LiveKit (list_rooms ya reporta ambos valores).
+
+    Args:
+        nombre_sala: Nombre de la sala de LiveKit.
+
+    Returns:
+        Tupla (num_participantes, max_participantes). Si hay error o la sala no
+        existe retorna (0, 2), el valor por defecto para salas de emergencia.
+
+    Raises:
+        ValueError: Si el nombre de la sala es inválido.
+    """
+    if not nombre_sala or not isinstance(nombre_sala, str):
+        raise ValueError("El nombre de la sala debe ser una cadena no vacía")
+
+    nombre_sala = nombre_sala.strip()
+    if not nombre_sala:
+        raise ValueError("El nombre de la sala no puede estar vacío")
+
+    estado = get_cache_estado_salas().obtener_sala(nombre_sala)
+    if estado is not None:
+        return estado.num_participantes, estado.max_participantes
+
+    try:
+        svc = get_room_service()
+        room_info = await svc.room.list_rooms(api.ListRoomsRequest(names=[nombre_sala]))
+
+        if room_info and hasattr(room_info, 'rooms') and room_info.rooms:
+            sala = room_info.rooms[0]
+            max_participants = getattr(sala, 'max_participants', None)
+            if max_participants is None or max_participants <= 0:
+                max_participants = 2
+            return sala.num_participants, max_participants
+
+        return 0, 2
+    except Exception as e:
+        logger.warning(f"Error al obtener información de sala {nombre_sala}: {e}")
+        return 0, 2
+
+
 async def verificar_sala_llena(nombre_sala: str) -> bool:
     """
     Verifica si una sala está llena (número de participantes >= máximo permitido).
@@ -93,8 +139,7 @@ async def verificar_sala_llena(nombre_sala: str) -> bool:
         bool: True si la sala está llena, False en caso contrario.
     """
     try:
-        num_participantes = await obtener_numero_participantes(nombre_sala)
-        max_participantes = await obtener_max_participantes(nombre_sala)
+        num_participantes, max_participantes = await obtener_info_sala(nombre_sala)
         return num_participantes >= max_participantes
     except Exception as e:
         logger.warning(f"Error al verificar si sala {nombre_sala} está llena: {e}")
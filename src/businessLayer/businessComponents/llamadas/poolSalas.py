@@ -0,0 +1,265 @@
+"""
+Pool de salas de LiveKit pre-creadas para emergencias.
+
+Mantiene N salas `emergencia-*` ya creadas (máximo 2 participantes) para que la
+recepción de una solicitud no tenga que esperar el RPC `create_room`. Una tarea en
+segundo plano repone el pool cada vez que se entrega una sala.
+
+LiveKit cierra las salas que permanecen vacías más de `empty_timeout` segundos, por lo
+que las salas del pool se descartan (y se reponen) antes de alcanzar ese límite.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+from src.businessLayer.businessComponents.llamadas.crearSala import (
+    actualizarMetadataSala,
+    crearSala,
+    eliminarSala,
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Configuración del pool
+LIVEKIT_POOL_SALAS: int = int(os.getenv("LIVEKIT_POOL_SALAS", "5"))
+# Segundos que una sala puede estar vacía antes de que LiveKit la cierre
+LIVEKIT_SALA_EMPTY_TIMEOUT: int = int(os.getenv("LIVEKIT_SALA_EMPTY_TIMEOUT", "600"))
+# Margen para descartar salas del pool antes de que LiveKit las cierre
+_MARGEN_EXPIRACION_SEGUNDOS = 60
+# Espera antes de reintentar la reposición tras un error de LiveKit
+_ESPERA_REINTENTO_SEGUNDOS = 5.0
+# Intentos para quitar la marca de pool a una sala entregada (espera inicial, se duplica)
+_INTENTOS_LIBERACION = 5
+_ESPERA_LIBERACION_SEGUNDOS = 0.5
+
+MAX_PARTICIPANTES_EMERGENCIA = 2
+# Metadata de las salas que esperan en el pool (sin solicitud asociada todavía);
+# el listado de salas activas las excluye
+METADATA_SALA_EN_POOL = "en-pool"
+
+
+def generar_nombre_sala() -> str:
+    """
+    Genera un nombre de sala único para una emergencia.
+
+    Returns:
+        Nombre en formato: emergencia-{uuid}
+    """
+    return f"emergencia-{uuid.uuid4()}"
+
+
+async def crear_sala_emergencia(nombreSala: str, metadata: Optional[str] = None) -> None:
+    """
+    Crea una sala de emergencia (solicitante y operador/médico) con el
+    `empty_timeout` configurado para el pool.
+
+    Args:
+        nombreSala: Nombre de la sala a crear
+        metadata: Metadata inicial de la sala (opcional)
+    """
+    await crearSala(
+        nombreSala,
+        max_participants=MAX_PARTICIPANTES_EMERGENCIA,
+        empty_timeout=LIVEKIT_SALA_EMPTY_TIMEOUT,
+        metadata=metadata,
+    )
+
+
+async def _crear_sala_en_pool(nombreSala: str) -> None:
+    await crear_sala_emergencia(nombreSala, metadata=METADATA_SALA_EN_POOL)
+
+
+async def _liberar_sala_del_pool(nombreSala: str) -> None:
+    await actualizarMetadataSala(nombreSala, "")
+
+
+class PoolSalas:
+    """
+    Pool de salas de emergencia pre-creadas con reposición asíncrona.
+
+    `creador`, `liberador` y `eliminador` permiten sustituir LiveKit por un doble
+    local (por ejemplo, en pruebas de carga).
+    """
+
+    def __init__(
+        self,
+        tamano: int = LIVEKIT_POOL_SALAS,
+        vida_segundos: float = LIVEKIT_SALA_EMPTY_TIMEOUT - _MARGEN_EXPIRACION_SEGUNDOS,
+        creador: Callable[[str], Awaitable[None]] = _crear_sala_en_pool,
+        liberador: Callable[[str], Awaitable[None]] = _liberar_sala_del_pool,
+        eliminador: Callable[[str], Awaitable[None]] = eliminarSala,
+    ):
+        """
+        Args:
+            tamano: Número de salas que se mantienen listas (0 deshabilita el pool)
+            vida_segundos: Tiempo máximo que una sala puede esperar en el pool
+            creador: Corrutina que crea una sala dado su nombre
+            liberador: Corrutina que quita la marca de pool a una sala entregada
+            eliminador: Corrutina que elimina una sala dado su nombre
+        """
+        self.tamano = max(0, tamano)
+        self.vida_segundos = vida_segundos
+        self._creador = creador
+        self._liberador = liberador
+        self._eliminador = eliminador
+        # (instante de creación, nombre de la sala)
+        self._salas: Deque[Tuple[float, str]] = deque()
+        self._reponer = asyncio.Event()
+        self._tarea: Optional[asyncio.Task] = None
+        self._liberaciones: Set[asyncio.Task] = set()
+        # Métricas
+        self.aciertos = 0
+        self.fallos = 0
+        self.creadas = 0
+        self.expiradas = 0
+        self.errores = 0
+        self.errores_liberacion = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.tamano > 0
+
+    def _descartar_expiradas(self) -> None:
+        limite = time.monotonic() - self.vida_segundos
+        while self._salas and self._salas[0][0] < limite:
+            _, nombre = self._salas.popleft()
+            self.expiradas += 1
+            logger.info(f"Sala '{nombre}' descartada del pool por antigüedad")
+
+    def tomar(self) -> Optional[str]:
+        """
+        Entrega una sala pre-creada del pool, sin esperar a LiveKit.
+
+        Returns:
+            Nombre de la sala, o None si el pool está vacío (el llamador debe crearla)
+        """
+        self._descartar_expiradas()
+        if self._salas:
+            _, nombre = self._salas.popleft()
+            self.aciertos += 1
+            # Quitar la marca de pool fuera del camino crítico para que la sala
+            # aparezca en el listado de salas activas
+            tarea = asyncio.get_running_loop().create_task(self._liberar(nombre))
+            self._liberaciones.add(tarea)
+            tarea.add_done_callback(self._liberaciones.discard)
+        else:
+            nombre = None
+            self.fallos += 1
+        self._reponer.set()
+        return nombre
+
+    async def _liberar(self, nombreSala: str) -> None:
+        # Mientras conserve la marca, el listado de salas activas no muestra la sala:
+        # se reintenta con espera exponencial en lugar de abandonar al primer error
+        espera = _ESPERA_LIBERACION_SEGUNDOS
+        for intento in range(1, _INTENTOS_LIBERACION + 1):
+            try:
+                await self._liberador(nombreSala)
+                return
+            except Exception as e:
+                self.errores_liberacion += 1
+                if intento == _INTENTOS_LIBERACION:
+                    logger.error(
+                        f"No se pudo liberar la sala '{nombreSala}' del pool tras {intento} intentos: {e}"
+                    )
+                    return
+                logger.warning(
+                    f"No se pudo liberar la sala '{nombreSala}' del pool (intento {intento}): {e}; "
+                    f"reintento en {espera:.1f}s"
+                )
+                await asyncio.sleep(espera)
+                espera *= 2
+
+    async def _reponer_pool(self) -> None:
+        while True:
+            self._descartar_expiradas()
+            while len(self._salas) < self.tamano:
+                nombre = generar_nombre_sala()
+                try:
+                    await self._creador(nombre)
+                except Exception as e:
+                    self.errores += 1
+                    logger.warning(f"No se pudo reponer el pool de salas: {e}")
+                    await asyncio.sleep(_ESPERA_REINTENTO_SEGUNDOS)
+                    continue
+                self._salas.append((time.monotonic(), nombre))
+                self.creadas += 1
+            self._reponer.clear()
+            # Despertar al entregar una sala o, a más tardar, cuando expire la más antigua
+            espera = self.vida_segundos
+            if self._salas:
+                espera = max(0.0, self._salas[0][0] + self.vida_segundos - time.monotonic())
+            try:
+                await asyncio.wait_for(self._reponer.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def iniciar(self) -> None:
+        """Inicia la tarea de reposición en segundo plano (si el pool está habilitado)."""
+        if not self.habilitado or self._tarea is not None:
+            return
+        self._tarea = asyncio.create_task(self._reponer_pool())
+        logger.info(f"Pool de salas iniciado con tamaño {self.tamano}")
+
+    async def detener(self) -> None:
+        """Detiene la reposición y elimina las salas que quedaron sin usar."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        while self._salas:
+            _, nombre = self._salas.popleft()
+            try:
+                await self._eliminador(nombre)
+            except Exception as e:
+                logger.warning(f"No se pudo eliminar la sala '{nombre}' del pool: {e}")
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna las métricas del pool.
+
+        Returns:
+            Diccionario con tamaño objetivo, salas disponibles, aciertos, fallos y tasa de aciertos
+        """
+        entregas = self.aciertos + self.fallos
+        return {
+            "tamano_objetivo": self.tamano,
+            "disponibles": len(self._salas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / entregas, 4) if entregas else 0.0,
+            "creadas": self.creadas,
+            "expiradas": self.expiradas,
+            "errores": self.errores,
+            "errores_liberacion": self.errores_liberacion,
+        }
+
+
+# Instancia global del pool (singleton pattern)
+_pool_salas: Optional[PoolSalas] = None
+
+
+def get_pool_salas() -> PoolSalas:
+    """
+    Obtiene la instancia global del pool de salas de emergencia.
+
+    Returns:
+        Instancia de PoolSalas
+    """
+    global _pool_salas
+    if _pool_salas is None:
+        _pool_salas = PoolSalas()
+    return _pool_salas
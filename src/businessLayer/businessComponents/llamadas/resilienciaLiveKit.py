@@ -0,0 +1,284 @@
+"""
+Capa de resiliencia para las llamadas a la API de LiveKit.
+
+Cada RPC que pasa por `get_room_service()` queda protegido con:
+- Un plazo máximo por llamada, que empieza a correr cuando la llamada obtiene su cupo.
+- Un semáforo que limita los RPCs simultáneos hacia LiveKit. La espera por un cupo
+  tiene el mismo plazo, pero agotarla no cuenta como fallo para el circuito: la
+  saturación es de este proceso, no de LiveKit.
+- Un circuit breaker: tras varios fallos seguidos de infraestructura (timeouts,
+  errores de conexión, UNAVAILABLE/INTERNAL) deja de llamar a LiveKit durante un
+  tiempo y falla de inmediato con `LiveKitNoDisponibleError`, para que un servidor
+  de medios degradado no arrastre la latencia de todas las solicitudes.
+
+Los errores de negocio de LiveKit (sala inexistente, ya existe, argumentos
+inválidos) no abren el circuito.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from livekit import api
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Plazo máximo por RPC (segundos)
+LIVEKIT_TIMEOUT: float = float(os.getenv("LIVEKIT_TIMEOUT", "3"))
+# Máximo de RPCs simultáneos hacia LiveKit
+LIVEKIT_MAX_CONCURRENCIA: int = int(os.getenv("LIVEKIT_MAX_CONCURRENCIA", "20"))
+# Fallos consecutivos que abren el circuito
+LIVEKIT_CB_FALLOS: int = int(os.getenv("LIVEKIT_CB_FALLOS", "5"))
+# Segundos que el circuito permanece abierto antes de dejar pasar una llamada de prueba
+LIVEKIT_CB_ESPERA: float = float(os.getenv("LIVEKIT_CB_ESPERA", "15"))
+
+# Estados del circuito
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+# Códigos Twirp que son respuestas válidas del servidor (no indican degradación)
+_CODIGOS_NEGOCIO = {
+    api.TwirpErrorCode.NOT_FOUND,
+    api.TwirpErrorCode.ALREADY_EXISTS,
+    api.TwirpErrorCode.INVALID_ARGUMENT,
+    api.TwirpErrorCode.PERMISSION_DENIED,
+    api.TwirpErrorCode.UNAUTHENTICATED,
+    api.TwirpErrorCode.FAILED_PRECONDITION,
+    api.TwirpErrorCode.RESOURCE_EXHAUSTED,
+}
+
+
+class LiveKitNoDisponibleError(RuntimeError):
+    """LiveKit no está disponible (circuito abierto o plazo excedido)."""
+
+
+class CircuitoLiveKit:
+    """
+    Circuit breaker con plazo por llamada y concurrencia acotada.
+    """
+
+    def __init__(
+        self,
+        timeout: float = LIVEKIT_TIMEOUT,
+        max_concurrencia: int = LIVEKIT_MAX_CONCURRENCIA,
+        umbral_fallos: int = LIVEKIT_CB_FALLOS,
+        espera_apertura: float = LIVEKIT_CB_ESPERA,
+    ):
+        """
+        Args:
+            timeout: Plazo máximo por llamada, en segundos
+            max_concurrencia: Máximo de llamadas simultáneas
+            umbral_fallos: Fallos consecutivos que abren el circuito
+            espera_apertura: Segundos en estado abierto antes de probar de nuevo
+        """
+        self.timeout = timeout
+        self.max_concurrencia = max(1, max_concurrencia)
+        self.umbral_fallos = max(1, umbral_fallos)
+        self.espera_apertura = espera_apertura
+        self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+        self.estado = CERRADO
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self.fallos_consecutivos = 0
+        # Métricas
+        self.en_vuelo = 0
+        self.exitos = 0
+        self.fallos = 0
+        self.timeouts = 0
+        self.rechazos = 0
+        self.aperturas = 0
+        self.sin_cupo = 0
+
+    def disponible(self) -> bool:
+        """
+        Indica si una llamada saldría hacia LiveKit en este momento (sin consumir la prueba).
+
+        Returns:
+            False si el circuito está abierto y aún no corresponde probar de nuevo
+        """
+        if self.estado == ABIERTO:
+            return time.monotonic() - self._abierto_desde >= self.espera_apertura
+        return not (self.estado == SEMIABIERTO and self._prueba_en_curso)
+
+    def _admitir(self, operacion: str) -> bool:
+        """Decide si la llamada puede salir hacia LiveKit. Retorna True si es la llamada de prueba."""
+        if self.estado == CERRADO:
+            return False
+        if self.estado == ABIERTO and time.monotonic() - self._abierto_desde >= self.espera_apertura:
+            self.estado = SEMIABIERTO
+        if self.estado == SEMIABIERTO and not self._prueba_en_curso:
+            self._prueba_en_curso = True
+            return True
+        self.rechazos += 1
+        raise LiveKitNoDisponibleError(
+            f"LiveKit no disponible (circuito {self.estado}); se omitió '{operacion}'"
+        )
+
+    def _registrar_exito(self, es_prueba: bool) -> None:
+        self.exitos += 1
+        self.fallos_consecutivos = 0
+        if es_prueba or self.estado != CERRADO:
+            logger.info("Circuito de LiveKit cerrado: el servicio respondió de nuevo")
+        self.estado = CERRADO
+        if es_prueba:
+            self._prueba_en_curso = False
+
+    def _registrar_fallo(self, es_prueba: bool) -> None:
+        self.fallos += 1
+        self.fallos_consecutivos += 1
+        if es_prueba:
+            self._prueba_en_curso = False
+        if es_prueba or (self.estado == CERRADO and self.fallos_consecutivos >= self.umbral_fallos):
+            self.estado = ABIERTO
+            self._abierto_desde = time.monotonic()
+            self.aperturas += 1
+            logger.warning(
+                f"Circuito de LiveKit abierto tras {self.fallos_consecutivos} fallos consecutivos"
+            )
+
+    async def llamar(
+        self,
+        operacion: str,
+        funcion: Callable[..., Awaitable[Any]],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Ejecuta un RPC de LiveKit con plazo, cupo de concurrencia y circuit breaker.
+
+        Args:
+            operacion: Nombre de la operación (para mensajes y logs)
+            funcion: Corrutina del cliente de LiveKit a invocar
+            timeout: Plazo de esta llamada; por defecto, el configurado
+
+        Returns:
+            El resultado del RPC
+
+        Raises:
+            LiveKitNoDisponibleError: Si el circuito está abierto, no hay cupo dentro del
+                plazo o LiveKit no responde en el plazo
+            api.TwirpError: Errores de negocio de LiveKit (se propagan tal cual)
+        """
+        es_prueba = self._admitir(operacion)
+        plazo = self.timeout if timeout is None else timeout
+
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), timeout=plazo)
+        except asyncio.TimeoutError:
+            # Saturación local: LiveKit no llegó a recibir la llamada
+            self.sin_cupo += 1
+            if es_prueba:
+                self._prueba_en_curso = False
+            raise LiveKitNoDisponibleError(
+                f"Sin cupo para '{operacion}' en {plazo}s ({self.max_concurrencia} llamadas en curso)"
+            )
+        except asyncio.CancelledError:
+            if es_prueba:
+                self._prueba_en_curso = False
+            raise
+
+        self.en_vuelo += 1
+        try:
+            resultado = await asyncio.wait_for(funcion(*args, **kwargs), timeout=plazo)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._registrar_fallo(es_prueba)
+            raise LiveKitNoDisponibleError(f"LiveKit no respondió a '{operacion}' en {plazo}s")
+        except api.TwirpError as e:
+            if e.code in _CODIGOS_NEGOCIO:
+                self._registrar_exito(es_prueba)
+            else:
+                self._registrar_fallo(es_prueba)
+            raise
+        except asyncio.CancelledError:
+            if es_prueba:
+                self._prueba_en_curso = False
+            raise
+        except Exception:
+            self._registrar_fallo(es_prueba)
+            raise
+        finally:
+            self.en_vuelo -= 1
+            self._semaforo.release()
+        self._registrar_exito(es_prueba)
+        return resultado
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna el estado del circuito y sus contadores.
+
+        Returns:
+            Diccionario con estado, llamadas en vuelo, éxitos, fallos, timeouts, rechazos,
+            aperturas y llamadas sin cupo
+        """
+        return {
+            "estado": self.estado,
+            "fallos_consecutivos": self.fallos_consecutivos,
+            "en_vuelo": self.en_vuelo,
+            "max_concurrencia": self.max_concurrencia,
+            "exitos": self.exitos,
+            "fallos": self.fallos,
+            "timeouts": self.timeouts,
+            "rechazos": self.rechazos,
+            "aperturas": self.aperturas,
+            "sin_cupo": self.sin_cupo,
+        }
+
+
+class _ServicioProtegido:
+    """Envuelve un servicio del cliente (p. ej. `.room`) para que sus RPCs pasen por el circuito."""
+
+    def __init__(self, nombre: str, servicio: Any, circuito: CircuitoLiveKit):
+        self._nombre = nombre
+        self._servicio = servicio
+        self._circuito = circuito
+
+    def __getattr__(self, atributo: str) -> Any:
+        objetivo = getattr(self._servicio, atributo)
+        if not asyncio.iscoroutinefunction(objetivo):
+            return objetivo
+
+        async def _protegido(*args, **kwargs):
+            return await self._circuito.llamar(f"{self._nombre}.{atributo}", objetivo, *args, **kwargs)
+
+        return _protegido
+
+
+class ClienteLiveKitProtegido:
+    """
+    Cliente de LiveKit cuyos servicios (`.room`, etc.) pasan por el circuito.
+    El resto de atributos se delega al cliente original.
+    """
+
+    def __init__(self, cliente: Any, circuito: CircuitoLiveKit):
+        self._cliente = cliente
+        self._circuito = circuito
+        self.room = _ServicioProtegido("room", cliente.room, circuito)
+
+    def __getattr__(self, atributo: str) -> Any:
+        return getattr(self._cliente, atributo)
+
+
+# Instancia global del circuito (singleton pattern)
+_circuito_livekit: Optional[CircuitoLiveKit] = None
+
+
+def get_circuito_livekit() -> CircuitoLiveKit:
+    """
+    Obtiene la instancia global del circuit breaker de LiveKit.
+
+    Returns:
+        Instancia de CircuitoLiveKit
+    """
+    global _circuito_livekit
+    if _circuito_livekit is None:
+        _circuito_livekit = CircuitoLiveKit()
+    return _circuito_livekit
@@ -0,0 +1,125 @@
+"""
+Servicio de emisión de tokens de acceso de LiveKit.
+
+Todos los tokens de las salas de emergencia llevan los mismos permisos (unirse, hablar
+y escuchar solo audio); solo cambian la identidad, la sala y las fechas. Por eso la
+plantilla de permisos, el encabezado JWT codificado y la clave HMAC se preparan una sola
+vez, y cada token se firma directamente con HMAC-SHA256 sin construir `api.AccessToken`
+ni `api.VideoGrants`.
+
+El resultado es un JWT HS256 estándar, equivalente al que produce `AccessToken.to_jwt()`.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+from src.businessLayer.businessComponents.llamadas.configLiveKit import (
+    LIVEKIT_API_KEY,
+    LIVEKIT_API_SECRET,
+    validate_livekit_config,
+)
+
+# Vigencia de los tokens de sala
+TTL_TOKEN_SEGUNDOS = 60 * 60
+
+# Permisos de las salas de emergencia (claims "video" sin la sala)
+_PERMISOS_AUDIO = {
+    "roomJoin": True,
+    "canPublish": True,               # Permitir compartir audio
+    "canSubscribe": True,             # Permitir escuchar
+    "canPublishData": False,          # Sin data channels
+    "canPublishSources": ["microphone"],  # Limitar a audio
+}
+
+
+def _b64url(datos: bytes) -> bytes:
+    return base64.urlsafe_b64encode(datos).rstrip(b"=")
+
+
+class _Firmador:
+    """Encabezado codificado y HMAC con la clave ya cargada, preparados una vez."""
+
+    def __init__(self, api_key: str, api_secret: str):
+        self.api_key = api_key
+        self.encabezado = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+        self._hmac_base = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+    def firmar(self, claims: dict) -> str:
+        cuerpo = _b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        entrada = self.encabezado + b"." + cuerpo
+        mac = self._hmac_base.copy()
+        mac.update(entrada)
+        return (entrada + b"." + _b64url(mac.digest())).decode("ascii")
+
+
+_firmador: Optional[_Firmador] = None
+
+
+def _get_firmador() -> _Firmador:
+    global _firmador
+    if _firmador is None:
+        validate_livekit_config()
+        _firmador = _Firmador(LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
+    return _firmador
+
+
+def generar_identidad(nombre: str) -> str:
+    """
+    Genera una identidad única para un participante (LiveKit requiere identidad única por sala).
+
+    Args:
+        nombre: Nombre a mostrar del participante
+
+    Returns:
+        Identidad en formato: {nombre}-{8 hex}
+    """
+    return f"{nombre}-{uuid.uuid4().hex[:8]}"
+
+
+def emitir_token(identidad: str, nombre_sala: str, ahora: Optional[int] = None) -> str:
+    """
+    Firma un token de acceso de audio para una sala de emergencia.
+    No valida los parámetros: los llamadores ya lo hacen.
+
+    Args:
+        identidad: Identidad del participante
+        nombre_sala: Nombre de la sala de LiveKit
+        ahora: Instante de emisión (epoch en segundos); por defecto, el actual
+
+    Returns:
+        Token JWT firmado
+    """
+    firmador = _get_firmador()
+    if ahora is None:
+        ahora = int(time.time())
+    return firmador.firmar({
+        "video": {**_PERMISOS_AUDIO, "room": nombre_sala},
+        "sub": identidad,
+        "iss": firmador.api_key,
+        "nbf": ahora,
+        "exp": ahora + TTL_TOKEN_SEGUNDOS,
+    })
+
+
+def emitir_tokens_lote(participantes: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Genera identidades y tokens para varios participantes de una vez
+    (por ejemplo, al pre-aprovisionar salas).
+
+    Args:
+        participantes: Pares (nombre, nombre_sala)
+
+    Returns:
+        Lista de pares (identidad, token) en el mismo orden
+    """
+    ahora = int(time.time())
+    resultado = []
+    for nombre, nombre_sala in participantes:
+        identidad = generar_identidad(nombre)
+        resultado.append((identidad, emitir_token(identidad, nombre_sala, ahora)))
+    return resultado
@@ -1,11 +1,7 @@
 from typing import Tuple
-import uuid
-import datetime
-from livekit import api
-from src.businessLayer.businessComponents.llamadas.configLiveKit import (
-    LIVEKIT_API_KEY,
-    LIVEKIT_API_SECRET,
-    validate_livekit_config,
+from src.businessLayer.businessComponents.llamadas.servicioTokens import (
+    emitir_token,
+    generar_identidad,
 )
 
 
@@ -37,29 +33,10 @@ def generar_token_unirse_sala(nombre: str, nombre_sala: str) -> Tuple[str, str]:
     if not nombre or not nombre_sala:
         raise ValueError("Nombre y sala no pueden estar vacíos")
 
-    # Verificar que las variables de entorno necesarias estén configuradas
-    validate_livekit_config()
-
     # Generar una identidad (LiveKit requiere identidad única por sala)
-    identidad = f"{nombre}-{uuid.uuid4().hex[:8]}"
+    identidad = generar_identidad(nombre)
 
-    # Crear el token con permisos de unirse y audio (hablar/escuchar)
-    token = (
-        api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
-        .with_identity(identidad)
-        .with_grants(
-            api.VideoGrants(
-                room_join=True,
-                room=nombre_sala,
-                can_publish=True,          # Permitir compartir audio
-                can_subscribe=True,        # Permitir escuchar
-                can_publish_data=False,    # Opcional: deshabilitar data channels si no se necesitan
-                can_publish_sources=["microphone"],  # Limitar a audio
-            )
-        )
-        .with_ttl(datetime.timedelta(hours=1))
-        .to_jwt()
-    )
+    # Firmar el token con permisos de unirse y audio (hablar/escuchar)
+    token = emitir_token(identidad, nombre_sala)
 
     return identidad, token
-
@@ -0,0 +1,719 @@
+"""
+Coordinación de las tareas periódicas de envío entre varios workers.
+
+Cada tarea (p. ej. enviar la ubicación de la ambulancia al operador que valora una
+emergencia) se registra en un almacén compartido con los datos necesarios para
+ejecutarla, y se ejecuta en un único worker: el que tiene conectado el websocket del
+destinatario. La propiedad se mantiene con un arrendamiento (lease) que el worker renueva
+mientras ejecuta la tarea:
+- Registrar una tarea que ya existe no la duplica (una tarea por emergencia en el clúster).
+- Si la petición que inicia la tarea llega a otro worker, el dueño del socket la toma en
+  su siguiente pasada de conciliación.
+- Si el worker muere, su lease expira y la tarea pasa al worker al que se reconecte el
+  destinatario. Al apagarse de forma ordenada libera sus leases de inmediato.
+- Detener una tarea (desde cualquier worker) la borra del almacén; el dueño la cancela
+  en su siguiente pasada.
+
+Vida acotada: cada tarea local se da de baja con un done-callback al terminar (el
+destinatario se desconectó o falló), las tareas de una emergencia se eliminan cuando esta
+pasa a RESUELTA o CANCELADA (`finalizar_emergencia`), ninguna dura más de
+TAREAS_DURACION_MAXIMA_SEGUNDOS y cada grupo admite como máximo TAREAS_MAX_POR_GRUPO.
+
+Almacenes:
+- "redis" (por defecto): leases con SET NX PX, renovados y liberados solo por su dueño
+  con un script Lua que compara y aplica PEXPIRE/DEL en un round-trip (las renovaciones
+  de una pasada van juntas en un pipeline), y tareas en un hash por grupo.
+- "local": el mismo contrato en memoria, para un solo proceso.
+
+La conciliación corre en el event loop, pero lleva el acceso a un almacén bloqueante
+(Redis) a un hilo con asyncio.to_thread, igual que la baja de una tarea local que termina
+(done-callback). Las operaciones públicas (`iniciar_tarea`, `detener_tarea`,
+`suspender_tarea`, `listar_tareas`) son síncronas porque las llaman los workflows: hacen
+uno o dos comandos Redis sin esperas en el hilo de quien las invoca.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+import redis
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Almacén de leases y tareas: "redis" o "local"
+TAREAS_ALMACEN: str = os.getenv("TAREAS_ALMACEN", "redis").lower()
+# Duración del lease de una tarea; si el dueño no lo renueva, otra instancia la toma
+TAREAS_LEASE_SEGUNDOS: float = float(os.getenv("TAREAS_LEASE_SEGUNDOS", "10"))
+# Intervalo de la conciliación (renovar leases, tomar tareas nuevas, cancelar detenidas)
+TAREAS_INTERVALO_SEGUNDOS: float = float(os.getenv("TAREAS_INTERVALO_SEGUNDOS", "1"))
+# Tiempo que una tarea sin dueño espera a que su destinatario se reconecte
+TAREAS_RETENCION_SEGUNDOS: float = float(os.getenv("TAREAS_RETENCION_SEGUNDOS", "3600"))
+# Duración máxima de una tarea desde que se registró, aunque su emergencia siga abierta
+TAREAS_DURACION_MAXIMA_SEGUNDOS: float = float(os.getenv("TAREAS_DURACION_MAXIMA_SEGUNDOS", "14400"))
+# Máximo de tareas registradas por grupo en el clúster; por encima se rechazan las nuevas
+TAREAS_MAX_POR_GRUPO: int = int(os.getenv("TAREAS_MAX_POR_GRUPO", "1000"))
+
+# Identificador de este proceso como dueño de leases
+ID_WORKER: str = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# Renueva el lease solo si sigue siendo del dueño (KEYS[1]: lease, ARGV: dueño, ttl en ms)
+_LUA_RENOVAR = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+# Borra el lease solo si sigue siendo del dueño (KEYS[1]: lease, ARGV[1]: dueño)
+_LUA_LIBERAR = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+# Reescribe una tarea solo si sigue registrada (KEYS[1]: hash del grupo, ARGV: id, datos)
+_LUA_ACTUALIZAR = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class AlmacenTareasLocal:
+    """Leases y registro de tareas en memoria (un solo proceso)."""
+
+    # En memoria: el coordinador lo usa directamente desde el event loop
+    bloqueante = False
+
+    def __init__(self):
+        # clave -> (dueño, instante de expiración)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        # grupo -> {id_tarea: datos}
+        self._tareas: Dict[str, Dict[int, dict]] = {}
+
+    def _vigente(self, clave: str) -> Optional[str]:
+        lease = self._leases.get(clave)
+        if lease is None:
+            return None
+        if lease[1] <= time.monotonic():
+            del self._leases[clave]
+            return None
+        return lease[0]
+
+    def adquirir(self, clave: str, dueno: str, ttl: float) -> bool:
+        actual = self._vigente(clave)
+        if actual is not None and actual != dueno:
+            return False
+        self._leases[clave] = (dueno, time.monotonic() + ttl)
+        return True
+
+    def renovar(self, clave: str, dueno: str, ttl: float) -> bool:
+        if self._vigente(clave) != dueno:
+            return False
+        self._leases[clave] = (dueno, time.monotonic() + ttl)
+        return True
+
+    def renovar_varios(self, claves: List[str], dueno: str, ttl: float) -> List[bool]:
+        return [self.renovar(clave, dueno, ttl) for clave in claves]
+
+    def liberar(self, clave: str, dueno: str) -> None:
+        if self._vigente(clave) == dueno:
+            del self._leases[clave]
+
+    def dueno(self, clave: str) -> Optional[str]:
+        return self._vigente(clave)
+
+    def guardar_tarea(
+        self, grupo: str, id_tarea: int, datos: dict, solo_si_nueva: bool = False, solo_si_existe: bool = False
+    ) -> bool:
+        tareas = self._tareas.setdefault(grupo, {})
+        if solo_si_nueva and id_tarea in tareas:
+            return False
+        if solo_si_existe and id_tarea not in tareas:
+            return False
+        tareas[id_tarea] = dict(datos)
+        return True
+
+    def eliminar_tarea(self, grupo: str, id_tarea: int) -> bool:
+        return self._tareas.get(grupo, {}).pop(id_tarea, None) is not None
+
+    def listar_tareas(self, grupo: str) -> Dict[int, dict]:
+        return {id_tarea: dict(datos) for id_tarea, datos in self._tareas.get(grupo, {}).items()}
+
+    def existe_tarea(self, grupo: str, id_tarea: int) -> bool:
+        return id_tarea in self._tareas.get(grupo, {})
+
+    def contar_tareas(self, grupo: str) -> int:
+        return len(self._tareas.get(grupo, {}))
+
+
+class AlmacenTareasRedis:
+    """
+    Leases y registro de tareas en Redis, compartidos por todos los workers.
+    - Lease: `tareas:lease:{clave}` = dueño, con expiración (SET NX PX).
+    - Tareas: hash `tareas:{grupo}` con el JSON de los datos de cada tarea.
+
+    Si el servidor no admite scripts Lua, renovar y liberar usan WATCH/MULTI.
+    """
+
+    # Acceso de red: el coordinador lo usa fuera del event loop
+    bloqueante = True
+
+    def __init__(self):
+        self._scripts: Optional[tuple] = None
+        self._sin_lua = False
+
+    def _cliente(self):
+        return get_redis_client()
+
+    def _script(self, indice: int):
+        # Los scripts se registran una vez; cada llamada indica el cliente (o pipeline) a usar
+        if self._scripts is None:
+            cliente = self._cliente()
+            self._scripts = tuple(
+                cliente.register_script(lua) for lua in (_LUA_RENOVAR, _LUA_LIBERAR, _LUA_ACTUALIZAR)
+            )
+        return self._scripts[indice]
+
+    def _desactivar_lua(self, error: redis.ResponseError) -> None:
+        if "unknown command" not in str(error).lower():
+            raise error
+        self._sin_lua = True
+        logger.warning("El servidor Redis no admite scripts Lua; los leases se renuevan con WATCH/MULTI")
+
+    def adquirir(self, clave: str, dueno: str, ttl: float) -> bool:
+        cliente = self._cliente()
+        key = f"tareas:lease:{clave}"
+        if cliente.set(key, dueno, nx=True, px=int(ttl * 1000)):
+            return True
+        return self.renovar(clave, dueno, ttl)
+
+    def _si_es_dueno(self, clave: str, dueno: str, operacion: Callable) -> bool:
+        """Aplica `operacion(pipe, key)` solo si el lease sigue siendo de `dueno` (WATCH/MULTI)."""
+        key = f"tareas:lease:{clave}"
+        with self._cliente().pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) != dueno:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                operacion(pipe, key)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                # Otro worker modificó el lease entre la lectura y la escritura
+                return False
+
+    def renovar(self, clave: str, dueno: str, ttl: float) -> bool:
+        if not self._sin_lua:
+            try:
+                return bool(self._script(0)(
+                    keys=[f"tareas:lease:{clave}"], args=[dueno, int(ttl * 1000)], client=self._cliente()
+                ))
+            except redis.ResponseError as e:
+                self._desactivar_lua(e)
+        return self._si_es_dueno(clave, dueno, lambda pipe, key: pipe.pexpire(key, int(ttl * 1000)))
+
+    def renovar_varios(self, claves: List[str], dueno: str, ttl: float) -> List[bool]:
+        """Renueva varios leases en un solo pipeline (un round-trip)."""
+        if not claves:
+            return []
+        if not self._sin_lua:
+            script = self._script(0)
+            with self._cliente().pipeline(transaction=False) as pipe:
+                for clave in claves:
+                    script(keys=[f"tareas:lease:{clave}"], args=[dueno, int(ttl * 1000)], client=pipe)
+                try:
+                    return [bool(resultado) for resultado in pipe.execute()]
+                except redis.ResponseError as e:
+                    self._desactivar_lua(e)
+        return [self.renovar(clave, dueno, ttl) for clave in claves]
+
+    def liberar(self, clave: str, dueno: str) -> None:
+        if not self._sin_lua:
+            try:
+                self._script(1)(keys=[f"tareas:lease:{clave}"], args=[dueno], client=self._cliente())
+                return
+            except redis.ResponseError as e:
+                self._desactivar_lua(e)
+        self._si_es_dueno(clave, dueno, lambda pipe, key: pipe.delete(key))
+
+    def dueno(self, clave: str) -> Optional[str]:
+        return self._cliente().get(f"tareas:lease:{clave}")
+
+    def guardar_tarea(
+        self, grupo: str, id_tarea: int, datos: dict, solo_si_nueva: bool = False, solo_si_existe: bool = False
+    ) -> bool:
+        cliente = self._cliente()
+        valor = json.dumps(datos)
+        if solo_si_nueva:
+            return bool(cliente.hsetnx(f"tareas:{grupo}", str(id_tarea), valor))
+        if solo_si_existe:
+            return self._actualizar_tarea(f"tareas:{grupo}", str(id_tarea), valor)
+        cliente.hset(f"tareas:{grupo}", str(id_tarea), valor)
+        return True
+
+    def _actualizar_tarea(self, key: str, campo: str, valor: str) -> bool:
+        """Reescribe el campo solo si sigue en el hash (no resucita una tarea detenida)."""
+        if not self._sin_lua:
+            try:
+                return bool(self._script(2)(keys=[key], args=[campo, valor], client=self._cliente()))
+            except redis.ResponseError as e:
+                self._desactivar_lua(e)
+        with self._cliente().pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if not pipe.hexists(key, campo):
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.hset(key, campo, valor)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                # El hash cambió entre la lectura y la escritura; se reintenta en la siguiente pasada
+                return False
+
+    def eliminar_tarea(self, grupo: str, id_tarea: int) -> bool:
+        return bool(self._cliente().hdel(f"tareas:{grupo}", str(id_tarea)))
+
+    def listar_tareas(self, grupo: str) -> Dict[int, dict]:
+        tareas = {}
+        for id_tarea, valor in self._cliente().hgetall(f"tareas:{grupo}").items():
+            try:
+                tareas[int(id_tarea)] = json.loads(valor)
+            except (ValueError, json.JSONDecodeError):
+                continue
+        return tareas
+
+    def existe_tarea(self, grupo: str, id_tarea: int) -> bool:
+        return bool(self._cliente().hexists(f"tareas:{grupo}", str(id_tarea)))
+
+    def contar_tareas(self, grupo: str) -> int:
+        return self._cliente().hlen(f"tareas:{grupo}")
+
+
+@dataclass
+class GrupoTareas:
+    """Tipo de tarea periódica: cómo ejecutarla y cómo saber si su destinatario es local."""
+    nombre: str
+    ejecutar: Callable[[int, dict], Awaitable[None]]
+    es_local: Callable[[dict], bool]
+    locales: Dict[int, asyncio.Task] = field(default_factory=dict)
+
+
+class CoordinadorTareas:
+    """
+    Asigna cada tarea periódica al worker que tiene conectado a su destinatario.
+    Las operaciones públicas son síncronas y se llaman desde el event loop; la
+    conciliación periódica y la baja de las tareas terminadas llevan el acceso al
+    almacén a un hilo.
+    """
+
+    def __init__(
+        self,
+        almacen,
+        id_worker: str = ID_WORKER,
+        lease: float = TAREAS_LEASE_SEGUNDOS,
+        intervalo: float = TAREAS_INTERVALO_SEGUNDOS,
+        retencion: float = TAREAS_RETENCION_SEGUNDOS,
+        duracion_maxima: float = TAREAS_DURACION_MAXIMA_SEGUNDOS,
+        max_por_grupo: int = TAREAS_MAX_POR_GRUPO,
+    ):
+        self.almacen = almacen
+        self.id_worker = id_worker
+        self.lease = lease
+        self.intervalo = intervalo
+        self.retencion = retencion
+        self.duracion_maxima = duracion_maxima
+        self.max_por_grupo = max(1, max_por_grupo)
+        self._grupos: Dict[str, GrupoTareas] = {}
+        self._tarea_conciliacion: Optional[asyncio.Task] = None
+        # Métricas
+        self.tomadas = 0
+        self.perdidas = 0
+        self.canceladas_remotamente = 0
+        self.terminadas = 0
+        self.fallidas = 0
+        self.rechazadas = 0
+        self.vencidas = 0
+
+    def registrar_grupo(
+        self,
+        nombre: str,
+        ejecutar: Callable[[int, dict], Awaitable[None]],
+        es_local: Callable[[dict], bool],
+    ) -> None:
+        """
+        Registra un tipo de tarea.
+
+        Args:
+            nombre: Nombre del grupo (p. ej. "ambulancia_operador")
+            ejecutar: Corrutina `ejecutar(id_tarea, datos)` con el bucle de envío
+            es_local: Indica si el destinatario de la tarea está conectado a este worker
+        """
+        self._grupos[nombre] = GrupoTareas(nombre, ejecutar, es_local)
+
+    @staticmethod
+    def _clave(grupo: str, id_tarea: int) -> str:
+        return f"{grupo}:{id_tarea}"
+
+    async def _en_almacen(self, funcion: Callable, *args):
+        """Ejecuta `funcion` en un hilo si el almacén es bloqueante, o directamente si no."""
+        if self.almacen.bloqueante:
+            return await asyncio.to_thread(funcion, *args)
+        return funcion(*args)
+
+    def _iniciar_local(self, grupo: GrupoTareas, id_tarea: int, datos: dict) -> bool:
+        """Toma el lease y arranca la tarea en este worker; False si otro worker la tiene."""
+        if not self.almacen.adquirir(self._clave(grupo.nombre, id_tarea), self.id_worker, self.lease):
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin event loop no se puede ejecutar aquí; la conciliación la tomará
+            self.almacen.liberar(self._clave(grupo.nombre, id_tarea), self.id_worker)
+            return False
+        self._arrancar(grupo, id_tarea, datos)
+        return True
+
+    def _arrancar(self, grupo: GrupoTareas, id_tarea: int, datos: dict) -> None:
+        """Crea la tarea local (el lease ya es de este worker); se llama desde el event loop."""
+        tarea = asyncio.get_running_loop().create_task(
+            grupo.ejecutar(id_tarea, datos), name=f"{grupo.nombre}:{id_tarea}"
+        )
+        grupo.locales[id_tarea] = tarea
+        tarea.add_done_callback(lambda t: self._al_terminar(grupo, id_tarea, t))
+        self.tomadas += 1
+
+    def _al_terminar(self, grupo: GrupoTareas, id_tarea: int, tarea: asyncio.Task) -> None:
+        """Da de baja la tarea local al terminar, sea cual sea el motivo, y libera su lease."""
+        if tarea.cancelled():
+            return  # Quien la canceló ya la dio de baja
+        liberar = grupo.locales.get(id_tarea) is tarea
+        if liberar:
+            del grupo.locales[id_tarea]
+        self.terminadas += 1
+        error = tarea.exception()
+        if error is not None:
+            self.fallidas += 1
+            logger.error("La tarea %s:%s terminó con error: %s", grupo.nombre, id_tarea, error)
+        if self.almacen.bloqueante:
+            # El callback corre en el event loop: el acceso a Redis va al executor
+            asyncio.get_running_loop().run_in_executor(
+                None, self._dar_de_baja, grupo.nombre, id_tarea, liberar, error is not None
+            )
+        else:
+            self._dar_de_baja(grupo.nombre, id_tarea, liberar, error is not None)
+
+    def _dar_de_baja(self, grupo: str, id_tarea: int, liberar: bool, eliminar: bool) -> None:
+        """Libera el lease de una tarea local terminada y, si falló, la borra del almacén."""
+        if liberar:
+            try:
+                self.almacen.liberar(self._clave(grupo, id_tarea), self.id_worker)
+            except Exception as e:
+                logger.warning("No se pudo liberar el lease de %s:%s: %s", grupo, id_tarea, e)
+        if eliminar:
+            # Se da de baja también en el almacén: si no, la conciliación la relanzaría
+            # en bucle en cada worker
+            try:
+                self.almacen.eliminar_tarea(grupo, id_tarea)
+            except Exception as e:
+                logger.warning("No se pudo eliminar la tarea %s:%s: %s", grupo, id_tarea, e)
+
+    def _cancelar_local(self, grupo: GrupoTareas, id_tarea: int) -> bool:
+        tarea = grupo.locales.pop(id_tarea, None)
+        if tarea is None:
+            return False
+        if not tarea.done():
+            tarea.cancel()
+        self.almacen.liberar(self._clave(grupo.nombre, id_tarea), self.id_worker)
+        return True
+
+    def iniciar_tarea(self, grupo: str, id_tarea: int, datos: dict) -> bool:
+        """
+        Registra la tarea en el almacén compartido y, si su destinatario está conectado a
+        este worker, la arranca de inmediato.
+
+        Args:
+            grupo: Nombre del grupo registrado
+            id_tarea: Identificador de la tarea (ID de la emergencia)
+            datos: Datos serializables en JSON que necesita `ejecutar`
+
+        Returns:
+            True si se registró, False si la tarea ya existía en el clúster o el grupo
+            alcanzó TAREAS_MAX_POR_GRUPO
+        """
+        registro = self._grupos[grupo]
+        if self.almacen.contar_tareas(grupo) >= self.max_por_grupo:
+            self.rechazadas += 1
+            logger.warning("Tarea %s:%s rechazada: el grupo alcanzó %d tareas", grupo, id_tarea, self.max_por_grupo)
+            return False
+        ahora = time.time()
+        registro_datos = {**datos, "_inicio": ahora, "_expira": ahora + self.retencion}
+        if not self.almacen.guardar_tarea(grupo, id_tarea, registro_datos, solo_si_nueva=True):
+            return False
+        if registro.es_local(datos):
+            self._iniciar_local(registro, id_tarea, datos)
+        return True
+
+    def detener_tarea(self, grupo: str, id_tarea: int) -> bool:
+        """
+        Borra la tarea del almacén y la cancela si corre en este worker
+        (si corre en otro, su dueño la cancela en la siguiente conciliación).
+
+        Returns:
+            True si la tarea existía
+        """
+        registro = self._grupos[grupo]
+        existia = self.almacen.eliminar_tarea(grupo, id_tarea)
+        cancelada = self._cancelar_local(registro, id_tarea)
+        return existia or cancelada
+
+    async def detener_tarea_async(self, grupo: str, id_tarea: int) -> bool:
+        """
+        Igual que `detener_tarea`, para corrutinas: la tarea local se cancela en el event
+        loop y el acceso al almacén corre en un hilo.
+
+        Returns:
+            True si la tarea existía
+        """
+        registro = self._grupos[grupo]
+        tarea = registro.locales.pop(id_tarea, None)
+        if tarea is not None and not tarea.done():
+            tarea.cancel()
+        existia = await asyncio.to_thread(self.almacen.eliminar_tarea, grupo, id_tarea)
+        if tarea is not None:
+            await asyncio.to_thread(self.almacen.liberar, self._clave(grupo, id_tarea), self.id_worker)
+        return existia or tarea is not None
+
+    def suspender_tarea(self, grupo: str, id_tarea: int) -> bool:
+        """
+        Detiene la ejecución local de la tarea y libera su lease, pero la conserva
+        registrada para que la retome el worker al que se reconecte el destinatario.
+
+        Returns:
+            True si la tarea corría en este worker
+        """
+        return self._cancelar_local(self._grupos[grupo], id_tarea)
+
+    def finalizar_emergencia(self, emergencia_id: int) -> None:
+        """
+        Elimina del almacén las tareas de la emergencia en todos los grupos (pasó a un
+        estado final). Se puede llamar desde cualquier hilo: no toca las tareas locales,
+        que su dueño cancela en la siguiente conciliación.
+        """
+        for nombre in list(self._grupos):
+            self.almacen.eliminar_tarea(nombre, emergencia_id)
+
+    def listar_tareas(self, grupo: str) -> Dict[int, dict]:
+        """Retorna las tareas registradas del grupo en todo el clúster: id -> datos."""
+        return {
+            id_tarea: {k: v for k, v in datos.items() if not k.startswith("_")}
+            for id_tarea, datos in self.almacen.listar_tareas(grupo).items()
+        }
+
+    def hay_tarea(self, grupo: str, id_tarea: int) -> bool:
+        """Indica si la tarea está registrada (en cualquier worker)."""
+        return self.almacen.existe_tarea(grupo, id_tarea)
+
+    def _leer_registradas(self, grupo: str, ahora: float) -> Dict[int, dict]:
+        """Tareas registradas del grupo, descartando las que superaron la duración máxima."""
+        registradas = self.almacen.listar_tareas(grupo)
+        for id_tarea in [i for i, d in registradas.items() if ahora - d.get("_inicio", ahora) > self.duracion_maxima]:
+            self.vencidas += 1
+            self.almacen.eliminar_tarea(grupo, id_tarea)
+            del registradas[id_tarea]
+        return registradas
+
+    def _mantener(
+        self,
+        grupo: str,
+        liberar: List[int],
+        renovar: List[int],
+        extender: Dict[int, dict],
+    ) -> List[bool]:
+        """Libera y renueva (en un pipeline) los leases de las tareas locales y extiende su retención."""
+        for id_tarea in liberar:
+            self.almacen.liberar(self._clave(grupo, id_tarea), self.id_worker)
+        renovadas = self.almacen.renovar_varios(
+            [self._clave(grupo, id_tarea) for id_tarea in renovar], self.id_worker, self.lease
+        )
+        for id_tarea, datos in extender.items():
+            # Condicional: si otro worker la detuvo mientras tanto, no se vuelve a crear
+            self.almacen.guardar_tarea(grupo, id_tarea, datos, solo_si_existe=True)
+        return renovadas
+
+    def _tomar(self, grupo: str, tomar: Iterable[int], sin_dueno: Iterable[int]) -> List[int]:
+        """Adquiere los leases de `tomar` y elimina las de `sin_dueno` que siguen sin dueño."""
+        adquiridas = [
+            id_tarea for id_tarea in tomar
+            if self.almacen.adquirir(self._clave(grupo, id_tarea), self.id_worker, self.lease)
+        ]
+        for id_tarea in sin_dueno:
+            if self.almacen.dueno(self._clave(grupo, id_tarea)) is None:
+                self.almacen.eliminar_tarea(grupo, id_tarea)
+        return adquiridas
+
+    async def conciliar(self) -> None:
+        """
+        Una pasada de conciliación por grupo:
+        - Renueva los leases de las tareas locales y cancela las detenidas en otro worker
+          o cuyo lease se perdió.
+        - Libera las tareas locales que terminaron (el destinatario se desconectó).
+        - Toma las tareas registradas cuyo destinatario está conectado aquí y que no
+          tienen dueño (nuevas o de un worker caído).
+        - Descarta las tareas sin dueño cuya retención venció y las que superaron
+          la duración máxima.
+        """
+        ahora = time.time()
+        for grupo in list(self._grupos.values()):
+            registradas = await self._en_almacen(self._leer_registradas, grupo.nombre, ahora)
+
+            liberar: List[int] = []
+            renovar: List[Tuple[int, asyncio.Task]] = []
+            extender: Dict[int, dict] = {}
+            for id_tarea, tarea in list(grupo.locales.items()):
+                if tarea.done():
+                    del grupo.locales[id_tarea]
+                    liberar.append(id_tarea)
+                elif id_tarea not in registradas:
+                    self.canceladas_remotamente += 1
+                    del grupo.locales[id_tarea]
+                    tarea.cancel()
+                    liberar.append(id_tarea)
+                else:
+                    renovar.append((id_tarea, tarea))
+                    datos = registradas[id_tarea]
+                    if datos.get("_expira", 0) - ahora < self.retencion / 2:
+                        extender[id_tarea] = {**datos, "_expira": ahora + self.retencion}
+
+            renovadas = await self._en_almacen(
+                self._mantener, grupo.nombre, liberar, [id_tarea for id_tarea, _ in renovar], extender
+            )
+            for (id_tarea, tarea), renovada in zip(renovar, renovadas):
+                if not renovada and grupo.locales.get(id_tarea) is tarea:
+                    self.perdidas += 1
+                    logger.warning(
+                        "Lease perdido para la tarea %s; se cancela en este worker", self._clave(grupo.nombre, id_tarea)
+                    )
+                    grupo.locales.pop(id_tarea).cancel()
+
+            tomar: Dict[int, dict] = {}
+            sin_dueno: List[int] = []
+            for id_tarea, datos in registradas.items():
+                if id_tarea in grupo.locales:
+                    continue
+                if grupo.es_local(datos):
+                    tomar[id_tarea] = datos
+                elif datos.get("_expira", ahora) < ahora:
+                    sin_dueno.append(id_tarea)
+            if not tomar and not sin_dueno:
+                continue
+            for id_tarea in await self._en_almacen(self._tomar, grupo.nombre, list(tomar), sin_dueno):
+                if id_tarea not in grupo.locales:
+                    self._arrancar(grupo, id_tarea, tomar[id_tarea])
+
+    async def _conciliar_periodicamente(self) -> None:
+        while True:
+            try:
+                await self.conciliar()
+            except Exception as e:
+                log_muestreado(logger, logging.ERROR, "conciliacion_tareas", "Error al conciliar tareas: %s", e)
+            await asyncio.sleep(self.intervalo)
+
+    async def iniciar(self) -> None:
+        """Arranca la conciliación periódica."""
+        if self._tarea_conciliacion is None or self._tarea_conciliacion.done():
+            self._tarea_conciliacion = asyncio.create_task(self._conciliar_periodicamente())
+
+    async def detener(self) -> None:
+        """Detiene la conciliación y libera las tareas locales para que otro worker las tome."""
+        if self._tarea_conciliacion is not None:
+            self._tarea_conciliacion.cancel()
+            try:
+                await self._tarea_conciliacion
+            except asyncio.CancelledError:
+                pass
+            self._tarea_conciliacion = None
+        for grupo in self._grupos.values():
+            for id_tarea in list(grupo.locales):
+                try:
+                    self._cancelar_local(grupo, id_tarea)
+                except Exception as e:
+                    logger.warning("No se pudo liberar la tarea %s:%s: %s", grupo.nombre, id_tarea, e)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna las métricas del coordinador.
+
+        Returns:
+            Diccionario con el worker, el almacén, las tareas locales por grupo y contadores
+        """
+        return {
+            "worker": self.id_worker,
+            "almacen": type(self.almacen).__name__,
+            "tareas_locales": {nombre: len(grupo.locales) for nombre, grupo in self._grupos.items()},
+            "tomadas": self.tomadas,
+            "leases_perdidos": self.perdidas,
+            "canceladas_remotamente": self.canceladas_remotamente,
+            "terminadas": self.terminadas,
+            "fallidas": self.fallidas,
+            "rechazadas": self.rechazadas,
+            "vencidas": self.vencidas,
+        }
+
+    def describir(self) -> Dict[str, list]:
+        """
+        Retorna, por grupo, las tareas registradas en el clúster con su dueño actual,
+        si corren en este worker y su edad.
+
+        Returns:
+            Diccionario grupo -> lista de tareas
+        """
+        ahora = time.time()
+        resultado = {}
+        for nombre, grupo in self._grupos.items():
+            tareas = []
+            for id_tarea, datos in sorted(self.almacen.listar_tareas(nombre).items()):
+                tareas.append({
+                    "id": id_tarea,
+                    "datos": {k: v for k, v in datos.items() if not k.startswith("_")},
+                    "dueno": self.almacen.dueno(self._clave(nombre, id_tarea)),
+                    "local": id_tarea in grupo.locales,
+                    "edad_segundos": round(ahora - datos.get("_inicio", ahora), 1),
+                })
+            resultado[nombre] = tareas
+        return resultado
+
+
+# Instancia global del coordinador (singleton pattern)
+_coordinador_tareas: Optional[CoordinadorTareas] = None
+
+
+def get_coordinador_tareas() -> CoordinadorTareas:
+    """
+    Obtiene la instancia global del coordinador de tareas periódicas.
+
+    Returns:
+        Instancia de CoordinadorTareas con el almacén configurado en TAREAS_ALMACEN
+    """
+    global _coordinador_tareas
+    if _coordinador_tareas is None:
+        almacen = AlmacenTareasLocal() if TAREAS_ALMACEN == "local" else AlmacenTareasRedis()
+        _coordinador_tareas = CoordinadorTareas(almacen)
+    return _coordinador_tareas
@@ -7,16 +7,23 @@ La ubicación se obtiene desde Redis donde se almacena en tiempo real.
 
 La selección de la ambulancia óptima se realiza **una sola vez** en el endpoint
 `/valorar-emergencia`, y a partir de su `id_ambulancia` se comienza a enviar su ubicación.
+
+Las tareas se registran en el coordinador de tareas: con varios workers, cada una se
+ejecuta una sola vez, en el worker que tiene conectado al operador (ver coordinadorTareas).
 """
 
 import asyncio
 import json
-from typing import Dict
+import logging
 from src.businessLayer.businessComponents.notificaciones.notificadorOperadorEmergencias import get_manager_operadores_emergencia
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
 from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+
+logger = logging.getLogger(__name__)
 
-# Diccionario para almacenar las tareas activas: {emergencia_id: task}
-_tareas_activas: Dict[int, asyncio.Task] = {}
+# Grupo de tareas en el coordinador (una tarea por emergencia)
+GRUPO_TAREAS = "ambulancia_operador"
 
 
 async def _enviar_info_ambulancia_periodicamente(
@@ -46,9 +53,9 @@ async def _enviar_info_ambulancia_periodicamente(
                 # Verificar si hay conexiones activas para este operador
                 if not manager.is_connected(id_operador):
                     # No hay conexiones activas, detener la tarea
-                    print(
-                        f"No hay conexiones activas para operador {id_operador}, "
-                        f"deteniendo envío de ubicación de ambulancia {id_ambulancia}"
+                    logger.info(
+                        "No hay conexiones activas para operador %s, deteniendo envío de ubicación de ambulancia %s",
+                        id_operador, id_ambulancia
                     )
                     break
 
@@ -57,7 +64,10 @@ async def _enviar_info_ambulancia_periodicamente(
 
                 if not valor_ubicacion:
                     # Si no hay ubicación en Redis, la ambulancia no está conectada
-                    print(f"[WARN] No hay ubicacion en Redis para ambulancia {id_ambulancia} (key: {key_ubicacion})")
+                    log_muestreado(
+                        logger, logging.WARNING, f"sin_ubicacion:{id_ambulancia}",
+                        "No hay ubicación en Redis para ambulancia %s (key: %s)", id_ambulancia, key_ubicacion
+                    )
                     await asyncio.sleep(1)
                     continue
 
@@ -84,12 +94,16 @@ async def _enviar_info_ambulancia_periodicamente(
 
                             # Enviar al operador usando send_to_id
                             await manager.send_to_id(mensaje, id_operador)
-                            print(f"[DEBUG] Enviada ubicacion de ambulancia {id_ambulancia} al operador {id_operador}: lat={latitud}, lng={longitud}")
+                            logger.debug(
+                                "Enviada ubicación de ambulancia %s al operador %s: lat=%s, lng=%s",
+                                id_ambulancia, id_operador, latitud, longitud
+                            )
 
                     except (json.JSONDecodeError, KeyError) as e:
                         # Si hay error al parsear, continuar sin enviar esta vez
-                        print(
-                            f"Error al parsear ubicación de ambulancia {id_ambulancia}: {e}"
+                        log_muestreado(
+                            logger, logging.WARNING, f"ubicacion_invalida:{id_ambulancia}",
+                            "Error al parsear ubicación de ambulancia %s: %s", id_ambulancia, e
                         )
 
                 # Esperar 1 segundo antes de la siguiente iteración
@@ -100,19 +114,32 @@ async def _enviar_info_ambulancia_periodicamente(
                 break
             except Exception as e:
                 # Si hay un error, esperar un poco y continuar
-                print(f"Error al enviar ubicación de ambulancia: {e}")
+                log_muestreado(
+                    logger, logging.ERROR, f"error_envio_operador:{emergencia_id}",
+                    "Error al enviar ubicación de ambulancia %s: %s", id_ambulancia, e
+                )
                 await asyncio.sleep(1)
 
     except asyncio.CancelledError:
-        # Tarea cancelada, limpiar
-        if emergencia_id in _tareas_activas:
-            del _tareas_activas[emergencia_id]
+        # Tarea cancelada (el coordinador libera su lease)
+        pass
     except Exception as e:
-        print(
-            f"Error en tarea periódica de ambulancias para emergencia {emergencia_id}: {e}"
-        )
-        if emergencia_id in _tareas_activas:
-            del _tareas_activas[emergencia_id]
+        logger.error("Error en tarea periódica de ambulancias para emergencia %s: %s", emergencia_id, e)
+
+
+async def _ejecutar_tarea(emergencia_id: int, datos: dict) -> None:
+    await _enviar_info_ambulancia_periodicamente(
+        id_operador=datos["id_operador"],
+        emergencia_id=emergencia_id,
+        id_ambulancia=datos["id_ambulancia"],
+    )
+
+
+def _operador_conectado(datos: dict) -> bool:
+    return get_manager_operadores_emergencia().is_connected(datos["id_operador"])
+
+
+get_coordinador_tareas().registrar_grupo(GRUPO_TAREAS, _ejecutar_tarea, _operador_conectado)
 
 
 def iniciar_envio_ambulancias(
@@ -122,7 +149,8 @@ def iniciar_envio_ambulancias(
 ) -> bool:
     """
     Inicia el envío periódico de la ubicación de una ambulancia específica
-    a un operador de emergencia.
+    a un operador de emergencia. Si el operador está conectado a otro worker,
+    ese worker toma la tarea.
 
     Args:
         id_operador: ID del operador de emergencia
@@ -132,37 +160,24 @@ def iniciar_envio_ambulancias(
     Returns:
         True si se inició correctamente, False si ya existe una tarea para esta emergencia
     """
-    # Si ya existe una tarea para esta emergencia, no crear otra
-    if emergencia_id in _tareas_activas:
-        print(f"[WARN] Ya existe una tarea activa para emergencia {emergencia_id}")
-        return False
-
-    print(f"[INFO] Iniciando envio de ubicacion de ambulancia {id_ambulancia} al operador {id_operador} para emergencia {emergencia_id}")
-
-    # Crear la tarea asíncrona
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        # Si no hay loop corriendo, crear uno nuevo
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    task = loop.create_task(
-        _enviar_info_ambulancia_periodicamente(
-            id_operador=id_operador,
-            emergencia_id=emergencia_id,
-            id_ambulancia=id_ambulancia,
-        )
+    logger.info(
+        "Iniciando envío de ubicación de ambulancia %s al operador %s para emergencia %s",
+        id_ambulancia, id_operador, emergencia_id
     )
-
-    _tareas_activas[emergencia_id] = task
-    print(f"[INFO] Tarea creada exitosamente para emergencia {emergencia_id}")
-    return True
+    iniciada = get_coordinador_tareas().iniciar_tarea(
+        GRUPO_TAREAS,
+        emergencia_id,
+        {"id_operador": id_operador, "id_ambulancia": id_ambulancia},
+    )
+    if not iniciada:
+        logger.warning("Ya existe una tarea activa para emergencia %s", emergencia_id)
+    return iniciada
 
 
-def detener_envio_ambulancias(emergencia_id: int) -> bool:
+async def detener_envio_ambulancias(emergencia_id: int) -> bool:
     """
-    Detiene el envío periódico de información de ambulancias para una emergencia.
+    Detiene el envío periódico de información de ambulancias para una emergencia,
+    en el worker que lo esté ejecutando (el acceso al almacén corre en un hilo).
     
     Args:
         emergencia_id: ID de la emergencia
@@ -170,24 +185,12 @@ def detener_envio_ambulancias(emergencia_id: int) -> bool:
     Returns:
         True si se detuvo correctamente, False si no había una tarea activa
     """
-    if emergencia_id not in _tareas_activas:
-        return False
-    
-    task = _tareas_activas[emergencia_id]
-    
-    # Cancelar la tarea
-    if not task.done():
-        task.cancel()
-    
-    # Remover de la lista de tareas activas
-    del _tareas_activas[emergencia_id]
-    
-    return True
+    return await get_coordinador_tareas().detener_tarea_async(GRUPO_TAREAS, emergencia_id)
 
 
 def hay_tarea_activa(emergencia_id: int) -> bool:
     """
-    Verifica si hay una tarea activa para una emergencia.
+    Verifica si hay una tarea activa para una emergencia (en cualquier worker).
     
     Args:
         emergencia_id: ID de la emergencia
@@ -195,5 +198,4 @@ def hay_tarea_activa(emergencia_id: int) -> bool:
     Returns:
         True si hay una tarea activa, False en caso contrario
     """
-    return emergencia_id in _tareas_activas
-
+    return get_coordinador_tareas().hay_tarea(GRUPO_TAREAS, emergencia_id)
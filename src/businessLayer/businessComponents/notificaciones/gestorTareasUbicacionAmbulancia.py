@@ -4,61 +4,111 @@ al websocket del solicitante.
 
 Este módulo gestiona el envío periódico de la ubicación de la ambulancia que está atendiendo
 una emergencia al solicitante que la reportó.
-La ubicación se obtiene desde Redis donde se almacena en tiempo real.
+La ubicación se obtiene desde Redis donde se almacena en tiempo real. Entre un reporte y
+el siguiente se envía la posición estimada por el modelo de movimiento de la ambulancia
+(velocidad y rumbo de sus últimos reportes) junto con el ETA a la emergencia, de modo que
+el mapa avanza de forma continua aunque la ambulancia reporte con menos frecuencia
+(ver modeloMovimiento).
+
+Las tareas se registran en el coordinador de tareas: con varios workers, cada una se
+ejecuta una sola vez, en el worker que tiene conectado al solicitante, y se retoma en otro
+worker si el solicitante se reconecta allí (ver coordinadorTareas).
 """
 
 import asyncio
 import json
-from typing import Dict, Optional
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 from src.businessLayer.businessComponents.notificaciones.notificadorSolicitante import get_manager_solicitantes
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
+from src.businessLayer.businessComponents.notificaciones.modeloMovimiento import ModeloMovimiento
 from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+
+logger = logging.getLogger(__name__)
+
+# Grupo de tareas en el coordinador (una tarea por emergencia)
+GRUPO_TAREAS = "ambulancia_solicitante"
 
-# Diccionario para almacenar las tareas activas: {emergencia_id: task}
-_tareas_activas: Dict[int, asyncio.Task] = {}
 
-# Diccionario para mapear id_solicitante -> emergencia_id (para poder detener cuando se desconecta)
-_solicitante_a_emergencia: Dict[int, int] = {}
+def _mensaje_ubicacion(
+    modelo: ModeloMovimiento,
+    datos_ubicacion: dict,
+    destino: Optional[Tuple[float, float]],
+    ahora: datetime,
+) -> Optional[str]:
+    """
+    Incorpora la última ubicación reportada al modelo de movimiento y arma el mensaje
+    con la posición estimada para `ahora`. None si la ubicación no tiene coordenadas.
+    """
+    latitud = datos_ubicacion.get('latitud')
+    longitud = datos_ubicacion.get('longitud')
+    if latitud is None or longitud is None:
+        return None
+
+    timestamp = datos_ubicacion.get('timestamp')
+    if not timestamp:
+        # Sin instante del reporte no se puede estimar el movimiento: se envía tal cual
+        return json.dumps({"type": "ubicacion_ambulancia", "latitud": latitud, "longitud": longitud})
+
+    instante = datetime.fromisoformat(timestamp)
+    if instante.tzinfo is None:
+        instante = instante.replace(tzinfo=timezone.utc)
+    modelo.actualizar(float(latitud), float(longitud), instante)
+    latitud_estimada, longitud_estimada = modelo.predecir(ahora)
+    rumbo = modelo.rumbo
+    return json.dumps({
+        "type": "ubicacion_ambulancia",
+        "latitud": latitud_estimada,
+        "longitud": longitud_estimada,
+        "estimada": modelo.velocidad > 0 and modelo.segundos_desde_reporte(ahora) > 0,
+        "velocidad": round(modelo.velocidad, 1),
+        "rumbo": round(rumbo) if rumbo is not None else None,
+        "segundos_desde_reporte": round(modelo.segundos_desde_reporte(ahora), 1),
+        "eta_segundos": modelo.eta_segundos(destino, ahora) if destino else None,
+    })
 
 
 async def _enviar_ubicacion_ambulancia_periodicamente(
     id_solicitante: int,
     emergencia_id: int,
-    id_ambulancia: int
+    id_ambulancia: int,
+    destino: Optional[Tuple[float, float]] = None,
 ):
     """
     Tarea asíncrona que envía la ubicación de la ambulancia asignada cada segundo.
-    Obtiene la ubicación desde Redis (donde se almacena en tiempo real).
+    Obtiene la última ubicación reportada desde Redis y, con el modelo de movimiento,
+    envía la posición estimada entre reportes junto con velocidad, rumbo y ETA.
     
     Args:
         id_solicitante: ID del solicitante que recibirá las actualizaciones
         emergencia_id: ID de la emergencia
         id_ambulancia: ID de la ambulancia asignada
+        destino: (latitud, longitud) de la emergencia, para el ETA
     """
     manager = get_manager_solicitantes()
     client = get_redis_client()
     key_ubicacion = f"ambulancia:{id_ambulancia}:ubicacion"
+    modelo = ModeloMovimiento()
     
     # Enviar la primera ubicación inmediatamente si está disponible
     try:
         valor_ubicacion_inicial = client.get(key_ubicacion)
         if valor_ubicacion_inicial:
             try:
-                datos_ubicacion = json.loads(valor_ubicacion_inicial)
-                latitud = datos_ubicacion.get('latitud')
-                longitud = datos_ubicacion.get('longitud')
-                
-                if latitud is not None and longitud is not None:
-                    mensaje = json.dumps({
-                        "type": "ubicacion_ambulancia",
-                        "latitud": latitud,
-                        "longitud": longitud
-                    })
+                mensaje = _mensaje_ubicacion(
+                    modelo, json.loads(valor_ubicacion_inicial), destino, datetime.now(timezone.utc)
+                )
+                if mensaje:
                     await manager.send_to_id(mensaje, id_solicitante)
-                    print(f"[DEBUG] Primera ubicación de ambulancia {id_ambulancia} enviada inmediatamente al solicitante {id_solicitante}")
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error al parsear ubicación inicial de ambulancia {id_ambulancia}: {e}")
+                    logger.debug(
+                        "Primera ubicación de ambulancia %s enviada al solicitante %s", id_ambulancia, id_solicitante
+                    )
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                logger.warning("Error al parsear ubicación inicial de ambulancia %s: %s", id_ambulancia, e)
     except Exception as e:
-        print(f"Error al obtener ubicación inicial de ambulancia {id_ambulancia}: {e}")
+        logger.warning("Error al obtener ubicación inicial de ambulancia %s: %s", id_ambulancia, e)
     
     try:
         while True:
@@ -66,35 +116,29 @@ async def _enviar_ubicacion_ambulancia_periodicamente(
                 # Verificar si hay conexiones activas para este solicitante
                 if not manager.is_connected(id_solicitante):
                     # No hay conexiones activas, detener la tarea
-                    print(f"No hay conexiones activas para solicitante {id_solicitante}, deteniendo envío de ubicación")
+                    logger.info(
+                        "No hay conexiones activas para solicitante %s, deteniendo envío de ubicación", id_solicitante
+                    )
                     break
                 
-                # Obtener la ubicación de la ambulancia desde Redis
+                # Obtener la última ubicación reportada desde Redis
                 valor_ubicacion = client.get(key_ubicacion)
                 
                 if valor_ubicacion:
                     try:
-                        # Parsear JSON
-                        datos_ubicacion = json.loads(valor_ubicacion)
-                        
-                        # Validar que tenga los campos necesarios
-                        latitud = datos_ubicacion.get('latitud')
-                        longitud = datos_ubicacion.get('longitud')
-                        
-                        if latitud is not None and longitud is not None:
-                            # Preparar mensaje con type, latitud y longitud
-                            mensaje = json.dumps({
-                                "type": "ubicacion_ambulancia",
-                                "latitud": latitud,
-                                "longitud": longitud
-                            })
-                            
-                            # Enviar al solicitante usando send_to_id
+                        # Entre reportes se envía la posición estimada por el modelo
+                        mensaje = _mensaje_ubicacion(
+                            modelo, json.loads(valor_ubicacion), destino, datetime.now(timezone.utc)
+                        )
+                        if mensaje:
                             await manager.send_to_id(mensaje, id_solicitante)
                     
-                    except (json.JSONDecodeError, KeyError) as e:
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
                         # Si hay error al parsear, continuar sin enviar esta vez
-                        print(f"Error al parsear ubicación de ambulancia {id_ambulancia}: {e}")
+                        log_muestreado(
+                            logger, logging.WARNING, f"ubicacion_invalida:{id_ambulancia}",
+                            "Error al parsear ubicación de ambulancia %s: %s", id_ambulancia, e
+                        )
                 
                 # Esperar 1 segundo antes de la siguiente iteración
                 await asyncio.sleep(1)
@@ -104,73 +148,72 @@ async def _enviar_ubicacion_ambulancia_periodicamente(
                 break
             except Exception as e:
                 # Si hay un error, esperar un poco y continuar
-                print(f"Error al enviar ubicación de ambulancia: {e}")
+                log_muestreado(
+                    logger, logging.ERROR, f"error_envio_solicitante:{emergencia_id}",
+                    "Error al enviar ubicación de ambulancia %s: %s", id_ambulancia, e
+                )
                 await asyncio.sleep(1)
                 
     except asyncio.CancelledError:
-        # Tarea cancelada, limpiar
-        if emergencia_id in _tareas_activas:
-            del _tareas_activas[emergencia_id]
-        # Limpiar el mapeo de solicitante a emergencia
-        solicitantes_a_eliminar = [sid for sid, eid in _solicitante_a_emergencia.items() if eid == emergencia_id]
-        for sid in solicitantes_a_eliminar:
-            if sid in _solicitante_a_emergencia:
-                del _solicitante_a_emergencia[sid]
+        # Tarea cancelada (el coordinador libera su lease)
+        pass
     except Exception as e:
-        print(f"Error en tarea periódica de ubicación de ambulancia para emergencia {emergencia_id}: {e}")
-        if emergencia_id in _tareas_activas:
-            del _tareas_activas[emergencia_id]
-        # Limpiar el mapeo de solicitante a emergencia
-        solicitantes_a_eliminar = [sid for sid, eid in _solicitante_a_emergencia.items() if eid == emergencia_id]
-        for sid in solicitantes_a_eliminar:
-            if sid in _solicitante_a_emergencia:
-                del _solicitante_a_emergencia[sid]
+        logger.error("Error en tarea periódica de ubicación de ambulancia para emergencia %s: %s", emergencia_id, e)
+
+
+async def _ejecutar_tarea(emergencia_id: int, datos: dict) -> None:
+    await _enviar_ubicacion_ambulancia_periodicamente(
+        id_solicitante=datos["id_solicitante"],
+        emergencia_id=emergencia_id,
+        id_ambulancia=datos["id_ambulancia"],
+        destino=tuple(datos["destino"]) if datos.get("destino") else None,
+    )
+
+
+def _solicitante_conectado(datos: dict) -> bool:
+    return get_manager_solicitantes().is_connected(datos["id_solicitante"])
+
+
+get_coordinador_tareas().registrar_grupo(GRUPO_TAREAS, _ejecutar_tarea, _solicitante_conectado)
+
+
+def _emergencias_de_solicitante(id_solicitante: int) -> List[int]:
+    return [
+        emergencia_id
+        for emergencia_id, datos in get_coordinador_tareas().listar_tareas(GRUPO_TAREAS).items()
+        if datos.get("id_solicitante") == id_solicitante
+    ]
 
 
 def iniciar_envio_ubicacion_ambulancia(
     id_solicitante: int,
     emergencia_id: int,
-    id_ambulancia: int
+    id_ambulancia: int,
+    destino: Optional[Tuple[float, float]] = None
 ) -> bool:
     """
     Inicia el envío periódico de la ubicación de la ambulancia asignada al solicitante.
+    Si el solicitante está conectado a otro worker, ese worker toma la tarea.
     
     Args:
         id_solicitante: ID del solicitante que recibirá las actualizaciones
         emergencia_id: ID de la emergencia
         id_ambulancia: ID de la ambulancia asignada
+        destino: (latitud, longitud) de la emergencia; si se indica, los mensajes incluyen el ETA
         
     Returns:
         True si se inició correctamente, False si ya existe una tarea para esta emergencia
     """
-    # Si ya existe una tarea para esta emergencia, no crear otra
-    if emergencia_id in _tareas_activas:
-        return False
-    
-    # Crear la tarea asíncrona
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        # Si no hay loop corriendo, crear uno nuevo
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    task = loop.create_task(
-        _enviar_ubicacion_ambulancia_periodicamente(
-            id_solicitante=id_solicitante,
-            emergencia_id=emergencia_id,
-            id_ambulancia=id_ambulancia
-        )
-    )
-    
-    _tareas_activas[emergencia_id] = task
-    _solicitante_a_emergencia[id_solicitante] = emergencia_id
-    return True
+    datos = {"id_solicitante": id_solicitante, "id_ambulancia": id_ambulancia}
+    if destino is not None:
+        datos["destino"] = [destino[0], destino[1]]
+    return get_coordinador_tareas().iniciar_tarea(GRUPO_TAREAS, emergencia_id, datos)
 
 
 def detener_envio_ubicacion_ambulancia(emergencia_id: int) -> bool:
     """
-    Detiene el envío periódico de la ubicación de la ambulancia para una emergencia.
+    Detiene el envío periódico de la ubicación de la ambulancia para una emergencia,
+    en el worker que lo esté ejecutando.
     
     Args:
         emergencia_id: ID de la emergencia
@@ -178,30 +221,13 @@ def detener_envio_ubicacion_ambulancia(emergencia_id: int) -> bool:
     Returns:
         True si se detuvo correctamente, False si no había una tarea activa
     """
-    if emergencia_id not in _tareas_activas:
-        return False
-    
-    task = _tareas_activas[emergencia_id]
-    
-    # Cancelar la tarea
-    if not task.done():
-        task.cancel()
-    
-    # Remover de la lista de tareas activas
-    del _tareas_activas[emergencia_id]
-    
-    # Limpiar el mapeo de solicitante a emergencia
-    solicitantes_a_eliminar = [sid for sid, eid in _solicitante_a_emergencia.items() if eid == emergencia_id]
-    for sid in solicitantes_a_eliminar:
-        del _solicitante_a_emergencia[sid]
-    
-    return True
+    return get_coordinador_tareas().detener_tarea(GRUPO_TAREAS, emergencia_id)
 
 
 def detener_envio_por_solicitante(id_solicitante: int) -> bool:
     """
-    Detiene el envío periódico de la ubicación de la ambulancia para un solicitante específico.
-    Se usa cuando el websocket del solicitante se desconecta.
+    Detiene definitivamente el envío periódico de la ubicación de la ambulancia
+    para un solicitante específico.
     
     Args:
         id_solicitante: ID del solicitante
@@ -209,16 +235,31 @@ def detener_envio_por_solicitante(id_solicitante: int) -> bool:
     Returns:
         True si se detuvo correctamente, False si no había una tarea activa para ese solicitante
     """
-    if id_solicitante not in _solicitante_a_emergencia:
-        return False
+    detenidas = [detener_envio_ubicacion_ambulancia(e) for e in _emergencias_de_solicitante(id_solicitante)]
+    return any(detenidas)
+
+
+def suspender_envio_por_solicitante(id_solicitante: int) -> bool:
+    """
+    Detiene en este worker el envío al solicitante (su websocket se desconectó), pero
+    conserva la tarea para retomarla cuando se reconecte, en este o en otro worker.
     
-    emergencia_id = _solicitante_a_emergencia[id_solicitante]
-    return detener_envio_ubicacion_ambulancia(emergencia_id)
+    Args:
+        id_solicitante: ID del solicitante
+        
+    Returns:
+        True si había una tarea ejecutándose aquí para ese solicitante
+    """
+    coordinador = get_coordinador_tareas()
+    suspendidas = [
+        coordinador.suspender_tarea(GRUPO_TAREAS, e) for e in _emergencias_de_solicitante(id_solicitante)
+    ]
+    return any(suspendidas)
 
 
 def hay_tarea_activa(emergencia_id: int) -> bool:
     """
-    Verifica si hay una tarea activa para una emergencia.
+    Verifica si hay una tarea activa para una emergencia (en cualquier worker).
     
     Args:
         emergencia_id: ID de la emergencia
@@ -226,5 +267,4 @@ def hay_tarea_activa(emergencia_id: int) -> bool:
     Returns:
         True si hay una tarea activa, False en caso contrario
     """
-    return emergencia_id in _tareas_activas
-
+    return get_coordinador_tareas().hay_tarea(GRUPO_TAREAS, emergencia_id)
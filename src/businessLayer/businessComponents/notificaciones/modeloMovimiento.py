@@ -0,0 +1,153 @@
+"""
+Modelo de movimiento (dead reckoning) de una ambulancia para el envío de su ubicación.
+
+A partir de las últimas ubicaciones reportadas estima velocidad y rumbo, y con ellos
+predice la posición actual entre un reporte y el siguiente. Así el mapa del solicitante
+se mueve de forma continua aunque la ambulancia reporte con menos frecuencia.
+
+La predicción se limita a PREDICCION_MAX_SEGUNDOS desde el último reporte: si la
+ambulancia deja de reportar, la posición se congela en vez de seguir extrapolando.
+"""
+
+import math
+import os
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional, Tuple
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Reportes recientes usados para estimar la velocidad
+MOVIMIENTO_MAX_PUNTOS: int = int(os.getenv("MOVIMIENTO_MAX_PUNTOS", "4"))
+# Antigüedad máxima de un reporte para usarlo en la estimación
+MOVIMIENTO_VENTANA_SEGUNDOS: float = float(os.getenv("MOVIMIENTO_VENTANA_SEGUNDOS", "30"))
+# Velocidad por debajo de la cual la ambulancia se considera detenida (m/s)
+MOVIMIENTO_VELOCIDAD_MINIMA: float = float(os.getenv("MOVIMIENTO_VELOCIDAD_MINIMA", "0.5"))
+# Máximo tiempo que se extrapola la posición después del último reporte
+PREDICCION_MAX_SEGUNDOS: float = float(os.getenv("PREDICCION_MAX_SEGUNDOS", "15"))
+# Velocidad usada para el ETA cuando la ambulancia está detenida o aún no hay estimación
+ETA_VELOCIDAD_REFERENCIA_KMH: float = float(os.getenv("ETA_VELOCIDAD_REFERENCIA_KMH", "30"))
+
+RADIO_TIERRA_METROS = 6371000.0
+
+
+def distancia_metros(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo (Haversine) en metros."""
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(delta_lat / 2) ** 2 +
+        math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(delta_lon / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_METROS * math.asin(math.sqrt(a))
+
+
+class ModeloMovimiento:
+    """
+    Velocidad y rumbo de una ambulancia estimados a partir de sus últimos reportes.
+    """
+
+    def __init__(
+        self,
+        max_puntos: int = MOVIMIENTO_MAX_PUNTOS,
+        ventana: float = MOVIMIENTO_VENTANA_SEGUNDOS,
+        velocidad_minima: float = MOVIMIENTO_VELOCIDAD_MINIMA,
+        horizonte: float = PREDICCION_MAX_SEGUNDOS,
+    ):
+        self.ventana = ventana
+        self.velocidad_minima = velocidad_minima
+        self.horizonte = horizonte
+        # (instante epoch, latitud, longitud) de los reportes, el más reciente al final
+        self._puntos: Deque[Tuple[float, float, float]] = deque(maxlen=max(2, max_puntos))
+        # Componentes de la velocidad en m/s (este, norte)
+        self._v_este = 0.0
+        self._v_norte = 0.0
+
+    @property
+    def ultimo(self) -> Optional[Tuple[float, float, float]]:
+        return self._puntos[-1] if self._puntos else None
+
+    @property
+    def velocidad(self) -> float:
+        """Velocidad estimada en m/s (0 si está detenida)."""
+        rapidez = math.hypot(self._v_este, self._v_norte)
+        return rapidez if rapidez >= self.velocidad_minima else 0.0
+
+    @property
+    def rumbo(self) -> Optional[float]:
+        """Rumbo en grados desde el norte, en sentido horario (None si está detenida)."""
+        if self.velocidad == 0.0:
+            return None
+        return math.degrees(math.atan2(self._v_este, self._v_norte)) % 360
+
+    def actualizar(self, latitud: float, longitud: float, instante: datetime) -> bool:
+        """
+        Incorpora un reporte de ubicación y recalcula velocidad y rumbo.
+
+        Returns:
+            True si el reporte es nuevo (posterior al último incorporado)
+        """
+        t = instante.timestamp()
+        if self._puntos and t <= self._puntos[-1][0]:
+            return False
+        self._puntos.append((t, latitud, longitud))
+        while len(self._puntos) > 1 and t - self._puntos[0][0] > self.ventana:
+            self._puntos.popleft()
+
+        if len(self._puntos) < 2:
+            self._v_este = self._v_norte = 0.0
+            return True
+        # Desplazamiento promedio entre el reporte más viejo de la ventana y el actual:
+        # suaviza el ruido del GPS sin retrasar demasiado los giros
+        t0, lat0, lon0 = self._puntos[0]
+        dt = t - t0
+        self._v_norte = math.radians(latitud - lat0) * RADIO_TIERRA_METROS / dt
+        self._v_este = (
+            math.radians(longitud - lon0) * RADIO_TIERRA_METROS *
+            math.cos(math.radians((latitud + lat0) / 2)) / dt
+        )
+        return True
+
+    def segundos_desde_reporte(self, ahora: datetime) -> Optional[float]:
+        if not self._puntos:
+            return None
+        return max(0.0, ahora.timestamp() - self._puntos[-1][0])
+
+    def predecir(self, ahora: datetime) -> Optional[Tuple[float, float]]:
+        """
+        Posición estimada en `ahora`, extrapolando desde el último reporte como máximo
+        `horizonte` segundos. None si aún no hay reportes.
+        """
+        if not self._puntos:
+            return None
+        _, latitud, longitud = self._puntos[-1]
+        if self.velocidad == 0.0:
+            return latitud, longitud
+        dt = min(self.segundos_desde_reporte(ahora), self.horizonte)
+        latitud_estimada = latitud + math.degrees(self._v_norte * dt / RADIO_TIERRA_METROS)
+        longitud_estimada = longitud + math.degrees(
+            self._v_este * dt / (RADIO_TIERRA_METROS * math.cos(math.radians(latitud)))
+        )
+        return max(-90.0, min(90.0, latitud_estimada)), longitud_estimada
+
+    def eta_segundos(
+        self,
+        destino: Tuple[float, float],
+        ahora: datetime,
+        velocidad_referencia_kmh: float = ETA_VELOCIDAD_REFERENCIA_KMH,
+    ) -> Optional[int]:
+        """
+        Tiempo estimado de llegada al destino (latitud, longitud) en segundos.
+
+        Usa la distancia en línea recta desde la posición estimada y la mayor entre la
+        velocidad actual y la de referencia (una ambulancia detenida en un semáforo no
+        tiene un ETA infinito).
+        """
+        posicion = self.predecir(ahora)
+        if posicion is None:
+            return None
+        metros = distancia_metros(posicion[0], posicion[1], destino[0], destino[1])
+        velocidad = max(self.velocidad, velocidad_referencia_kmh / 3.6)
+        return int(round(metros / velocidad))
@@ -1,6 +1,8 @@
 from fastapi import WebSocket
 from typing import Dict, List, Optional, Set, TYPE_CHECKING
 from collections import defaultdict
+from enum import Enum
+from src.businessLayer.businessComponents.telemetria.latencias import medir
 
 if TYPE_CHECKING:
     from .estrategiaNotificacion import EstrategiaNotificacion
@@ -52,7 +54,12 @@ class notificador:
         if not self.estrategia:
             raise ValueError("No se ha configurado una estrategia de notificación. Use set_estrategia() o pase una estrategia en el constructor.")
         
-        await self.estrategia.enviar(self, tipo, datos, **kwargs)
+        # Algunos tipos llegan como Enum o como texto "Clase.MIEMBRO" (el `type` que ve el
+        # cliente no cambia): la métrica usa solo el miembro
+        etiqueta = tipo.value if isinstance(tipo, Enum) else str(tipo)
+        etiqueta = etiqueta.rsplit(".", 1)[-1]
+        with medir(f"notificacion.{etiqueta}"):
+            await self.estrategia.enviar(self, tipo, datos, **kwargs)
 
     async def connect(self, websocket: WebSocket, entity_id: Optional[int] = None):
         """
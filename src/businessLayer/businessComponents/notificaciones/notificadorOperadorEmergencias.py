@@ -29,6 +29,25 @@ async def notificar_nueva_solicitud(nombre_sala: str, datos_solicitud: Dict[str,
     )
 
 
+async def notificar_solicitud_retirada(nombre_sala: str, id_solicitud: int):
+    """
+    Notifica a todos los clientes conectados al WebSocket de emergencias
+    que una solicitud ya anunciada fue retirada porque no se pudo completar
+    su registro (por ejemplo, falló la creación de la sala).
+
+    Args:
+        nombre_sala: Nombre de la sala asociada a la solicitud.
+        id_solicitud: ID de la solicitud retirada.
+    """
+    await manager_operadores_emergencia.notificar(
+        tipo="solicitud_retirada",
+        datos={
+            "id": id_solicitud,
+            "room": nombre_sala
+        }
+    )
+
+
 async def notificar_sala_atendida(nombre_sala: str):
     """
     Notifica a todos los clientes conectados al WebSocket de emergencias
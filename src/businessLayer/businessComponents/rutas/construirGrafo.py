@@ -0,0 +1,182 @@
+"""
+Construcción fuera de línea del grafo vial a partir de un extracto de OpenStreetMap.
+
+Lee un archivo .osm (XML, también comprimido como .osm.bz2 o .osm.gz) en dos pasadas
+de streaming: primero las vías transitables por vehículos y luego solo los nodos que
+esas vías usan. Cada tramo entre dos nodos consecutivos de una vía es una arista con
+tiempo = longitud / velocidad, donde la velocidad sale de `maxspeed` o, si no está,
+del tipo de vía. Se respetan los sentidos únicos (`oneway`, rotondas y autopistas).
+
+Ejecuta: python -m src.businessLayer.businessComponents.rutas.construirGrafo extracto.osm grafo.bin
+
+El archivo resultante se indica al servidor con GRAFO_VIAL_RUTA (ver motorEta).
+"""
+
+import bz2
+import gzip
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, IO, Iterator, List, Optional, Set, Tuple
+
+from src.businessLayer.businessComponents.rutas.grafoVial import GrafoVial, distancia_metros
+
+# Velocidad por defecto (km/h) según el tipo de vía; las que no están aquí se ignoran
+VELOCIDADES_KMH: Dict[str, float] = {
+    "motorway": 80,
+    "motorway_link": 50,
+    "trunk": 60,
+    "trunk_link": 40,
+    "primary": 45,
+    "primary_link": 35,
+    "secondary": 40,
+    "secondary_link": 30,
+    "tertiary": 35,
+    "tertiary_link": 25,
+    "unclassified": 30,
+    "residential": 25,
+    "living_street": 10,
+    "service": 15,
+}
+
+# Valores de `access` / `motor_vehicle` que excluyen la vía
+ACCESOS_PROHIBIDOS = {"no", "private"}
+
+_NUMERO = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph)?")
+
+
+def _abrir(ruta: str) -> IO[bytes]:
+    if ruta.endswith(".bz2"):
+        return bz2.open(ruta, "rb")
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, "rb")
+    return open(ruta, "rb")
+
+
+def _velocidad_kmh(etiquetas: Dict[str, str]) -> Optional[float]:
+    por_tipo = VELOCIDADES_KMH.get(etiquetas.get("highway", ""))
+    if por_tipo is None:
+        return None
+    coincidencia = _NUMERO.match(etiquetas.get("maxspeed", ""))
+    if coincidencia:
+        velocidad = float(coincidencia.group(1))
+        if coincidencia.group(2):
+            velocidad *= 1.609
+        if velocidad > 0:
+            return velocidad
+    return por_tipo
+
+
+def _sentido(etiquetas: Dict[str, str]) -> int:
+    """1: solo en el orden de los nodos, -1: solo en el inverso, 0: doble sentido."""
+    oneway = etiquetas.get("oneway", "").lower()
+    if oneway in ("yes", "true", "1"):
+        return 1
+    if oneway == "-1":
+        return -1
+    if oneway in ("no", "false", "0"):
+        return 0
+    if etiquetas.get("highway") == "motorway" or etiquetas.get("junction") in ("roundabout", "circular"):
+        return 1
+    return 0
+
+
+def _elementos_osm(archivo: IO[bytes]) -> Iterator[ET.Element]:
+    """
+    Recorre los elementos de primer nivel (node, way, relation) ya completos.
+
+    Tras procesar cada uno se vacía la raíz: `clear()` sobre el elemento no lo quita de
+    su padre, y la raíz acumularía millones de elementos vacíos en un extracto grande.
+    """
+    contexto = ET.iterparse(archivo, events=("start", "end"))
+    _, raiz = next(contexto)
+    for evento, elemento in contexto:
+        if evento == "end" and elemento.tag in ("node", "way", "relation"):
+            yield elemento
+            raiz.clear()
+
+
+def _leer_vias(ruta: str) -> List[Tuple[List[int], float, int]]:
+    """Primera pasada: (nodos, velocidad km/h, sentido) de cada vía transitable."""
+    vias = []
+    with _abrir(ruta) as archivo:
+        for elemento in _elementos_osm(archivo):
+            if elemento.tag == "way":
+                etiquetas = {tag.get("k"): tag.get("v") for tag in elemento.iter("tag")}
+                velocidad = _velocidad_kmh(etiquetas)
+                acceso = etiquetas.get("motor_vehicle", etiquetas.get("access", ""))
+                if velocidad is not None and acceso not in ACCESOS_PROHIBIDOS:
+                    nodos = [int(nd.get("ref")) for nd in elemento.iter("nd")]
+                    if len(nodos) > 1:
+                        vias.append((nodos, velocidad, _sentido(etiquetas)))
+    return vias
+
+
+def _leer_nodos(ruta: str, usados: Set[int]) -> Dict[int, Tuple[float, float]]:
+    """Segunda pasada: coordenadas de los nodos que usan las vías."""
+    coordenadas = {}
+    with _abrir(ruta) as archivo:
+        for elemento in _elementos_osm(archivo):
+            if elemento.tag == "node":
+                id_osm = int(elemento.get("id"))
+                if id_osm in usados:
+                    coordenadas[id_osm] = (float(elemento.get("lat")), float(elemento.get("lon")))
+    return coordenadas
+
+
+def construir_grafo(ruta_osm: str) -> GrafoVial:
+    """
+    Construye el grafo vial de un extracto de OpenStreetMap.
+
+    Raises:
+        ValueError: Si el extracto no tiene vías transitables
+    """
+    vias = _leer_vias(ruta_osm)
+    usados = {nodo for nodos, _, _ in vias for nodo in nodos}
+    coordenadas_osm = _leer_nodos(ruta_osm, usados)
+
+    # Renumerar los nodos de OSM en índices consecutivos
+    indices: Dict[int, int] = {}
+    coordenadas: List[Tuple[float, float]] = []
+    aristas: List[Tuple[int, int, float]] = []
+
+    def indice(id_osm: int) -> int:
+        if id_osm not in indices:
+            indices[id_osm] = len(coordenadas)
+            coordenadas.append(coordenadas_osm[id_osm])
+        return indices[id_osm]
+
+    for nodos, velocidad, sentido in vias:
+        metros_por_segundo = velocidad / 3.6
+        for a, b in zip(nodos, nodos[1:]):
+            if a not in coordenadas_osm or b not in coordenadas_osm or a == b:
+                continue  # El extracto recortó la vía
+            segundos = distancia_metros(*coordenadas_osm[a], *coordenadas_osm[b]) / metros_por_segundo
+            origen, destino = indice(a), indice(b)
+            if sentido >= 0:
+                aristas.append((origen, destino, segundos))
+            if sentido <= 0:
+                aristas.append((destino, origen, segundos))
+
+    if not aristas:
+        raise ValueError(f"El extracto '{ruta_osm}' no tiene vías transitables")
+    return GrafoVial.desde_aristas(coordenadas, aristas)
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) != 2:
+        print("Uso: python -m src.businessLayer.businessComponents.rutas.construirGrafo extracto.osm grafo.bin")
+        sys.exit(2)
+    ruta_osm, ruta_grafo = argv
+    inicio = time.perf_counter()
+    grafo = construir_grafo(ruta_osm)
+    grafo.guardar(ruta_grafo)
+    print(
+        f"Grafo vial guardado en {ruta_grafo}: {grafo.nodos} nodos, {grafo.aristas} aristas "
+        f"({time.perf_counter() - inicio:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,204 @@
+"""
+Grafo vial compacto (CSR) para calcular tiempos de viaje por la red de calles.
+
+El grafo se construye fuera de línea a partir de un extracto de OpenStreetMap
+(ver construirGrafo) y se guarda en un archivo binario con arreglos planos:
+
+- latitudes / longitudes: coordenadas de cada nodo
+- inicios: para cada nodo v, las aristas que llegan a v están en [inicios[v], inicios[v + 1])
+- vecinos / tiempos: nodo de origen de cada arista y su tiempo de recorrido en segundos
+
+Las aristas se guardan invertidas (agrupadas por nodo de llegada) porque la consulta
+típica es "cuánto tarda cada ambulancia en llegar a la emergencia": una sola búsqueda
+de Dijkstra desde la emergencia, sobre el grafo invertido, resuelve todas las candidatas.
+
+Para ubicar el nodo más cercano a una coordenada se arma en memoria, al cargar, un
+índice por celdas de INDICE_CELDA_GRADOS.
+"""
+
+import heapq
+import math
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Lado de las celdas del índice espacial de nodos (~550 m en latitud)
+INDICE_CELDA_GRADOS = 0.005
+
+RADIO_TIERRA_METROS = 6371000.0
+
+# Encabezado del archivo: firma, versión, cantidad de nodos y de aristas
+_FIRMA = b"RESQGV"
+_VERSION = 1
+_ENCABEZADO = struct.Struct("<6sHII")
+
+
+def distancia_metros(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo (Haversine) en metros."""
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(delta_lat / 2) ** 2 +
+        math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(delta_lon / 2) ** 2
+    )
+    return 2 * RADIO_TIERRA_METROS * math.asin(math.sqrt(a))
+
+
+class GrafoVial:
+    """
+    Red vial en formato CSR (invertido) con índice espacial de nodos.
+    """
+
+    def __init__(
+        self,
+        latitudes: array,
+        longitudes: array,
+        inicios: array,
+        vecinos: array,
+        tiempos: array,
+    ):
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.inicios = inicios
+        self.vecinos = vecinos
+        self.tiempos = tiempos
+        # Plantilla de distancias iniciales que copia cada búsqueda
+        self._infinitos = array("d", [math.inf]) * len(latitudes)
+        self._indice: Dict[Tuple[int, int], List[int]] = {}
+        for nodo in range(len(latitudes)):
+            self._indice.setdefault(self._celda(latitudes[nodo], longitudes[nodo]), []).append(nodo)
+
+    @property
+    def nodos(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def aristas(self) -> int:
+        return len(self.vecinos)
+
+    @staticmethod
+    def _celda(latitud: float, longitud: float) -> Tuple[int, int]:
+        return int(math.floor(latitud / INDICE_CELDA_GRADOS)), int(math.floor(longitud / INDICE_CELDA_GRADOS))
+
+    # ========================= Construcción y archivo =========================
+
+    @classmethod
+    def desde_aristas(
+        cls,
+        coordenadas: List[Tuple[float, float]],
+        aristas: Iterable[Tuple[int, int, float]],
+    ) -> "GrafoVial":
+        """
+        Construye el grafo a partir de las coordenadas de los nodos y de las aristas
+        dirigidas (origen, destino, segundos).
+        """
+        por_destino: List[List[Tuple[int, float]]] = [[] for _ in coordenadas]
+        for origen, destino, segundos in aristas:
+            por_destino[destino].append((origen, segundos))
+
+        inicios = array("I", [0])
+        vecinos = array("I")
+        tiempos = array("f")
+        for entrantes in por_destino:
+            for origen, segundos in entrantes:
+                vecinos.append(origen)
+                tiempos.append(segundos)
+            inicios.append(len(vecinos))
+        return cls(
+            array("d", (lat for lat, _ in coordenadas)),
+            array("d", (lon for _, lon in coordenadas)),
+            inicios,
+            vecinos,
+            tiempos,
+        )
+
+    def guardar(self, ruta: str) -> None:
+        """Escribe el grafo en un archivo binario (little-endian)."""
+        with open(ruta, "wb") as archivo:
+            archivo.write(_ENCABEZADO.pack(_FIRMA, _VERSION, self.nodos, self.aristas))
+            for arreglo in (self.latitudes, self.longitudes, self.inicios, self.vecinos, self.tiempos):
+                if sys.byteorder != "little":
+                    arreglo = array(arreglo.typecode, arreglo)
+                    arreglo.byteswap()
+                arreglo.tofile(archivo)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "GrafoVial":
+        """
+        Lee un grafo escrito con `guardar`.
+
+        Raises:
+            ValueError: Si el archivo no es un grafo vial válido
+            OSError: Si no se puede leer el archivo
+        """
+        with open(ruta, "rb") as archivo:
+            try:
+                firma, version, nodos, aristas = _ENCABEZADO.unpack(archivo.read(_ENCABEZADO.size))
+            except struct.error:
+                raise ValueError(f"'{ruta}' no es un grafo vial")
+            if firma != _FIRMA or version != _VERSION:
+                raise ValueError(f"'{ruta}' no es un grafo vial (versión {_VERSION})")
+            arreglos = []
+            for codigo, cantidad in (("d", nodos), ("d", nodos), ("I", nodos + 1), ("I", aristas), ("f", aristas)):
+                arreglo = array(codigo)
+                try:
+                    arreglo.fromfile(archivo, cantidad)
+                except EOFError:
+                    raise ValueError(f"El grafo vial '{ruta}' está truncado")
+                if sys.byteorder != "little":
+                    arreglo.byteswap()
+                arreglos.append(arreglo)
+        return cls(*arreglos)
+
+    # ========================= Consultas =========================
+
+    def nodo_mas_cercano(self, latitud: float, longitud: float) -> Optional[Tuple[int, float]]:
+        """
+        Nodo más cercano a la coordenada, buscando en su celda y las vecinas.
+
+        Returns:
+            (nodo, distancia en metros), o None si no hay nodos en las celdas vecinas
+        """
+        fila, columna = self._celda(latitud, longitud)
+        mejor: Optional[Tuple[int, float]] = None
+        for df in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for nodo in self._indice.get((fila + df, columna + dc), ()):
+                    metros = distancia_metros(latitud, longitud, self.latitudes[nodo], self.longitudes[nodo])
+                    if mejor is None or metros < mejor[1]:
+                        mejor = (nodo, metros)
+        return mejor
+
+    def tiempos_hacia(self, destino: int, origenes: Set[int], limite: float = math.inf) -> Dict[int, float]:
+        """
+        Tiempo de viaje en segundos desde cada nodo de `origenes` hasta `destino`.
+
+        Es un Dijkstra sobre el grafo invertido que parte del destino y termina cuando
+        todos los orígenes quedaron resueltos o se supera `limite`. Los orígenes
+        inalcanzables (o más lejos que el límite) no aparecen en el resultado.
+        """
+        pendientes = set(origenes)
+        resultado: Dict[int, float] = {}
+        # Arreglo plano en lugar de diccionario: más rápido y sin rehash al crecer
+        distancias = array("d", self._infinitos)
+        distancias[destino] = 0.0
+        cola = [(0.0, destino)]
+        inicios, vecinos, tiempos = self.inicios, self.vecinos, self.tiempos
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while cola and pendientes:
+            tiempo, nodo = heappop(cola)
+            if tiempo > limite:
+                break
+            if tiempo > distancias[nodo]:
+                continue  # Entrada vieja de la cola
+            if nodo in pendientes:
+                pendientes.discard(nodo)
+                resultado[nodo] = tiempo
+            for i in range(inicios[nodo], inicios[nodo + 1]):
+                vecino = vecinos[i]
+                nuevo = tiempo + tiempos[i]
+                if nuevo < distancias[vecino]:
+                    distancias[vecino] = nuevo
+                    heappush(cola, (nuevo, vecino))
+        return resultado
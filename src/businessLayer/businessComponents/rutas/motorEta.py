@@ -0,0 +1,212 @@
+"""
+Motor de ETA por la red vial.
+
+Calcula cuánto tarda cada ambulancia candidata en llegar a la emergencia por las calles
+(grafo vial precalculado, ver grafoVial y construirGrafo) en lugar de usar la distancia
+en línea recta, que elige mal cuando hay ríos, autopistas o vías de un solo sentido de
+por medio.
+
+Una consulta hace un único Dijkstra desde la emergencia hacia todas las candidatas. Los
+resultados se guardan en un cache LRU por par de celdas (emergencia, ambulancia) de
+ETA_CELDA_METROS de lado: dos consultas entre las mismas celdas reutilizan el ETA. Al
+tiempo por la red se le suma el tramo en línea recta entre cada punto y su nodo más
+cercano, a ETA_VELOCIDAD_ACERCAMIENTO_KMH.
+
+Si GRAFO_VIAL_RUTA no está configurado o el archivo no se puede cargar, el motor queda
+deshabilitado y la búsqueda de ambulancias sigue usando la distancia en línea recta.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+from src.businessLayer.businessComponents.rutas.grafoVial import GrafoVial
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Archivo del grafo vial generado con construirGrafo (vacío: motor deshabilitado)
+GRAFO_VIAL_RUTA: str = os.getenv("GRAFO_VIAL_RUTA", "")
+# Lado de las celdas que agrupan orígenes y destinos en el cache
+ETA_CELDA_METROS: float = float(os.getenv("ETA_CELDA_METROS", "250"))
+# Pares de celdas que se conservan en el cache
+ETA_CACHE_MAX: int = int(os.getenv("ETA_CACHE_MAX", "50000"))
+# Candidatas (las más cercanas en línea recta) que se evalúan por la red vial
+ETA_MAX_CANDIDATAS: int = int(os.getenv("ETA_MAX_CANDIDATAS", "8"))
+# Tiempo máximo de búsqueda: las ambulancias más lejanas se consideran inalcanzables
+ETA_MAX_SEGUNDOS: float = float(os.getenv("ETA_MAX_SEGUNDOS", "3600"))
+# Velocidad del tramo fuera de la red (del punto a su nodo más cercano)
+ETA_VELOCIDAD_ACERCAMIENTO_KMH: float = float(os.getenv("ETA_VELOCIDAD_ACERCAMIENTO_KMH", "15"))
+
+METROS_POR_GRADO = 111320.0
+
+Coordenada = Tuple[float, float]
+ParCeldas = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+class MotorEta:
+    """
+    ETA por la red vial con Dijkstra multi-destino y cache por par de celdas.
+    La búsqueda es CPU pura y puede tardar cientos de milisegundos en frío: desde código
+    asíncrono debe llamarse con asyncio.to_thread. Es seguro entre hilos.
+    """
+
+    def __init__(
+        self,
+        grafo: Optional[GrafoVial] = None,
+        celda_metros: float = ETA_CELDA_METROS,
+        max_cache: int = ETA_CACHE_MAX,
+        max_candidatas: int = ETA_MAX_CANDIDATAS,
+        max_segundos: float = ETA_MAX_SEGUNDOS,
+        velocidad_acercamiento_kmh: float = ETA_VELOCIDAD_ACERCAMIENTO_KMH,
+    ):
+        self.grafo = grafo
+        self.celda_grados = celda_metros / METROS_POR_GRADO
+        self.max_cache = max_cache
+        self.max_candidatas = max_candidatas
+        self.max_segundos = max_segundos
+        self.velocidad_acercamiento = velocidad_acercamiento_kmh / 3.6
+        # (celda emergencia, celda ambulancia) -> segundos (None: inalcanzable)
+        self._cache: "OrderedDict[ParCeldas, Optional[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.consultas = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.busquedas = 0
+        self.tiempo_busquedas = 0.0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.grafo is not None
+
+    def _celda(self, coordenada: Coordenada) -> Tuple[int, int]:
+        return int(math.floor(coordenada[0] / self.celda_grados)), int(math.floor(coordenada[1] / self.celda_grados))
+
+    def _calcular(self, destino: Coordenada, origenes: Dict[int, Coordenada]) -> Dict[int, Optional[float]]:
+        """Un Dijkstra desde el destino hacia todos los orígenes (sin cache)."""
+        resultado: Dict[int, Optional[float]] = {clave: None for clave in origenes}
+        nodo_destino = self.grafo.nodo_mas_cercano(*destino)
+        if nodo_destino is None:
+            return resultado
+        nodos_origen = {}
+        for clave, coordenada in origenes.items():
+            cercano = self.grafo.nodo_mas_cercano(*coordenada)
+            if cercano is not None:
+                nodos_origen[clave] = cercano
+
+        inicio = time.perf_counter()
+        tiempos = self.grafo.tiempos_hacia(
+            nodo_destino[0], {nodo for nodo, _ in nodos_origen.values()}, limite=self.max_segundos
+        )
+        self.busquedas += 1
+        self.tiempo_busquedas += time.perf_counter() - inicio
+
+        for clave, (nodo, metros) in nodos_origen.items():
+            if nodo in tiempos:
+                acercamiento = (metros + nodo_destino[1]) / self.velocidad_acercamiento
+                resultado[clave] = tiempos[nodo] + acercamiento
+        return resultado
+
+    def etas(self, destino: Coordenada, origenes: Dict[int, Coordenada]) -> Dict[int, Optional[float]]:
+        """
+        Tiempo estimado en segundos desde cada origen (id -> latitud, longitud) hasta el
+        destino, por la red vial.
+
+        Returns:
+            Diccionario id -> segundos, o None si el origen no tiene ruta (fuera del
+            grafo o más lejos que ETA_MAX_SEGUNDOS). Si el motor está deshabilitado,
+            todos los valores son None.
+        """
+        if not self.habilitado or not origenes:
+            return {clave: None for clave in origenes}
+
+        celda_destino = self._celda(destino)
+        resultado: Dict[int, Optional[float]] = {}
+        faltantes: Dict[int, Coordenada] = {}
+        with self._lock:
+            self.consultas += len(origenes)
+            for clave, coordenada in origenes.items():
+                par = (celda_destino, self._celda(coordenada))
+                if par in self._cache:
+                    self._cache.move_to_end(par)
+                    resultado[clave] = self._cache[par]
+                    self.aciertos += 1
+                else:
+                    faltantes[clave] = coordenada
+                    self.fallos += 1
+        if not faltantes:
+            return resultado
+
+        calculados = self._calcular(destino, faltantes)
+        with self._lock:
+            for clave, segundos in calculados.items():
+                self._cache[(celda_destino, self._celda(faltantes[clave]))] = segundos
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+        resultado.update(calculados)
+        return resultado
+
+    def limpiar(self) -> None:
+        """Vacía el cache de ETAs."""
+        with self._lock:
+            self._cache.clear()
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna el estado del grafo y los contadores del cache.
+
+        Returns:
+            Diccionario con tamaño del grafo, aciertos del cache y tiempo medio de búsqueda
+        """
+        return {
+            "habilitado": self.habilitado,
+            "nodos": self.grafo.nodos if self.grafo else 0,
+            "aristas": self.grafo.aristas if self.grafo else 0,
+            "cache": len(self._cache),
+            "consultas": self.consultas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / self.consultas, 4) if self.consultas else 0.0,
+            "busquedas": self.busquedas,
+            "busqueda_media_ms": (
+                round(self.tiempo_busquedas / self.busquedas * 1000, 3) if self.busquedas else 0.0
+            ),
+        }
+
+
+# Instancia global del motor (singleton pattern)
+_motor_eta: Optional[MotorEta] = None
+_motor_lock = threading.Lock()
+
+
+def get_motor_eta() -> MotorEta:
+    """
+    Obtiene la instancia global del motor de ETA. La primera llamada carga el grafo
+    vial de GRAFO_VIAL_RUTA; si no se puede, el motor queda deshabilitado.
+
+    Returns:
+        Instancia de MotorEta
+    """
+    global _motor_eta
+    if _motor_eta is None:
+        with _motor_lock:
+            if _motor_eta is None:
+                grafo = None
+                if GRAFO_VIAL_RUTA:
+                    try:
+                        grafo = GrafoVial.cargar(GRAFO_VIAL_RUTA)
+                        logger.info(
+                            "Grafo vial cargado: %d nodos, %d aristas", grafo.nodos, grafo.aristas
+                        )
+                    except (OSError, ValueError) as e:
+                        logger.warning("No se pudo cargar el grafo vial '%s': %s", GRAFO_VIAL_RUTA, e)
+                _motor_eta = MotorEta(grafo)
+    return _motor_eta
@@ -0,0 +1,113 @@
+"""
+Configuración del logging de la aplicación.
+
+Los registros se encolan con un `QueueHandler` y un `QueueListener` en un hilo aparte
+los escribe en stdout, de modo que ningún `logger.*` del event loop espera por I/O.
+
+- LOG_LEVEL fija el nivel global (INFO por defecto).
+- LOG_NIVELES ajusta niveles por módulo: "modulo=NIVEL,otro.modulo=NIVEL"
+  (p. ej. "src.businessLayer.businessComponents.entidades=DEBUG").
+- `log_muestreado` limita los mensajes que se repiten en cada iteración de un bucle
+  (tareas periódicas) a uno por clave cada LOG_MUESTREO_SEGUNDOS.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_NIVELES: str = os.getenv("LOG_NIVELES", "")
+# Intervalo mínimo entre dos mensajes muestreados con la misma clave
+LOG_MUESTREO_SEGUNDOS: float = float(os.getenv("LOG_MUESTREO_SEGUNDOS", "30"))
+
+FORMATO_LOG = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+# clave -> (último instante registrado, mensajes omitidos desde entonces)
+_muestreo: Dict[str, Tuple[float, int]] = {}
+_muestreo_lock = threading.Lock()
+
+
+def _niveles_por_modulo(config: str) -> Dict[str, str]:
+    niveles = {}
+    for par in config.split(","):
+        modulo, _, nivel = par.partition("=")
+        if modulo.strip() and nivel.strip():
+            niveles[modulo.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def configurar_logging() -> None:
+    """
+    Configura el logger raíz con un QueueHandler y arranca el hilo que escribe los registros.
+    Es idempotente: las llamadas siguientes no hacen nada.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    salida = logging.StreamHandler(sys.stdout)
+    salida.setFormatter(logging.Formatter(FORMATO_LOG))
+
+    raiz = logging.getLogger()
+    raiz.handlers = [h for h in raiz.handlers if not isinstance(h, QueueHandler)]
+    raiz.addHandler(QueueHandler(cola))
+    raiz.setLevel(LOG_LEVEL)
+    for modulo, nivel in _niveles_por_modulo(LOG_NIVELES).items():
+        logging.getLogger(modulo).setLevel(nivel)
+
+    _listener = QueueListener(cola, salida, respect_handler_level=True)
+    _listener.start()
+
+
+def detener_logging() -> None:
+    """Escribe los registros pendientes y detiene el hilo del listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_muestreado(
+    logger: logging.Logger,
+    nivel: int,
+    clave: str,
+    mensaje: str,
+    *args,
+    intervalo: float = LOG_MUESTREO_SEGUNDOS,
+) -> None:
+    """
+    Registra el mensaje como máximo una vez por `intervalo` para la misma clave;
+    las repeticiones intermedias se cuentan y se informan con el siguiente mensaje.
+
+    Args:
+        logger: Logger del módulo
+        nivel: Nivel del registro (logging.WARNING, etc.)
+        clave: Identifica el mensaje repetido (p. ej. "sin_ubicacion:12")
+        mensaje: Mensaje con formato %-style; `args` son sus argumentos
+        intervalo: Segundos mínimos entre dos registros de la misma clave
+    """
+    if not logger.isEnabledFor(nivel):
+        return
+    ahora = time.monotonic()
+    with _muestreo_lock:
+        ultimo, omitidos = _muestreo.get(clave, (None, 0))
+        if ultimo is not None and ahora - ultimo < intervalo:
+            _muestreo[clave] = (ultimo, omitidos + 1)
+            return
+        _muestreo[clave] = (ahora, 0)
+    if omitidos:
+        mensaje = f"{mensaje} (%d repeticiones omitidas)"
+        args = (*args, omitidos)
+    logger.log(nivel, mensaje, *args)
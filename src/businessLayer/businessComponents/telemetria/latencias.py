@@ -0,0 +1,199 @@
+"""
+Medición de latencias por etapa del flujo de emergencias.
+
+Cada etapa (recepción de la solicitud, creación de sala, valoración, búsqueda de la
+ambulancia más cercana, reserva, creación de la orden, cada notificación...) se mide
+con `medir("etapa")` y se acumula en memoria:
+- Un histograma con buckets fijos (agregable entre workers en Prometheus).
+- Una ventana con las últimas observaciones para calcular p50/p99 en el proceso.
+- Un contador de errores (la etapa terminó con una excepción).
+
+`exportar_prometheus()` produce el formato de texto de Prometheus que sirve GET /metrics.
+Registrar una observación es O(buckets) bajo un lock, sin I/O.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Observaciones recientes por etapa usadas para calcular percentiles
+METRICAS_VENTANA: int = int(os.getenv("METRICAS_VENTANA", "2048"))
+
+# Límites superiores de los buckets del histograma (segundos)
+BUCKETS_SEGUNDOS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+PERCENTILES = (50, 99)
+
+_NOMBRE_METRICA = "resq_etapa_duracion_segundos"
+
+
+class HistogramaLatencia:
+    """Histograma de duraciones de una etapa más una ventana para percentiles."""
+
+    def __init__(self, ventana: int = METRICAS_VENTANA):
+        self.buckets: List[int] = [0] * len(BUCKETS_SEGUNDOS)
+        self.cuenta = 0
+        self.suma = 0.0
+        self.errores = 0
+        self.recientes: Deque[float] = deque(maxlen=max(1, ventana))
+
+    def observar(self, segundos: float, error: bool = False) -> None:
+        indice = bisect.bisect_left(BUCKETS_SEGUNDOS, segundos)
+        if indice < len(self.buckets):
+            self.buckets[indice] += 1
+        self.cuenta += 1
+        self.suma += segundos
+        if error:
+            self.errores += 1
+        self.recientes.append(segundos)
+
+    def percentiles(self) -> Dict[int, Optional[float]]:
+        if not self.recientes:
+            return {p: None for p in PERCENTILES}
+        ordenadas = sorted(self.recientes)
+        ultimo = len(ordenadas) - 1
+        return {p: ordenadas[min(ultimo, int(round(p / 100 * ultimo)))] for p in PERCENTILES}
+
+
+class RegistroLatencias:
+    """
+    Registro de histogramas por etapa. Es seguro entre hilos (hay etapas que corren
+    en el threadpool de FastAPI).
+    """
+
+    def __init__(self, ventana: int = METRICAS_VENTANA):
+        self.ventana = ventana
+        self._etapas: Dict[str, HistogramaLatencia] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, etapa: str, segundos: float, error: bool = False) -> None:
+        """
+        Registra la duración de una ejecución de la etapa.
+
+        Args:
+            etapa: Nombre de la etapa (p. ej. "valoracion.ambulancia_cercana")
+            segundos: Duración medida
+            error: True si la etapa terminó con una excepción
+        """
+        with self._lock:
+            histograma = self._etapas.get(etapa)
+            if histograma is None:
+                histograma = self._etapas[etapa] = HistogramaLatencia(self.ventana)
+            histograma.observar(segundos, error)
+
+    @contextmanager
+    def medir(self, etapa: str) -> Iterator[None]:
+        """
+        Mide el bloque como una ejecución de la etapa (sirve también con `await` dentro).
+
+        Args:
+            etapa: Nombre de la etapa
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observar(etapa, time.perf_counter() - inicio, error=True)
+            raise
+        self.observar(etapa, time.perf_counter() - inicio)
+
+    def resumen(self) -> Dict[str, dict]:
+        """
+        Retorna, por etapa, cuenta, errores, media y percentiles (en milisegundos).
+
+        Returns:
+            Diccionario etapa -> métricas
+        """
+        with self._lock:
+            resultado = {}
+            for etapa, histograma in sorted(self._etapas.items()):
+                percentiles = histograma.percentiles()
+                resultado[etapa] = {
+                    "cuenta": histograma.cuenta,
+                    "errores": histograma.errores,
+                    "media_ms": round(histograma.suma / histograma.cuenta * 1000, 3) if histograma.cuenta else None,
+                    **{
+                        f"p{p}_ms": round(valor * 1000, 3) if valor is not None else None
+                        for p, valor in percentiles.items()
+                    },
+                }
+            return resultado
+
+    def exportar_prometheus(self) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus (versión 0.0.4).
+
+        Returns:
+            Texto con el histograma, los percentiles de la ventana y los errores por etapa
+        """
+        lineas = [
+            f"# HELP {_NOMBRE_METRICA} Duración de cada etapa del flujo de emergencias.",
+            f"# TYPE {_NOMBRE_METRICA} histogram",
+        ]
+        percentiles_lineas = [
+            f"# HELP {_NOMBRE_METRICA}_percentil Percentiles de las últimas observaciones de cada etapa.",
+            f"# TYPE {_NOMBRE_METRICA}_percentil gauge",
+        ]
+        errores_lineas = [
+            "# HELP resq_etapa_errores_total Ejecuciones de la etapa que terminaron con error.",
+            "# TYPE resq_etapa_errores_total counter",
+        ]
+        with self._lock:
+            for etapa, histograma in sorted(self._etapas.items()):
+                etiqueta = _escapar(etapa)
+                acumulado = 0
+                for limite, cantidad in zip(BUCKETS_SEGUNDOS, histograma.buckets):
+                    acumulado += cantidad
+                    lineas.append(f'{_NOMBRE_METRICA}_bucket{{etapa="{etiqueta}",le="{limite}"}} {acumulado}')
+                lineas.append(f'{_NOMBRE_METRICA}_bucket{{etapa="{etiqueta}",le="+Inf"}} {histograma.cuenta}')
+                lineas.append(f'{_NOMBRE_METRICA}_sum{{etapa="{etiqueta}"}} {histograma.suma:.6f}')
+                lineas.append(f'{_NOMBRE_METRICA}_count{{etapa="{etiqueta}"}} {histograma.cuenta}')
+                for p, valor in histograma.percentiles().items():
+                    if valor is not None:
+                        percentiles_lineas.append(
+                            f'{_NOMBRE_METRICA}_percentil{{etapa="{etiqueta}",percentil="{p}"}} {valor:.6f}'
+                        )
+                errores_lineas.append(f'resq_etapa_errores_total{{etapa="{etiqueta}"}} {histograma.errores}')
+        return "\n".join(lineas + percentiles_lineas + errores_lineas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Instancia global del registro (singleton pattern)
+_registro_latencias: Optional[RegistroLatencias] = None
+
+
+def get_registro_latencias() -> RegistroLatencias:
+    """
+    Obtiene la instancia global del registro de latencias.
+
+    Returns:
+        Instancia de RegistroLatencias
+    """
+    global _registro_latencias
+    if _registro_latencias is None:
+        _registro_latencias = RegistroLatencias()
+    return _registro_latencias
+
+
+def medir(etapa: str):
+    """
+    Atajo de `get_registro_latencias().medir(etapa)`.
+
+    Example:
+        with medir("despacho.orden"):
+            creada = ServicioOrdenDespacho.crear(orden_despacho)
+    """
+    return get_registro_latencias().medir(etapa)
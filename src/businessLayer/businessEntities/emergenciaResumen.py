@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
+from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
+from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
+
+class EmergenciaResumen(BaseModel):
+    """
+    Vista plana de una emergencia para listados (tableros de operadores).
+    Solo contiene columnas propias de la tabla 'emergencias': no incluye la
+    solicitud, el solicitante ni la ubicación anidados.
+    """
+    id: int
+    estado: EstadoEmergencia
+    tipoAmbulancia: TipoAmbulancia
+    nivelPrioridad: NivelPrioridad
+    id_operador: int
+    solicitud_id: int
+    solicitante_id: int
+    fechaCreacion: datetime
+    fechaActualizacion: Optional[datetime] = None
+
+    # Método toString
+    def __str__(self) -> str:
+        """Retorna una representación en cadena del resumen de la emergencia."""
+        return (f"EmergenciaResumen(id={self.id}, "
+                f"estado={self.estado.value}, "
+                f"nivelPrioridad={self.nivelPrioridad.value}, "
+                f"fechaCreacion={self.fechaCreacion})")
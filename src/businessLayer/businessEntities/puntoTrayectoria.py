@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class PuntoTrayectoria(BaseModel):
+    """
+    Punto del historial de ubicaciones de una ambulancia.
+    """
+    id_ambulancia: int
+    latitud: float
+    longitud: float
+    fechaHora: datetime
+
+    # Método toString
+    def __str__(self) -> str:
+        return (f"PuntoTrayectoria(id_ambulancia={self.id_ambulancia}, "
+                f"latitud={self.latitud}, "
+                f"longitud={self.longitud}, "
+                f"fechaHora={self.fechaHora})")
@@ -1,8 +1,12 @@
 """
 Workflow para actualizar la disponibilidad de una ambulancia.
+
+La disponibilidad vive en el estado en vivo de la flota (Redis) y se vuelca a la base de
+datos por lotes; conectar o desconectar una ambulancia no consulta ni escribe la base de
+datos.
 """
 
-from src.businessLayer.businessComponents.entidades.servicioAmbulancia import ServicioAmbulancia
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
 
 
 class ActualizarDisponibilidadAmbulancia:
@@ -13,40 +17,29 @@ class ActualizarDisponibilidadAmbulancia:
     @staticmethod
     def marcar_como_disponible(id_ambulancia: int) -> None:
         """
-        Marca una ambulancia como disponible.
+        Marca una ambulancia como conectada y, si no está despachada, como disponible.
 
         Args:
             id_ambulancia: ID de la ambulancia a marcar como disponible
 
         Raises:
-            ValueError: Si la ambulancia no existe o el ID es inválido
+            ValueError: Si el ID es inválido
         """
-        ambulancia = ServicioAmbulancia.obtener_por_id(id_ambulancia)
-        if not ambulancia:
-            raise ValueError(f"Ambulancia con id {id_ambulancia} no encontrada")
-
-        ambulancia.set_disponibilidad(True)
-        actualizada = ServicioAmbulancia.actualizar(id_ambulancia, {"disponibilidad": True})
-        if not actualizada:
-            raise ValueError(f"Error al actualizar la disponibilidad de la ambulancia {id_ambulancia}")
+        if not isinstance(id_ambulancia, int) or id_ambulancia <= 0:
+            raise ValueError("id_ambulancia inválido")
+        get_estado_flota().marcar_conectada(id_ambulancia)
 
     @staticmethod
     def marcar_como_no_disponible(id_ambulancia: int) -> None:
         """
-        Marca una ambulancia como no disponible.
+        Marca una ambulancia como desconectada y no disponible.
 
         Args:
             id_ambulancia: ID de la ambulancia a marcar como no disponible
 
         Raises:
-            ValueError: Si la ambulancia no existe o el ID es inválido
+            ValueError: Si el ID es inválido
         """
-        ambulancia = ServicioAmbulancia.obtener_por_id(id_ambulancia)
-        if not ambulancia:
-            raise ValueError(f"Ambulancia con id {id_ambulancia} no encontrada")
-
-        ambulancia.set_disponibilidad(False)
-        actualizada = ServicioAmbulancia.actualizar(id_ambulancia, {"disponibilidad": False})
-        if not actualizada:
-            raise ValueError(f"Error al actualizar la disponibilidad de la ambulancia {id_ambulancia}")
-
+        if not isinstance(id_ambulancia, int) or id_ambulancia <= 0:
+            raise ValueError("id_ambulancia inválido")
+        get_estado_flota().marcar_desconectada(id_ambulancia)
@@ -3,7 +3,9 @@ Workflow para emitir una orden de despacho.
 Este workflow orquesta la creación de órdenes de despacho y las notificaciones correspondientes.
 """
 
+import logging
 from datetime import datetime
+import redis
 from src.businessLayer.businessEntities.ordenDespacho import OrdenDespacho
 from src.businessLayer.businessComponents.entidades.servicioOrdenDespacho import ServicioOrdenDespacho
 from src.businessLayer.businessComponents.entidades.servicioEmergencia import ServicioEmergencia
@@ -14,6 +16,10 @@ from src.dataLayer.dataAccesComponets.repositorioOperadorEmergencia import obten
 from src.businessLayer.businessComponents.notificaciones.notificadorSolicitante import notificar_emergencia_despachada
 from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
 from src.businessLayer.businessComponents.notificaciones.notificadorAmbulancia import notificar_orden_despacho
+from src.businessLayer.businessComponents.telemetria.latencias import medir
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
+
+logger = logging.getLogger(__name__)
 
 
 class EmitirOrdenDespacho:
@@ -46,6 +52,23 @@ class EmitirOrdenDespacho:
             ValueError: Si algún parámetro es inválido
             RuntimeError: Si no se encuentra alguna de las entidades relacionadas
         """
+        with medir("despacho.total"):
+            return await EmitirOrdenDespacho._emitir_orden_despacho(
+                emergencia_id,
+                ambulancia_id,
+                operador_ambulancia_id,
+                operador_emergencia_id,
+                fecha_hora
+            )
+
+    @staticmethod
+    async def _emitir_orden_despacho(
+        emergencia_id: int,
+        ambulancia_id: int,
+        operador_ambulancia_id: int,
+        operador_emergencia_id: int,
+        fecha_hora: datetime = None
+    ) -> OrdenDespacho:
         # Si no se proporciona fecha_hora, usar la hora actual
         if fecha_hora is None:
             fecha_hora = datetime.now()
@@ -54,29 +77,34 @@ class EmitirOrdenDespacho:
         if not isinstance(fecha_hora, datetime):
             raise ValueError(f"La fecha y hora debe ser una instancia de datetime, recibido: {type(fecha_hora)}")
 
-        # Obtener la emergencia
-        emergencia = obtener_emergencia_por_id(emergencia_id)
-        if not emergencia:
-            raise ValueError(f"Emergencia con id {emergencia_id} no encontrada")
-
-        # Obtener la ambulancia
-        ambulancia = obtener_ambulancia_por_id(ambulancia_id)
-        if not ambulancia:
-            raise ValueError(f"Ambulancia con id {ambulancia_id} no encontrada")
-
-        # Validar que la ambulancia esté disponible
-        if not ambulancia.get_disponibilidad():
-            raise ValueError(f"La ambulancia con id {ambulancia_id} no está disponible")
-
-        # Obtener el operador de ambulancia
-        operador_ambulancia = obtener_operador_ambulancia_por_id(operador_ambulancia_id)
-        if not operador_ambulancia:
-            raise ValueError(f"Operador de ambulancia con id {operador_ambulancia_id} no encontrado")
-
-        # Obtener el operador de emergencia
-        operador_emergencia = obtener_operador_emergencia_por_id(operador_emergencia_id)
-        if not operador_emergencia:
-            raise ValueError(f"Operador de emergencia con id {operador_emergencia_id} no encontrado")
+        with medir("despacho.validacion"):
+            # Obtener la emergencia
+            emergencia = obtener_emergencia_por_id(emergencia_id)
+            if not emergencia:
+                raise ValueError(f"Emergencia con id {emergencia_id} no encontrada")
+
+            # Obtener la ambulancia
+            ambulancia = obtener_ambulancia_por_id(ambulancia_id)
+            if not ambulancia:
+                raise ValueError(f"Ambulancia con id {ambulancia_id} no encontrada")
+
+            # Validar que la ambulancia esté disponible (estado en vivo de la flota; la base
+            # de datos solo si la ambulancia no tiene estado en Redis)
+            disponible = get_estado_flota().esta_disponible(ambulancia_id)
+            if disponible is None:
+                disponible = ambulancia.get_disponibilidad()
+            if not disponible:
+                raise ValueError(f"La ambulancia con id {ambulancia_id} no está disponible")
+
+            # Obtener el operador de ambulancia
+            operador_ambulancia = obtener_operador_ambulancia_por_id(operador_ambulancia_id)
+            if not operador_ambulancia:
+                raise ValueError(f"Operador de ambulancia con id {operador_ambulancia_id} no encontrado")
+
+            # Obtener el operador de emergencia
+            operador_emergencia = obtener_operador_emergencia_por_id(operador_emergencia_id)
+            if not operador_emergencia:
+                raise ValueError(f"Operador de emergencia con id {operador_emergencia_id} no encontrado")
 
         # Crear la entidad OrdenDespacho
         orden_despacho = OrdenDespacho(
@@ -89,7 +117,8 @@ class EmitirOrdenDespacho:
         )
 
         # Crear la orden de despacho usando el servicio
-        creada = ServicioOrdenDespacho.crear(orden_despacho)
+        with medir("despacho.orden"):
+            creada = ServicioOrdenDespacho.crear(orden_despacho)
         if creada is None:
             raise RuntimeError("Error al crear la orden de despacho. Verifique que todos los IDs sean válidos.")
 
@@ -100,8 +129,10 @@ class EmitirOrdenDespacho:
         if not emergencia_asociada or emergencia_asociada.id is None:
             raise RuntimeError("La orden creada no tiene una emergencia asociada con ID válido")
 
-        # Actualizar estado de la emergencia a ASIGNADA
-        ServicioEmergencia.actualizar(emergencia_asociada.id, {"estado": EstadoEmergencia.ASIGNADA})
+        # Actualizar estado de la emergencia a ASIGNADA: al publicarse el cambio se detiene el
+        # envío de ambulancias cercanas al operador y se reserva la ambulancia
+        with medir("despacho.reserva"):
+            ServicioEmergencia.actualizar(emergencia_asociada.id, {"estado": EstadoEmergencia.ASIGNADA})
 
         solicitante = getattr(emergencia_asociada, "solicitante", None)
         if not solicitante:
@@ -120,7 +151,7 @@ class EmitirOrdenDespacho:
         )
 
         # Notificar a la ambulancia seleccionada
-        print(f"[DEBUG] Enviando orden de despacho a ambulancia {ambulancia_id} para emergencia {emergencia_id}")
+        logger.debug("Enviando orden de despacho a ambulancia %s para emergencia %s", ambulancia_id, emergencia_id)
         await notificar_orden_despacho(
             id_ambulancia=ambulancia_id,
             datos_orden={
@@ -130,18 +161,23 @@ class EmitirOrdenDespacho:
                 "nivelPrioridad": creada.emergencia.nivelPrioridad.value if hasattr(creada.emergencia.nivelPrioridad, 'value') else str(creada.emergencia.nivelPrioridad)
             }
         )
-        print(f"[DEBUG] Orden de despacho enviada exitosamente a ambulancia {ambulancia_id}")
-
-        # Detener el envío periódico de información de ambulancias para esta emergencia
-        from src.businessLayer.businessComponents.notificaciones.gestorTareasAmbulancias import detener_envio_ambulancias
-        detener_envio_ambulancias(emergencia_id=emergencia_id)
+        logger.debug("Orden de despacho enviada a ambulancia %s", ambulancia_id)
 
         # Iniciar el envío periódico de la ubicación de la ambulancia asignada al solicitante
         from src.businessLayer.businessComponents.notificaciones.gestorTareasUbicacionAmbulancia import iniciar_envio_ubicacion_ambulancia
-        iniciar_envio_ubicacion_ambulancia(
-            id_solicitante=solicitante.id,
-            emergencia_id=emergencia_asociada.id,
-            id_ambulancia=ambulancia_id
-        )
+        ubicacion_emergencia = creada.emergencia.solicitud.ubicacion
+        try:
+            iniciar_envio_ubicacion_ambulancia(
+                id_solicitante=solicitante.id,
+                emergencia_id=emergencia_asociada.id,
+                id_ambulancia=ambulancia_id,
+                destino=(ubicacion_emergencia.latitud, ubicacion_emergencia.longitud)
+            )
+        except redis.RedisError as e:
+            # La orden ya quedó registrada y notificada: sin Redis solo se pierde el envío de ubicación
+            logger.error(
+                "No se pudo iniciar el envío de ubicación de la ambulancia %s (emergencia %s): %s",
+                ambulancia_id, emergencia_asociada.id, e
+            )
 
         return creada
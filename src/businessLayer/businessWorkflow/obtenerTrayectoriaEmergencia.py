@@ -0,0 +1,80 @@
+"""
+Workflow para obtener la trayectoria de las ambulancias despachadas a una emergencia.
+Consulta el historial de ubicaciones entre el despacho y el cierre de la emergencia.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from src.businessLayer.businessEntities.puntoTrayectoria import PuntoTrayectoria
+from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
+from src.businessLayer.businessComponents.entidades.servicioEmergencia import ServicioEmergencia
+from src.businessLayer.businessComponents.entidades.servicioOrdenDespacho import ServicioOrdenDespacho
+from src.businessLayer.businessComponents.cache.historialUbicaciones import get_historial_ubicaciones
+
+# Estados en los que la emergencia terminó: la trayectoria se corta en su última actualización
+ESTADOS_FINALES = (EstadoEmergencia.RESUELTA, EstadoEmergencia.CANCELADA)
+
+
+def _utc(fecha: datetime) -> datetime:
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc)
+
+
+class ObtenerTrayectoriaEmergencia:
+    """
+    Workflow para consultar por rango de fechas el recorrido de las ambulancias de una emergencia.
+    """
+
+    @staticmethod
+    def obtener_trayectoria(
+        id_emergencia: int,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+    ) -> Optional[Dict[int, List[PuntoTrayectoria]]]:
+        """
+        Obtiene los puntos de cada ambulancia despachada a la emergencia.
+
+        Args:
+            id_emergencia: ID de la emergencia
+            desde: Inicio del rango (por defecto, la primera orden de despacho)
+            hasta: Fin del rango (por defecto, el cierre de la emergencia o el momento actual)
+
+        Returns:
+            Diccionario id_ambulancia -> puntos ordenados por fecha,
+            o None si la emergencia no existe
+
+        Raises:
+            ValueError: Si el ID o el rango de fechas son inválidos
+            RuntimeError: Si hay error al consultar la base de datos
+        """
+        emergencia = ServicioEmergencia.obtener_resumen_por_id(id_emergencia)
+        if emergencia is None:
+            return None
+
+        ordenes = ServicioOrdenDespacho.obtener_por_emergencia(id_emergencia)
+        ambulancias: Dict[int, datetime] = {}
+        for orden in ordenes:
+            if orden.ambulancia is None or orden.ambulancia.id is None:
+                continue
+            fecha = _utc(orden.fechaHora)
+            ambulancias[orden.ambulancia.id] = min(fecha, ambulancias.get(orden.ambulancia.id, fecha))
+        if not ambulancias:
+            return {}
+
+        if desde is None:
+            desde = min(ambulancias.values())
+        if hasta is None:
+            if emergencia.estado in ESTADOS_FINALES and emergencia.fechaActualizacion is not None:
+                hasta = emergencia.fechaActualizacion
+            else:
+                hasta = datetime.now(timezone.utc)
+        desde, hasta = _utc(desde), _utc(hasta)
+        if desde > hasta:
+            raise ValueError("La fecha 'desde' debe ser anterior a 'hasta'")
+
+        historial = get_historial_ubicaciones()
+        return {
+            id_ambulancia: historial.trayectoria(id_ambulancia, desde, hasta)
+            for id_ambulancia in ambulancias
+        }
@@ -1,13 +1,22 @@
 """
 Workflow para procesar la ubicación de una ambulancia.
-Almacena la ubicación en Redis para acceso rápido en tiempo real.
+Almacena la ubicación en Redis para acceso rápido en tiempo real y la agrega
+(submuestreada) al historial de trayectorias.
 """
 
+import logging
+
 from datetime import datetime, timezone
+from typing import Optional
 from src.businessLayer.businessComponents.entidades.servicioAmbulancia import ServicioAmbulancia
 from src.businessLayer.businessComponents.cache.servicioUbicacionCache import ServicioUbicacionCache
+from src.businessLayer.businessComponents.cache.historialUbicaciones import get_historial_ubicaciones
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
 import redis
 
+logger = logging.getLogger(__name__)
+
 
 class ProcesarUbicacionAmbulancia:
     """
@@ -15,7 +24,12 @@ class ProcesarUbicacionAmbulancia:
     """
 
     @staticmethod
-    def procesar_ubicacion(id_ambulancia: int, latitud: float, longitud: float) -> None:
+    def procesar_ubicacion(
+        id_ambulancia: int,
+        latitud: float,
+        longitud: float,
+        tipo_ambulancia: Optional[TipoAmbulancia] = None
+    ) -> None:
         """
         Procesa una nueva ubicación de una ambulancia y la guarda en Redis.
         Solo valida que la ambulancia exista, no actualiza la base de datos.
@@ -24,6 +38,8 @@ class ProcesarUbicacionAmbulancia:
             id_ambulancia: ID de la ambulancia
             latitud: Latitud de la ubicación (-90 a 90)
             longitud: Longitud de la ubicación (-180 a 180)
+            tipo_ambulancia: Tipo de la ambulancia si el llamador ya la validó
+                (por ejemplo, al abrir su WebSocket); evita consultarla por cada ubicación
 
         Raises:
             ValueError: Si la ambulancia no existe, las coordenadas son inválidas
@@ -36,20 +52,32 @@ class ProcesarUbicacionAmbulancia:
             raise ValueError("La longitud debe estar entre -180 y 180 grados")
 
         # Validar que la ambulancia exista (solo verificación, no actualización)
-        ambulancia = ServicioAmbulancia.obtener_por_id(id_ambulancia)
-        if not ambulancia:
-            raise ValueError(f"Ambulancia con id {id_ambulancia} no encontrada")
+        if tipo_ambulancia is None:
+            ambulancia = ServicioAmbulancia.obtener_por_id(id_ambulancia)
+            if not ambulancia:
+                raise ValueError(f"Ambulancia con id {id_ambulancia} no encontrada")
+            tipo_ambulancia = ambulancia.tipoAmbulancia
 
         # Guardar ubicación en Redis (última ubicación en memoria)
         # Incluir tipo de ambulancia para filtrado rápido
+        ahora = datetime.now(timezone.utc)
         try:
             ServicioUbicacionCache.guardar_ubicacion(
                 id_ambulancia=id_ambulancia,
                 latitud=latitud,
                 longitud=longitud,
-                tipo_ambulancia=ambulancia.tipoAmbulancia.value,
-                timestamp=datetime.now(timezone.utc)
+                tipo_ambulancia=tipo_ambulancia.value,
+                timestamp=ahora
             )
         except redis.RedisError as e:
             raise redis.RedisError(f"Error al guardar ubicación en Redis: {e}")
 
+        # Historial de trayectorias: un fallo aquí no debe rechazar la ubicación
+        try:
+            get_historial_ubicaciones().registrar(id_ambulancia, latitud, longitud, ahora)
+        except redis.RedisError as e:
+            log_muestreado(
+                logger, logging.WARNING, f"historial_ubicacion:{id_ambulancia}",
+                "No se pudo registrar el historial de la ambulancia %s: %s", id_ambulancia, e
+            )
+
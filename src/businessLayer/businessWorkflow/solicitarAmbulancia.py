@@ -1,20 +1,45 @@
+import asyncio
+import logging
 from datetime import datetime
-from src.dataLayer.dataAccesComponets.repositorioSolicitudes import crear_solicitud as repo_crear_solicitud
-from src.dataLayer.dataAccesComponets.repositorioUbicacion import crear_ubicacion as repo_crear_ubicacion
+from typing import Optional
+from src.dataLayer.dataAccesComponets.repositorioSolicitudes import (
+    crear_solicitud_con_ubicacion as repo_crear_solicitud_con_ubicacion,
+    eliminar_solicitud as repo_eliminar_solicitud,
+)
 from src.businessLayer.businessEntities.solicitud import Solicitud
-from src.businessLayer.businessComponents.llamadas.crearSala import crearSala
+from src.businessLayer.businessComponents.llamadas.crearSala import eliminarSala
+from src.businessLayer.businessComponents.llamadas.poolSalas import (
+    crear_sala_emergencia,
+    generar_nombre_sala,
+    get_pool_salas,
+)
 from src.businessLayer.businessComponents.llamadas.tokenLlamadas import generar_token_participante
 from src.businessLayer.businessComponents.llamadas.configLiveKit import (
     LIVEKIT_URL,
     validate_livekit_config,
 )
-from src.businessLayer.businessComponents.notificaciones.notificadorOperadorEmergencias import notificar_nueva_solicitud
-import uuid
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import (
+    LiveKitNoDisponibleError,
+    get_circuito_livekit,
+)
+from src.businessLayer.businessComponents.notificaciones.notificadorOperadorEmergencias import (
+    notificar_nueva_solicitud,
+    notificar_solicitud_retirada,
+)
+from src.businessLayer.businessComponents.telemetria.latencias import medir
+
+logger = logging.getLogger(__name__)
+
 
 class SolicitarAmbulancia:
 
     @staticmethod
     async def registrarSolicitud(solicitud: Solicitud | dict) -> dict:
+        with medir("solicitud.recepcion"):
+            return await SolicitarAmbulancia._registrar_solicitud(solicitud)
+
+    @staticmethod
+    async def _registrar_solicitud(solicitud: Solicitud | dict) -> dict:
         if isinstance(solicitud, dict):
             solicitud_obj = Solicitud.model_validate(solicitud)
             solicitud_dict = solicitud
@@ -27,26 +52,40 @@ class SolicitarAmbulancia:
         if not solicitud_obj.solicitante or not solicitud_obj.solicitante.nombre:
             raise ValueError("La solicitud debe incluir un solicitante con nombre")
 
-        # Si la ubicación no tiene ID, crearla primero en la base de datos
-        if not solicitud_obj.ubicacion.id:
-            ubicacion_creada = repo_crear_ubicacion(solicitud_obj.ubicacion)
-            if ubicacion_creada is None:
-                raise ValueError("Error al crear la ubicación")
-            # Actualizar la solicitud con la ubicación que tiene ID
-            solicitud_obj.ubicacion = ubicacion_creada
+        # Validar configuración de LiveKit antes de persistir nada
+        validate_livekit_config()
 
-        solicitud_creada = repo_crear_solicitud(solicitud_obj)
-        if solicitud_creada is None:
-            raise ValueError("Error al crear la solicitud")
+        # Tomar una sala pre-creada del pool; si está vacío, se crea una nueva
+        nombreSala = get_pool_salas().tomar()
+        crear_sala = nombreSala is None
+        if crear_sala:
+            # Sin sala disponible y con LiveKit caído no se registra nada: se falla de inmediato
+            if not get_circuito_livekit().disponible():
+                raise LiveKitNoDisponibleError("El servicio de llamadas no está disponible en este momento")
+            nombreSala = generar_nombre_sala()
 
-        # Validar configuración de LiveKit antes de operar
-        validate_livekit_config()
+        # La sala y el registro no dependen entre sí: se ejecutan en paralelo.
+        # Los operadores se notifican en cuanto la solicitud existe, sin esperar a LiveKit.
+        tarea_sala = None
+        try:
+            async with asyncio.TaskGroup() as tg:
+                if crear_sala:
+                    tarea_sala = tg.create_task(SolicitarAmbulancia._crear_sala(nombreSala))
+                tarea_registro = tg.create_task(
+                    SolicitarAmbulancia._registrar_y_notificar(solicitud_obj, nombreSala)
+                )
+        except ExceptionGroup as grupo:
+            # Falló el registro: la tarea de la sala fue cancelada o terminó; se descarta la sala
+            await SolicitarAmbulancia._descartar_sala(nombreSala)
+            raise grupo.exceptions[0]
 
-        # Generar nombre de sala único
-        nombreSala = f"emergencia-{uuid.uuid4()}"
+        datos_solicitud = tarea_registro.result()
 
-        # Crear sala (máximo 2 participantes: solicitante y operador/médico)
-        await crearSala(nombreSala, max_participants=2)
+        error_sala = tarea_sala.result() if tarea_sala is not None else None
+        if error_sala is not None:
+            # La solicitud ya fue anunciada pero no tiene sala: se compensa
+            await SolicitarAmbulancia._retirar_solicitud(datos_solicitud["id"], nombreSala)
+            raise error_sala
 
         # Generar identidad y token con permisos de unirse y audio
         identidad, token = generar_token_participante(
@@ -54,19 +93,74 @@ class SolicitarAmbulancia:
             nombre_sala=nombreSala
         )
 
+        return {
+            "room": nombreSala,
+            "token": token,
+            "identity": identidad,
+            "server_url": LIVEKIT_URL,
+            "solicitud": datos_solicitud,
+        }
+
+    @staticmethod
+    async def _crear_sala(nombreSala: str) -> Optional[Exception]:
+        """
+        Crea la sala (máximo 2 participantes: solicitante y operador/médico).
+        Retorna el error en lugar de lanzarlo para que un fallo de LiveKit no
+        cancele el registro en curso dentro del TaskGroup.
+        """
+        try:
+            with medir("solicitud.sala"):
+                await crear_sala_emergencia(nombreSala)
+            return None
+        except (ValueError, RuntimeError) as e:
+            return e
+        except Exception as e:
+            return RuntimeError(f"Error al crear la sala: {str(e)}")
+
+    @staticmethod
+    async def _registrar_y_notificar(solicitud_obj: Solicitud, nombreSala: str) -> dict:
+        """
+        Persiste la solicitud (con su ubicación) y notifica a los operadores.
+
+        Returns:
+            Datos de la solicitud creada, serializados a JSON
+        """
+        # Crear ubicación (si no tiene ID) y solicitud en una sola transacción.
+        # Se ejecuta en un hilo para no bloquear el event loop mientras se crea la sala.
+        with medir("solicitud.registro"):
+            solicitud_creada = await asyncio.to_thread(repo_crear_solicitud_con_ubicacion, solicitud_obj)
+        if solicitud_creada is None:
+            raise ValueError("Error al crear la solicitud")
+
         # Preparar datos de la solicitud para notificar
         datos_solicitud = solicitud_creada.model_dump(mode="json")
-        
+
         # Notificar nueva solicitud con el nombre de la sala
         await notificar_nueva_solicitud(
             nombre_sala=nombreSala,
             datos_solicitud=datos_solicitud
         )
+        return datos_solicitud
 
-        return {
-            "room": nombreSala,
-            "token": token,
-            "identity": identidad,
-            "server_url": LIVEKIT_URL,
-            "solicitud": datos_solicitud,
-        }
\ No newline at end of file
+    @staticmethod
+    async def _descartar_sala(nombreSala: str) -> None:
+        """Elimina la sala si llegó a crearse; los errores solo se registran."""
+        try:
+            await eliminarSala(nombreSala)
+        except Exception as e:
+            logger.warning(f"No se pudo descartar la sala '{nombreSala}': {e}")
+
+    @staticmethod
+    async def _retirar_solicitud(id_solicitud: int, nombreSala: str) -> None:
+        """
+        Compensa una solicitud ya persistida y anunciada cuya sala no pudo crearse:
+        la elimina de la base de datos y avisa a los operadores que fue retirada.
+        """
+        try:
+            await asyncio.to_thread(repo_eliminar_solicitud, id_solicitud)
+        except Exception as e:
+            logger.error(f"No se pudo eliminar la solicitud {id_solicitud} tras fallar la sala: {e}")
+        try:
+            await notificar_solicitud_retirada(nombre_sala=nombreSala, id_solicitud=id_solicitud)
+        except Exception as e:
+            logger.error(f"No se pudo notificar el retiro de la solicitud {id_solicitud}: {e}")
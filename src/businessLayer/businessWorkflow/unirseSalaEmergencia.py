@@ -1,9 +1,8 @@
+import asyncio
+from typing import Tuple
 from src.businessLayer.businessComponents.entidades.servicioOperadorEmergencia import ServicioOperadorEmergencia
 from src.businessLayer.businessComponents.llamadas.unirseSala import generar_token_unirse_sala
-from src.businessLayer.businessComponents.llamadas.obtenerParticipantesSala import (
-    obtener_numero_participantes,
-    obtener_max_participantes
-)
+from src.businessLayer.businessComponents.llamadas.obtenerParticipantesSala import obtener_info_sala
 from src.businessLayer.businessComponents.llamadas.configLiveKit import (
     LIVEKIT_URL,
     validate_livekit_config,
@@ -47,35 +46,26 @@ class UnirseSalaEmergencia:
         if not nombre_sala:
             raise ValueError("El nombre de la sala no puede estar vacío")
 
-        # Obtener el operador de emergencia
-        operador = ServicioOperadorEmergencia.obtener_por_id(id_operador)
-        if not operador:
-            raise ValueError(f"Operador de emergencia con ID {id_operador} no encontrado")
-
         # Validar configuración de LiveKit antes de operar
         validate_livekit_config()
 
-        # Construir nombre completo del operador para la identidad
-        nombre_completo = operador.nombre
-        if operador.nombre2:
-            nombre_completo += f" {operador.nombre2}"
-        nombre_completo += f" {operador.apellido}"
-        if operador.apellido2:
-            nombre_completo += f" {operador.apellido2}"
+        # El estado de la sala no depende del operador: se consulta en paralelo
+        # con la búsqueda del operador y la generación del token
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tarea_info = tg.create_task(obtener_info_sala(nombre_sala))
+                tarea_credenciales = tg.create_task(
+                    UnirseSalaEmergencia._generar_credenciales(id_operador, nombre_sala)
+                )
+        except ExceptionGroup as grupo:
+            raise grupo.exceptions[0]
 
-        # Generar identidad y token con permisos de unirse y audio
-        identidad, token = generar_token_unirse_sala(
-            nombre=nombre_completo,
-            nombre_sala=nombre_sala
-        )
+        identidad, token = tarea_credenciales.result()
+        num_participantes_actuales, max_participantes = tarea_info.result()
 
         # Verificar si la sala quedará llena después de que el operador se una
         # Las salas de emergencia tienen máximo 2 participantes (solicitante + operador)
         # Si actualmente hay 1 participante (el solicitante), al unirse el operador la sala quedará llena
-        num_participantes_actuales = await obtener_numero_participantes(nombre_sala)
-        max_participantes = await obtener_max_participantes(nombre_sala)
-        
-        # Si al unirse el operador la sala quedará llena (participantes actuales + 1 >= max)
         if num_participantes_actuales + 1 >= max_participantes:
             await notificar_sala_atendida(nombre_sala)
 
@@ -86,3 +76,32 @@ class UnirseSalaEmergencia:
             "server_url": LIVEKIT_URL,
         }
 
+    @staticmethod
+    async def _generar_credenciales(id_operador: int, nombre_sala: str) -> Tuple[str, str]:
+        """
+        Obtiene el operador y genera su identidad y token para la sala.
+
+        Returns:
+            Tupla (identidad, token)
+
+        Raises:
+            ValueError: Si el operador no existe.
+        """
+        # Obtener el operador de emergencia (consulta a BD fuera del event loop)
+        operador = await asyncio.to_thread(ServicioOperadorEmergencia.obtener_por_id, id_operador)
+        if not operador:
+            raise ValueError(f"Operador de emergencia con ID {id_operador} no encontrado")
+
+        # Construir nombre completo del operador para la identidad
+        nombre_completo = operador.nombre
+        if operador.nombre2:
+            nombre_completo += f" {operador.nombre2}"
+        nombre_completo += f" {operador.apellido}"
+        if operador.apellido2:
+            nombre_completo += f" {operador.apellido2}"
+
+        # Generar identidad y token con permisos de unirse y audio
+        return generar_token_unirse_sala(
+            nombre=nombre_completo,
+            nombre_sala=nombre_sala
+        )
@@ -8,6 +8,7 @@ from src.businessLayer.businessComponents.entidades.servicioEmergencia import Se
 from src.dataLayer.dataAccesComponets.repositorioSolicitudes import obtener_solicitud_por_id
 from src.dataLayer.dataAccesComponets.repositorioSolicitantes import obtener_solicitante_por_id
 from src.businessLayer.businessComponents.notificaciones.notificadorSolicitante import notificar_emergencia_valorada
+from src.businessLayer.businessComponents.telemetria.latencias import medir
 
 
 class ValorarSolicitud:
@@ -56,32 +57,33 @@ class ValorarSolicitud:
         if not isinstance(nivel_prioridad, NivelPrioridad):
             raise ValueError(f"El nivel de prioridad debe ser una instancia de NivelPrioridad, recibido: {type(nivel_prioridad)}")
 
-        # Obtener la solicitud
-        solicitud = obtener_solicitud_por_id(solicitud_id)
-        if not solicitud:
-            raise ValueError(f"Solicitud con id {solicitud_id} no encontrada")
-
-        # Obtener el solicitante
-        solicitante = obtener_solicitante_por_id(solicitante_id)
-        if not solicitante:
-            raise ValueError(f"Solicitante con id {solicitante_id} no encontrado")
-
-        # Crear la entidad Emergencia
-        emergencia = Emergencia(
-            id=None,
-            solicitud=solicitud,
-            estado=estado,
-            tipoAmbulancia=tipo_ambulancia,
-            nivelPrioridad=nivel_prioridad,
-            descripcion=descripcion,
-            id_operador=id_operador,
-            solicitante=solicitante
-        )
-
-        # Crear la emergencia usando el servicio
-        creada = ServicioEmergencia.crear(emergencia)
-        if creada is None:
-            raise RuntimeError("Error al crear la emergencia. Verifique que todos los IDs sean válidos.")
+        with medir("valoracion.emergencia"):
+            # Obtener la solicitud
+            solicitud = obtener_solicitud_por_id(solicitud_id)
+            if not solicitud:
+                raise ValueError(f"Solicitud con id {solicitud_id} no encontrada")
+
+            # Obtener el solicitante
+            solicitante = obtener_solicitante_por_id(solicitante_id)
+            if not solicitante:
+                raise ValueError(f"Solicitante con id {solicitante_id} no encontrado")
+
+            # Crear la entidad Emergencia
+            emergencia = Emergencia(
+                id=None,
+                solicitud=solicitud,
+                estado=estado,
+                tipoAmbulancia=tipo_ambulancia,
+                nivelPrioridad=nivel_prioridad,
+                descripcion=descripcion,
+                id_operador=id_operador,
+                solicitante=solicitante
+            )
+
+            # Crear la emergencia usando el servicio
+            creada = ServicioEmergencia.crear(emergencia)
+            if creada is None:
+                raise RuntimeError("Error al crear la emergencia. Verifique que todos los IDs sean válidos.")
 
         # Notificar a los solicitantes sobre la nueva emergencia
         # Enviar el ID, el estado y la hora de valoración
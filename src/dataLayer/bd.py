@@ -28,6 +28,7 @@ from src.dataLayer.models.modeloUbicacion import Ubicacion
 from src.dataLayer.models.modeloSolicitud import Solicitud
 from src.dataLayer.models.modeloEmergencia import Emergencia
 from src.dataLayer.models.modeloAmbulancia import Ambulancia
+from src.dataLayer.models.modeloHistorialUbicacion import HistorialUbicacion
 
 # URL de conexión a la base de datos
 # Prioridad: variable de entorno > valor por defecto (SQLite para desarrollo)
@@ -129,6 +130,8 @@ def inicializar_base_datos():
     try:
         from src.dataLayer.migraciones.agregar_campos_usuario import agregar_campos_usuario
         agregar_campos_usuario()
+        from src.dataLayer.migraciones.verificar_indices_usuario import verificar_indices_usuario
+        verificar_indices_usuario()
     except Exception as e:
         print(f"Advertencia: Error al ejecutar migraciones: {e}")
         # No fallar si es SQLite (no soporta DO $$)
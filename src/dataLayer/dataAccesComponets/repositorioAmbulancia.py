@@ -5,7 +5,7 @@ Proporciona operaciones CRUD usando SQLAlchemy y mapea hacia/desde
 la entidad Pydantic `Ambulancia` de la capa de negocio.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -207,6 +207,32 @@ def actualizar_ambulancia(id_ambulancia: int, cambios: dict) -> Optional[Ambulan
         sesion.close()
 
 
+def actualizar_disponibilidad_ambulancias(disponibilidades: Dict[int, bool]) -> int:
+    """
+    Escribe en una sola transacción la disponibilidad de varias ambulancias
+    (un UPDATE por valor, sin cargar las filas). Retorna las filas actualizadas.
+    """
+    if not disponibilidades:
+        return 0
+
+    sesion: Session = SessionLocal()
+    try:
+        actualizadas = 0
+        for valor in (True, False):
+            ids = [id_amb for id_amb, disponible in disponibilidades.items() if disponible is valor]
+            if ids:
+                actualizadas += sesion.query(AmbulanciaDB).filter(
+                    AmbulanciaDB.id.in_(ids)
+                ).update({AmbulanciaDB.disponibilidad: valor}, synchronize_session=False)
+        sesion.commit()
+        return actualizadas
+    except SQLAlchemyError as e:
+        sesion.rollback()
+        raise RuntimeError(f"Error al actualizar la disponibilidad de ambulancias: {e}")
+    finally:
+        sesion.close()
+
+
 def eliminar_ambulancia(id_ambulancia: int) -> bool:
     """
     Elimina una ambulancia por su ID.
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from src.dataLayer.bd import SessionLocal
 from src.dataLayer.models.modeloEmergencia import Emergencia as EmergenciaDB
 from src.businessLayer.businessEntities.emergencia import Emergencia as EmergenciaBE
+from src.businessLayer.businessEntities.emergenciaResumen import EmergenciaResumen as EmergenciaResumenBE
 from src.businessLayer.businessEntities.enums.estadoEmergencia import EstadoEmergencia
 from src.businessLayer.businessEntities.enums.tipoAmbulancia import TipoAmbulancia
 from src.businessLayer.businessEntities.enums.nivelPrioridad import NivelPrioridad
@@ -77,6 +78,39 @@ def _mapear_db_a_be(db_obj: EmergenciaDB) -> EmergenciaBE:
     )
 
 
+# Columnas proyectadas para la vista resumida (sin relaciones anidadas)
+_COLUMNAS_RESUMEN = (
+    EmergenciaDB.id,
+    EmergenciaDB.estado,
+    EmergenciaDB.tipoAmbulancia,
+    EmergenciaDB.nivelPrioridad,
+    EmergenciaDB.id_operador,
+    EmergenciaDB.solicitud_id,
+    EmergenciaDB.solicitante_id,
+    EmergenciaDB.fechaCreacion,
+    EmergenciaDB.fechaActualizacion,
+)
+
+
+def _mapear_fila_a_resumen(fila) -> EmergenciaResumenBE:
+    """
+    Mapea una fila proyectada a EmergenciaResumen.
+    Usa model_construct porque los valores ya vienen tipados desde la BD
+    (los SAEnum devuelven los Enum), evitando la validación de Pydantic.
+    """
+    return EmergenciaResumenBE.model_construct(
+        id=fila.id,
+        estado=EstadoEmergencia(fila.estado) if isinstance(fila.estado, str) else fila.estado,
+        tipoAmbulancia=TipoAmbulancia(fila.tipoAmbulancia) if isinstance(fila.tipoAmbulancia, str) else fila.tipoAmbulancia,
+        nivelPrioridad=NivelPrioridad(fila.nivelPrioridad) if isinstance(fila.nivelPrioridad, str) else fila.nivelPrioridad,
+        id_operador=fila.id_operador,
+        solicitud_id=fila.solicitud_id,
+        solicitante_id=fila.solicitante_id,
+        fechaCreacion=fila.fechaCreacion,
+        fechaActualizacion=fila.fechaActualizacion,
+    )
+
+
 # ========================= Operaciones CRUD =========================
 
 def crear_emergencia(emergencia: EmergenciaBE) -> Optional[EmergenciaBE]:
@@ -269,3 +303,48 @@ def eliminar_emergencia(id_emergencia: int) -> bool:
     finally:
         sesion.close()
 
+
+# ========================= Consultas de resumen =========================
+
+def listar_emergencias_resumen(
+    limit: int = 50,
+    offset: int = 0,
+    estado: Optional[EstadoEmergencia] = None,
+    id_operador: Optional[int] = None,
+    id_solicitante: Optional[int] = None,
+) -> List[EmergenciaResumenBE]:
+    """
+    Lista emergencias en su vista resumida, ordenadas por fecha de creación más reciente.
+    Consulta solo las columnas de la tabla 'emergencias' en una única query:
+    no construye entidades ORM ni carga solicitud, solicitante u operador.
+    Los filtros opcionales se combinan con AND.
+    """
+    sesion: Session = SessionLocal()
+    try:
+        query = sesion.query(*_COLUMNAS_RESUMEN)
+        if estado is not None:
+            query = query.filter(EmergenciaDB.estado == estado)
+        if id_operador is not None:
+            query = query.filter(EmergenciaDB.id_operador == id_operador)
+        if id_solicitante is not None:
+            query = query.filter(EmergenciaDB.solicitante_id == id_solicitante)
+        query = query.order_by(EmergenciaDB.fechaCreacion.desc()).offset(offset).limit(limit)
+        return [_mapear_fila_a_resumen(fila) for fila in query.all()]
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al listar resumen de emergencias: {e}")
+    finally:
+        sesion.close()
+
+
+def obtener_emergencia_resumen_por_id(id_emergencia: int) -> Optional[EmergenciaResumenBE]:
+    """
+    Obtiene la vista resumida de una emergencia por su ID, o None si no existe.
+    """
+    sesion: Session = SessionLocal()
+    try:
+        fila = sesion.query(*_COLUMNAS_RESUMEN).filter(EmergenciaDB.id == id_emergencia).first()
+        return _mapear_fila_a_resumen(fila) if fila else None
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al obtener resumen de emergencia: {e}")
+    finally:
+        sesion.close()
@@ -0,0 +1,150 @@
+"""
+Repositorio de acceso a datos para el historial de ubicaciones de ambulancias.
+
+Inserta por lotes (una sola transacción por lote, ignorando puntos repetidos) y consulta
+trayectorias por rango de fechas. En PostgreSQL la tabla está particionada por día:
+antes de insertar se crean las particiones de los días que faltan, y las de días
+anteriores a la retención se eliminan con un DROP TABLE en lugar de un DELETE.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Set
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as insert_postgresql
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+
+from src.dataLayer.bd import SessionLocal, engine, es_sqlite
+from src.dataLayer.models.modeloHistorialUbicacion import HistorialUbicacion as HistorialUbicacionDB
+from src.businessLayer.businessEntities.puntoTrayectoria import PuntoTrayectoria as PuntoTrayectoriaBE
+
+TABLA = HistorialUbicacionDB.__tablename__
+
+# Días cuya partición ya existe (evita repetir el DDL en cada lote)
+_particiones_creadas: Set[date] = set()
+
+
+def _nombre_particion(dia: date) -> str:
+    return f"{TABLA}_{dia:%Y%m%d}"
+
+
+def _limite_particion(dia: date) -> str:
+    # Literal con zona explícita: sin ella, PostgreSQL interpreta el límite en la zona
+    # horaria de la sesión y la partición no coincidiría con el día UTC de los puntos
+    return f"{dia.isoformat()} 00:00:00+00"
+
+
+def _utc(fecha: datetime) -> datetime:
+    # SQLite no guarda la zona horaria: todas las fechas del historial se tratan en UTC
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc)
+
+
+def _mapear_db_a_be(db_obj: HistorialUbicacionDB) -> PuntoTrayectoriaBE:
+    return PuntoTrayectoriaBE(
+        id_ambulancia=db_obj.ambulancia_id,
+        latitud=db_obj.latitud,
+        longitud=db_obj.longitud,
+        fechaHora=_utc(db_obj.fechaHora),
+    )
+
+
+# ========================= Particiones =========================
+
+def asegurar_particiones(dias: Iterable[date]) -> None:
+    """
+    Crea las particiones diarias que falten (solo PostgreSQL; en SQLite no hace nada).
+    """
+    if es_sqlite:
+        return
+    faltantes = sorted(set(dias) - _particiones_creadas)
+    if not faltantes:
+        return
+    try:
+        with engine.begin() as connection:
+            for dia in faltantes:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {_nombre_particion(dia)} PARTITION OF {TABLA} "
+                    f"FOR VALUES FROM ('{_limite_particion(dia)}') TO ('{_limite_particion(dia + timedelta(days=1))}')"
+                ))
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al crear particiones del historial de ubicaciones: {e}")
+    _particiones_creadas.update(faltantes)
+
+
+def eliminar_particiones_anteriores(dia: date) -> int:
+    """
+    Elimina las particiones de los días anteriores a `dia` (solo PostgreSQL).
+    Retorna cuántas se eliminaron.
+    """
+    if es_sqlite:
+        return 0
+    limite = _nombre_particion(dia)
+    try:
+        viejas = [
+            nombre for nombre in inspect(engine).get_table_names()
+            if nombre.startswith(f"{TABLA}_") and len(nombre) == len(limite) and nombre < limite
+        ]
+        with engine.begin() as connection:
+            for nombre in viejas:
+                connection.execute(text(f"DROP TABLE IF EXISTS {nombre}"))
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al eliminar particiones del historial de ubicaciones: {e}")
+    for nombre in viejas:
+        _particiones_creadas.discard(datetime.strptime(nombre[len(TABLA) + 1:], "%Y%m%d").date())
+    return len(viejas)
+
+
+# ========================= Operaciones =========================
+
+def insertar_puntos(puntos: List[PuntoTrayectoriaBE]) -> int:
+    """
+    Inserta un lote de puntos en una sola transacción. Los puntos repetidos (misma
+    ambulancia y fechaHora, p. ej. un lote reintentado) se ignoran.
+    Retorna la cantidad de puntos enviados a la base de datos.
+    """
+    if not puntos:
+        return 0
+    asegurar_particiones(_utc(p.fechaHora).date() for p in puntos)
+
+    filas = [
+        {
+            "ambulancia_id": p.id_ambulancia,
+            "fechaHora": _utc(p.fechaHora),
+            "latitud": p.latitud,
+            "longitud": p.longitud,
+        }
+        for p in puntos
+    ]
+    insertar = insert_sqlite if es_sqlite else insert_postgresql
+    sesion: Session = SessionLocal()
+    try:
+        sesion.execute(insertar(HistorialUbicacionDB).on_conflict_do_nothing(), filas)
+        sesion.commit()
+        return len(filas)
+    except SQLAlchemyError as e:
+        sesion.rollback()
+        raise RuntimeError(f"Error al insertar historial de ubicaciones: {e}")
+    finally:
+        sesion.close()
+
+
+def obtener_trayectoria(id_ambulancia: int, desde: datetime, hasta: datetime) -> List[PuntoTrayectoriaBE]:
+    """
+    Obtiene los puntos de una ambulancia entre `desde` y `hasta` (inclusive),
+    ordenados por fecha. En PostgreSQL la consulta solo recorre las particiones del rango.
+    """
+    sesion: Session = SessionLocal()
+    try:
+        query = sesion.query(HistorialUbicacionDB).filter(
+            HistorialUbicacionDB.ambulancia_id == id_ambulancia,
+            HistorialUbicacionDB.fechaHora >= _utc(desde),
+            HistorialUbicacionDB.fechaHora <= _utc(hasta),
+        ).order_by(HistorialUbicacionDB.fechaHora.asc())
+        return [_mapear_db_a_be(row) for row in query.all()]
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al obtener trayectoria de la ambulancia: {e}")
+    finally:
+        sesion.close()
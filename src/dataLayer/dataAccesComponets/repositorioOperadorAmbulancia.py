@@ -13,6 +13,10 @@ from src.dataLayer.bd import SessionLocal
 from src.dataLayer.models.modeloOperadorAmbulancia import OperadorAmbulancia as OperadorDB
 from src.businessLayer.businessEntities.operadorAmbulancia import OperadorAmbulancia as OperadorBE
 from src.businessLayer.businessEntities.enums.tipoDocumento import TipoDocumento
+from src.businessLayer.businessComponents.cache.cacheEntidades import CacheEntidades
+
+# Cache de lectura por ID (se invalida al actualizar/eliminar)
+_cache_operadores = CacheEntidades("operadores_ambulancia", OperadorBE)
 
 
 # ========================= Helpers de mapeo =========================
@@ -71,7 +75,7 @@ def crear_operador(operador: OperadorBE) -> Optional[OperadorBE]:
         sesion.close()
 
 
-def obtener_operador_por_id(id_operador: int) -> Optional[OperadorBE]:
+def _cargar_operador_por_id(id_operador: int) -> Optional[OperadorBE]:
     sesion: Session = SessionLocal()
     try:
         db_obj = sesion.query(OperadorDB).get(id_operador)
@@ -82,6 +86,13 @@ def obtener_operador_por_id(id_operador: int) -> Optional[OperadorBE]:
         sesion.close()
 
 
+def obtener_operador_por_id(id_operador: int) -> Optional[OperadorBE]:
+    """
+    Obtiene un operador por su ID, pasando por el cache de entidades.
+    """
+    return _cache_operadores.obtener(id_operador, _cargar_operador_por_id)
+
+
 def obtener_operador_por_documento(tipo: TipoDocumento, numero: str) -> Optional[OperadorBE]:
     if not numero or not numero.strip():
         raise ValueError("El número de documento es requerido")
@@ -127,7 +138,9 @@ def actualizar_operador(id_operador: int, cambios: Dict[str, Any]) -> Optional[O
 
         sesion.commit()
         sesion.refresh(db_obj)
-        return _mapear_db_a_be(db_obj)
+        actualizado = _mapear_db_a_be(db_obj)
+        _cache_operadores.guardar(id_operador, actualizado)
+        return actualizado
     except IntegrityError:
         sesion.rollback()
         return None
@@ -146,6 +159,7 @@ def eliminar_operador(id_operador: int) -> bool:
             return False
         sesion.delete(db_obj)
         sesion.commit()
+        _cache_operadores.invalidar(id_operador)
         return True
     except SQLAlchemyError as e:
         sesion.rollback()
@@ -14,6 +14,10 @@ from src.dataLayer.bd import SessionLocal
 from src.dataLayer.models.modeloSolicitante import Solicitante as SolicitanteDB
 from src.businessLayer.businessEntities.solicitante import Solicitante as SolicitanteBE
 from src.businessLayer.businessEntities.enums.tipoDocumento import TipoDocumento
+from src.businessLayer.businessComponents.cache.cacheEntidades import CacheEntidades
+
+# Cache de lectura por ID (se invalida al actualizar/eliminar)
+_cache_solicitantes = CacheEntidades("solicitantes", SolicitanteBE)
 
 
 # ========================= Helpers de mapeo =========================
@@ -72,7 +76,7 @@ def crear_solicitante(solicitante: SolicitanteBE) -> Optional[SolicitanteBE]:
         sesion.close()
 
 
-def obtener_solicitante_por_id(id_solicitante: int) -> Optional[SolicitanteBE]:
+def _cargar_solicitante_por_id(id_solicitante: int) -> Optional[SolicitanteBE]:
     sesion: Session = SessionLocal()
     try:
         db_obj = sesion.query(SolicitanteDB).get(id_solicitante)
@@ -83,6 +87,13 @@ def obtener_solicitante_por_id(id_solicitante: int) -> Optional[SolicitanteBE]:
         sesion.close()
 
 
+def obtener_solicitante_por_id(id_solicitante: int) -> Optional[SolicitanteBE]:
+    """
+    Obtiene un solicitante por su ID, pasando por el cache de entidades.
+    """
+    return _cache_solicitantes.obtener(id_solicitante, _cargar_solicitante_por_id)
+
+
 def obtener_solicitante_por_documento(numero: str, tipo: Optional[TipoDocumento] = None) -> Optional[SolicitanteBE]:
     """
     Obtiene un solicitante por número de documento.
@@ -150,7 +161,9 @@ def actualizar_solicitante(id_solicitante: int, cambios: dict) -> Optional[Solic
 
         sesion.commit()
         sesion.refresh(db_obj)
-        return _mapear_db_a_be(db_obj)
+        actualizado = _mapear_db_a_be(db_obj)
+        _cache_solicitantes.guardar(id_solicitante, actualizado)
+        return actualizado
     except IntegrityError:
         sesion.rollback()
         return None
@@ -169,6 +182,7 @@ def eliminar_solicitante(id_solicitante: int) -> bool:
             return False
         sesion.delete(db_obj)
         sesion.commit()
+        _cache_solicitantes.invalidar(id_solicitante)
         return True
     except SQLAlchemyError as e:
         sesion.rollback()
@@ -8,9 +8,11 @@ la entidad Pydantic `Solicitud` de la capa de negocio.
 from typing import List, Optional
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 
 from src.dataLayer.bd import SessionLocal
 from src.dataLayer.models.modeloSolicitud import Solicitud as SolicitudDB
+from src.dataLayer.models.modeloUbicacion import Ubicacion as UbicacionDB
 from src.businessLayer.businessEntities.solicitud import Solicitud as SolicitudBE
 from src.dataLayer.dataAccesComponets.repositorioSolicitantes import obtener_solicitante_por_id
 from src.dataLayer.dataAccesComponets.repositorioUbicacion import obtener_ubicacion_por_id
@@ -86,6 +88,61 @@ def crear_solicitud(solicitud: SolicitudBE) -> Optional[SolicitudBE]:
         sesion.close()
 
 
+def crear_solicitud_con_ubicacion(solicitud: SolicitudBE) -> Optional[SolicitudBE]:
+    """
+    Crea la ubicación (si aún no tiene ID) y la solicitud en una sola transacción.
+
+    Usa INSERT ... RETURNING para obtener los IDs sin refrescar los objetos y arma
+    la entidad de respuesta con los datos recibidos, sin recargar el solicitante ni
+    la ubicación desde la BD.
+    Retorna None en caso de error de integridad (FK inválida); en ese caso no queda
+    persistida ninguna de las dos filas.
+    """
+    if not isinstance(solicitud, SolicitudBE):
+        raise ValueError("El parámetro debe ser una instancia de Solicitud")
+    if not solicitud.solicitante.id:
+        raise ValueError("El solicitante debe tener un ID para crear la solicitud")
+
+    ubicacion = solicitud.ubicacion
+    sesion: Session = SessionLocal()
+    try:
+        id_ubicacion = ubicacion.id
+        if not id_ubicacion:
+            id_ubicacion = sesion.execute(
+                insert(UbicacionDB)
+                .values(
+                    latitud=ubicacion.get_latitud(),
+                    longitud=ubicacion.get_longitud(),
+                    fechaHora=ubicacion.get_fecha_hora(),
+                )
+                .returning(UbicacionDB.id)
+            ).scalar_one()
+
+        id_solicitud = sesion.execute(
+            insert(SolicitudDB)
+            .values(
+                solicitante_id=solicitud.solicitante.id,
+                ubicacion_id=id_ubicacion,
+                fechaHora=solicitud.get_fecha_hora(),
+            )
+            .returning(SolicitudDB.id)
+        ).scalar_one()
+        sesion.commit()
+
+        return solicitud.model_copy(update={
+            "id": id_solicitud,
+            "ubicacion": ubicacion.model_copy(update={"id": id_ubicacion}),
+        })
+    except IntegrityError:
+        sesion.rollback()
+        return None
+    except SQLAlchemyError as e:
+        sesion.rollback()
+        raise RuntimeError(f"Error al crear solicitud con ubicacion: {e}")
+    finally:
+        sesion.close()
+
+
 def obtener_solicitud_por_id(id_solicitud: int) -> Optional[SolicitudBE]:
     """
     Obtiene una solicitud por su ID.
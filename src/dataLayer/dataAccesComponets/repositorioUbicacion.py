@@ -12,6 +12,10 @@ from sqlalchemy.orm import Session
 from src.dataLayer.bd import SessionLocal
 from src.dataLayer.models.modeloUbicacion import Ubicacion as UbicacionDB
 from src.businessLayer.businessEntities.ubicacion import Ubicacion as UbicacionBE
+from src.businessLayer.businessComponents.cache.cacheEntidades import CacheEntidades
+
+# Cache de lectura por ID (se invalida al actualizar/eliminar)
+_cache_ubicaciones = CacheEntidades("ubicaciones", UbicacionBE)
 
 
 # ========================= Helpers de mapeo =========================
@@ -64,10 +68,7 @@ def crear_ubicacion(ubicacion: UbicacionBE) -> Optional[UbicacionBE]:
         sesion.close()
 
 
-def obtener_ubicacion_por_id(id_ubicacion: int) -> Optional[UbicacionBE]:
-    """
-    Obtiene una ubicación por su ID.
-    """
+def _cargar_ubicacion_por_id(id_ubicacion: int) -> Optional[UbicacionBE]:
     sesion: Session = SessionLocal()
     try:
         db_obj = sesion.get(UbicacionDB, id_ubicacion)
@@ -78,6 +79,13 @@ def obtener_ubicacion_por_id(id_ubicacion: int) -> Optional[UbicacionBE]:
         sesion.close()
 
 
+def obtener_ubicacion_por_id(id_ubicacion: int) -> Optional[UbicacionBE]:
+    """
+    Obtiene una ubicación por su ID, pasando por el cache de entidades.
+    """
+    return _cache_ubicaciones.obtener(id_ubicacion, _cargar_ubicacion_por_id)
+
+
 def listar_ubicaciones(limit: int = 50, offset: int = 0) -> List[UbicacionBE]:
     """
     Lista ubicaciones con paginación.
@@ -112,7 +120,9 @@ def actualizar_ubicacion(id_ubicacion: int, cambios: dict) -> Optional[Ubicacion
 
         sesion.commit()
         sesion.refresh(db_obj)
-        return _mapear_db_a_be(db_obj)
+        actualizada = _mapear_db_a_be(db_obj)
+        _cache_ubicaciones.guardar(id_ubicacion, actualizada)
+        return actualizada
     except IntegrityError:
         sesion.rollback()
         return None
@@ -134,6 +144,7 @@ def eliminar_ubicacion(id_ubicacion: int) -> bool:
             return False
         sesion.delete(db_obj)
         sesion.commit()
+        _cache_ubicaciones.invalidar(id_ubicacion)
         return True
     except SQLAlchemyError as e:
         sesion.rollback()
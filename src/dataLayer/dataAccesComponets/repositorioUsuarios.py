@@ -4,6 +4,8 @@ Proporciona funciones para crear, actualizar y gestionar usuarios en el sistema.
 """
 
 from typing import Optional, List, Dict, Any
+from sqlalchemy import or_
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from src.security.entities.Usuario import Usuario, TipoUsuario
 from src.security.components.servicioHash import hasearContrasena, evaluarContrasena
@@ -131,6 +133,53 @@ def obtenerUsuario(nombreDeUsuario: str = None, email: str = None) -> Optional[U
         sesion.close()
 
 
+def obtener_credenciales_login(identificador: str) -> Optional[Row]:
+    """
+    Busca las credenciales de un usuario por email o nombre de usuario en una sola consulta.
+    
+    Solo proyecta las columnas que necesita el inicio de sesión y no construye la
+    entidad Usuario (sin validación de email ni carga ORM completa). Ambas columnas
+    tienen índice único, por lo que la consulta resuelve con dos búsquedas por índice.
+    
+    Args:
+        identificador (str): Email o nombre de usuario
+        
+    Returns:
+        Optional[Row]: Fila con id, nombreDeUsuario, email, contrasenaHasheada, id_persona
+            y tipoUsuario (texto), o None si no existe. Si el identificador coincide con el
+            email de un usuario y el nombre de usuario de otro, gana el email.
+        
+    Raises:
+        ValueError: Si no se proporciona el identificador
+        RuntimeError: Si hay un error en la conexión con la base de datos
+    """
+    if not identificador or not isinstance(identificador, str):
+        raise ValueError("Debe proporcionar email o nombreDeUsuario para la búsqueda")
+
+    sesion = SessionLocal()
+    try:
+        filas = (
+            sesion.query(
+                UsuarioDB.id,
+                UsuarioDB.nombreDeUsuario,
+                UsuarioDB.email,
+                UsuarioDB.contrasenaHasheada,
+                UsuarioDB.id_persona,
+                UsuarioDB.tipoUsuario,
+            )
+            .filter(or_(UsuarioDB.email == identificador, UsuarioDB.nombreDeUsuario == identificador))
+            .limit(2)
+            .all()
+        )
+        if not filas:
+            return None
+        return next((fila for fila in filas if fila.email == identificador), filas[0])
+    except SQLAlchemyError as e:
+        raise RuntimeError(f"Error al buscar credenciales de usuario: {e}")
+    finally:
+        sesion.close()
+
+
 def obtener_usuario_por_id(id_usuario: int) -> Optional[Usuario]:
     """
     Obtiene un usuario por su ID.
@@ -0,0 +1,63 @@
+"""
+Script de migración que verifica los índices únicos de login en la tabla usuarios.
+El inicio de sesión busca por email o nombreDeUsuario en una sola consulta; sin índice
+único en ambas columnas esa consulta recorre la tabla completa.
+Crea los índices que falten (bases creadas con versiones anteriores del esquema).
+"""
+
+from sqlalchemy import text, inspect
+from src.dataLayer.bd import engine, DATABASE_URL
+
+# Columna -> nombre del índice a crear si la columna no tiene uno único
+INDICES_LOGIN = {
+    "email": "uq_usuarios_email",
+    "nombreDeUsuario": "uq_usuarios_nombre_usuario",
+}
+
+
+def _columnas_con_indice_unico(inspector) -> set:
+    columnas = set()
+    for indice in inspector.get_indexes("usuarios"):
+        if indice.get("unique") and len(indice["column_names"]) == 1:
+            columnas.add(indice["column_names"][0])
+    for restriccion in inspector.get_unique_constraints("usuarios"):
+        if len(restriccion["column_names"]) == 1:
+            columnas.add(restriccion["column_names"][0])
+    return columnas
+
+
+def verificar_indices_usuario():
+    """
+    Verifica que email y nombreDeUsuario tengan índice único y crea los que falten.
+    Compatible con PostgreSQL y SQLite.
+    """
+    es_sqlite = "sqlite" in DATABASE_URL.lower()
+
+    try:
+        inspector = inspect(engine)
+        if "usuarios" not in inspector.get_table_names():
+            return
+
+        faltantes = [
+            columna for columna in INDICES_LOGIN
+            if columna not in _columnas_con_indice_unico(inspector)
+        ]
+        if not faltantes:
+            return
+
+        with engine.begin() as connection:  # begin() maneja commit/rollback automáticamente
+            for columna in faltantes:
+                # PostgreSQL requiere comillas dobles para nombres con mayúsculas
+                columna_sql = columna if es_sqlite else f'"{columna}"'
+                connection.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {INDICES_LOGIN[columna]} ON usuarios ({columna_sql})"
+                ))
+                print(f"Índice único creado en usuarios.{columna}")
+
+    except Exception as e:
+        print(f"Error al verificar índices de usuarios: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    verificar_indices_usuario()
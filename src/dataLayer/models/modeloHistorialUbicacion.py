@@ -0,0 +1,40 @@
+"""
+Modelo de base de datos para la tabla de historial de ubicaciones de ambulancias.
+
+Define la estructura de la tabla 'historial_ubicaciones' utilizando SQLAlchemy ORM.
+Es una tabla de solo inserción y compacta (sin id sustituto ni timestamps de auditoría):
+la clave primaria es (ambulancia_id, fechaHora). En PostgreSQL se crea particionada por
+rango de fechaHora, con una partición por día (ver repositorioHistorialUbicaciones).
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    DateTime,
+)
+
+from src.dataLayer.models.modeloUsuario import Base
+
+
+class HistorialUbicacion(Base):
+    """
+    Modelo SQLAlchemy que representa la tabla 'historial_ubicaciones'.
+
+    Campos:
+    - ambulancia_id: ID de la ambulancia (PK)
+    - fechaHora: Fecha y hora del punto (PK, clave de partición)
+    - latitud: Latitud GPS (-90 a 90)
+    - longitud: Longitud GPS (-180 a 180)
+    """
+
+    __tablename__ = "historial_ubicaciones"
+    __table_args__ = {"postgresql_partition_by": 'RANGE ("fechaHora")'}
+
+    ambulancia_id = Column(Integer, primary_key=True)
+    fechaHora = Column(DateTime(timezone=True), primary_key=True)
+    latitud = Column(Float, nullable=False)
+    longitud = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<HistorialUbicacion(ambulancia_id={self.ambulancia_id}, fechaHora={self.fechaHora})>"
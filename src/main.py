@@ -1,4 +1,7 @@
+import asyncio
+import logging
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from src.dataLayer.bd import inicializar_base_datos, engine
@@ -15,13 +18,34 @@ from src.api.ubicaciones import ubicaciones_router
 from src.api.solicitudes import solicitudes_router
 from src.api.salas import salas_router
 from src.businessLayer.businessComponents.llamadas.configLiveKit import ensure_livekit_healthcheck
+from src.businessLayer.businessComponents.llamadas.poolSalas import get_pool_salas
+from src.businessLayer.businessComponents.llamadas.estadoSalas import get_cache_estado_salas
+from src.businessLayer.businessComponents.llamadas.resilienciaLiveKit import get_circuito_livekit
 from src.businessLayer.businessComponents.cache.configRedis import ensure_redis_healthcheck, close_redis_client
+from src.businessLayer.businessComponents.cache.cacheEntidades import obtener_estadisticas_caches
+from src.businessLayer.businessComponents.cache.estadoFlota import get_estado_flota
+from src.businessLayer.businessComponents.cache.historialUbicaciones import get_historial_ubicaciones
+from src.businessLayer.businessComponents.rutas.motorEta import get_motor_eta
+from src.businessLayer.businessComponents.notificaciones.notificadorAmbulancia import get_manager_ambulancias
+from src.security.components.servicioHash import estadisticas_hash, cerrar_pool_hash
+from src.security.components.cacheTokens import get_cache_tokens
+from src.businessLayer.businessComponents.telemetria.latencias import get_registro_latencias
+from src.businessLayer.businessComponents.telemetria.configLogging import configurar_logging, detener_logging
+from src.businessLayer.businessComponents.notificaciones.coordinadorTareas import get_coordinador_tareas
+from src.businessLayer.businessComponents.eventos.busEventos import get_bus_eventos
+from src.businessLayer.businessComponents.eventos.suscriptoresEmergencia import registrar_suscriptores
 from src.api.atenderEmergencias import atender_emergencias_router
 from src.api.ambulancias import ambulancias_router
 from src.api.recibirNotificaciones import recibir_notificaciones_router
 from src.api.websocketAmbulancias import websocket_ambulancias_router
 from src.api.infoWebSocketAmbulancias import info_websocket_ambulancias_router
 from src.api.despacharAmbulancia import despachar_ambulancia_router
+from src.api.tareas import tareas_router
+
+# Los registros se escriben desde un hilo aparte (QueueHandler), fuera del event loop
+configurar_logging()
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -34,23 +58,59 @@ async def lifespan(app: FastAPI):
     try:
         inicializar_base_datos()
     except Exception as e:
-        print(f"Error al inicializar la base de datos: {e}")
+        logger.error("Error al inicializar la base de datos: %s", e)
         raise
     
     await ensure_livekit_healthcheck()
+
+    # Pre-crear salas de emergencia para no pagar create_room al recibir solicitudes
+    await get_pool_salas().iniciar()
+
+    # Mantener en memoria el estado de las salas para el listado de salas activas
+    await get_cache_estado_salas().iniciar()
     
     # Validar Redis
     try:
         ensure_redis_healthcheck()
     except Exception as e:
-        print(f"Advertencia: Redis no está disponible: {e}")
-        print("El sistema continuará pero las ubicaciones de ambulancias no funcionarán correctamente.")
+        logger.warning("Redis no está disponible: %s", e)
+        logger.warning("El sistema continuará pero las ubicaciones de ambulancias no funcionarán correctamente.")
+
+    # Volcar por lotes a la base de datos la disponibilidad de las ambulancias (vive en Redis)
+    # y conciliar las conectadas con los sockets de este worker
+    await get_estado_flota().iniciar(conectadas_locales=get_manager_ambulancias().list_connected_ids)
+
+    # Volcar por lotes a la base de datos el historial de ubicaciones (Redis Streams)
+    await get_historial_ubicaciones().iniciar()
+
+    # Cargar el grafo vial (si está configurado) antes de la primera búsqueda de ambulancias
+    await asyncio.to_thread(get_motor_eta)
+
+    # Repartir las tareas periódicas de envío entre los workers (leases)
+    await get_coordinador_tareas().iniciar()
+
+    # Compartir con los demás workers las revocaciones de tokens (logout, cambios de rol)
+    await get_cache_tokens().iniciar()
+
+    # Trabajo derivado de los cambios de estado de las emergencias
+    registrar_suscriptores()
+    await get_bus_eventos().iniciar()
     
     yield
     
-    # Shutdown: cerrar conexiones
+    # Shutdown: entregar los eventos pendientes, liberar las tareas de envío, volcar la
+    # disponibilidad de la flota y el historial de ubicaciones, eliminar salas sin usar y cerrar conexiones
+    await get_bus_eventos().detener()
+    await get_coordinador_tareas().detener()
+    await get_cache_tokens().detener()
+    await get_estado_flota().detener()
+    await get_historial_ubicaciones().detener()
+    await get_cache_estado_salas().detener()
+    await get_pool_salas().detener()
     engine.dispose()
     close_redis_client()
+    cerrar_pool_hash()
+    detener_logging()
 
 
 app = FastAPI(
@@ -93,6 +153,7 @@ app.include_router(info_websocket_ambulancias_router)
 app.include_router(websocket_router)
 app.include_router(websocket_solicitantes_router)
 app.include_router(websocket_ambulancias_router)
+app.include_router(tareas_router)
 # app.include_router(ubicaciones_router)
 
 @app.get("/")
@@ -109,5 +170,26 @@ def health_check():
     """Endpoint de health check para verificar el estado de la aplicación."""
     return {
         "status": "healthy",
-        "database": "connected"
-    }
\ No newline at end of file
+        "database": "connected",
+        "cache_entidades": obtener_estadisticas_caches(),
+        "pool_salas": get_pool_salas().estadisticas(),
+        "estado_salas": get_cache_estado_salas().estadisticas(),
+        "livekit": get_circuito_livekit().estadisticas(),
+        "hash_contrasenas": estadisticas_hash(),
+        "cache_tokens": get_cache_tokens().estadisticas(),
+        "latencias": get_registro_latencias().resumen(),
+        "coordinador_tareas": get_coordinador_tareas().estadisticas(),
+        "eventos_emergencia": get_bus_eventos().estadisticas(),
+        "estado_flota": get_estado_flota().estadisticas(),
+        "historial_ubicaciones": get_historial_ubicaciones().estadisticas(),
+        "motor_eta": get_motor_eta().estadisticas()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Latencias por etapa del flujo de emergencias en formato de texto de Prometheus."""
+    return PlainTextResponse(
+        get_registro_latencias().exportar_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
\ No newline at end of file
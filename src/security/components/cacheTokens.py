@@ -0,0 +1,334 @@
+"""
+Cache de tokens JWT ya verificados.
+
+Un operador presenta el mismo token (24 h) en cada petición, y verificarlo implica
+decodificar, validar la firma HMAC y parsear los claims. Este cache guarda el payload
+verificado indexado por el digest SHA-256 del token hasta su `exp`, con desalojo LRU,
+de modo que las verificaciones siguientes se reducen a una búsqueda en un diccionario.
+
+También lleva la revocación, compartida por todos los workers a través de Redis:
+- `revocar(token)`: el token deja de ser válido (logout) hasta su expiración.
+- `revocar_usuario(id_usuario)`: invalida los tokens emitidos al usuario antes de ese
+  momento (cambio de rol, eliminación); debe iniciar sesión de nuevo.
+
+Las revocaciones se aplican de inmediato en el worker que las hace, y se publican en el
+sorted set `tokens:revocaciones` (puntaje: instante de la revocación). Una tarea en
+segundo plano (`iniciar`) publica las locales pendientes y trae las de los demás workers
+cada JWT_REVOCACION_INTERVALO_SEGUNDOS, en un hilo: las consultas del cache nunca tocan
+Redis. Si Redis falla, la sincronización espera JWT_REVOCACION_ESPERA_ERROR_SEGUNDOS y
+mientras tanto solo se aplican las revocaciones hechas en este proceso.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import redis
+from dotenv import load_dotenv
+from src.businessLayer.businessComponents.cache.configRedis import get_redis_client
+from src.businessLayer.businessComponents.telemetria.configLogging import log_muestreado
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Máximo de tokens verificados en memoria
+JWT_CACHE_MAX: int = int(os.getenv("JWT_CACHE_MAX", "10000"))
+# Cada cuánto se sincronizan las revocaciones con los demás workers (vía Redis)
+JWT_REVOCACION_INTERVALO_SEGUNDOS: float = float(os.getenv("JWT_REVOCACION_INTERVALO_SEGUNDOS", "5"))
+# Espera antes de reintentar la sincronización tras un error de Redis
+JWT_REVOCACION_ESPERA_ERROR_SEGUNDOS: float = float(os.getenv("JWT_REVOCACION_ESPERA_ERROR_SEGUNDOS", "60"))
+# Vida máxima de un token: las revocaciones más viejas ya no hacen falta
+JWT_REVOCACION_RETENCION: int = int(os.getenv("JWT_EXPIRE_MINUTES", "1440")) * 60
+# Margen al traer revocaciones, por diferencias de reloj entre workers
+MARGEN_RELOJ_SEGUNDOS = 60.0
+
+CLAVE_REVOCACIONES = "tokens:revocaciones"
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class CacheTokens:
+    """
+    Cache LRU de payloads JWT verificados, vigentes hasta su `exp`.
+    Es seguro entre hilos (los endpoints síncronos de FastAPI corren en un threadpool).
+    """
+
+    def __init__(
+        self,
+        max_entradas: int = JWT_CACHE_MAX,
+        intervalo_revocacion: float = JWT_REVOCACION_INTERVALO_SEGUNDOS,
+        espera_error: float = JWT_REVOCACION_ESPERA_ERROR_SEGUNDOS,
+    ):
+        """
+        Args:
+            max_entradas: Número máximo de tokens en memoria antes de desalojar (LRU)
+            intervalo_revocacion: Segundos entre sincronizaciones de las revocaciones
+            espera_error: Segundos sin sincronizar tras un error de Redis
+        """
+        self.max_entradas = max(1, max_entradas)
+        self.intervalo_revocacion = intervalo_revocacion
+        self.espera_error = max(espera_error, intervalo_revocacion)
+        # digest -> (payload, exp)
+        self._entradas: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        # digest -> exp de los tokens revocados
+        self._revocados: Dict[bytes, float] = {}
+        # id_usuario -> epoch desde el cual sus tokens anteriores no son válidos
+        self._revocado_desde: Dict[int, float] = {}
+        # Revocaciones locales aún no publicadas en Redis: (miembro, instante)
+        self._pendientes: List[Tuple[str, float]] = []
+        # Puntaje más alto ya traído de Redis
+        self._ultima_sincronizacion = time.time() - JWT_REVOCACION_RETENCION
+        self._lock = threading.Lock()
+        self._tarea: Optional[asyncio.Task] = None
+        # Métricas
+        self.aciertos = 0
+        self.fallos = 0
+        self.rechazos = 0
+        self.sincronizaciones = 0
+        self.errores_redis = 0
+
+    def obtener(self, token: str) -> Optional[dict]:
+        """
+        Retorna el payload verificado del token si está en cache y no ha expirado.
+
+        Args:
+            token: Token JWT tal como lo presenta el cliente
+
+        Returns:
+            Copia del payload, o None si no está en cache (hay que verificarlo)
+        """
+        clave = _digest(token)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            payload, exp = entrada
+            if time.time() >= exp:
+                del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return dict(payload)
+
+    def guardar(self, token: str, payload: dict) -> None:
+        """
+        Guarda el payload de un token recién verificado (sin `exp` no se cachea).
+
+        Args:
+            token: Token JWT verificado
+            payload: Payload decodificado
+        """
+        exp = payload.get("exp")
+        if exp is None:
+            return
+        clave = _digest(token)
+        with self._lock:
+            self._entradas[clave] = (dict(payload), float(exp))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def esta_revocado(self, token: str, payload: dict) -> bool:
+        """
+        Indica si el token fue revocado (logout) o emitido antes de una revocación del usuario.
+
+        Args:
+            token: Token JWT
+            payload: Payload ya verificado del token
+
+        Returns:
+            True si el token no debe aceptarse
+        """
+        with self._lock:
+            revocado = _digest(token) in self._revocados
+            if not revocado:
+                desde = self._revocado_desde.get(payload.get("id"))
+                # iat se codifica en segundos enteros
+                revocado = desde is not None and payload.get("iat", 0) < int(desde)
+            if revocado:
+                self.rechazos += 1
+            return revocado
+
+    def revocar(self, token: str, exp: Optional[float] = None) -> None:
+        """
+        Revoca un token (por ejemplo, al cerrar sesión) y lo quita del cache.
+        Los demás workers lo aplican en la siguiente sincronización.
+
+        Args:
+            token: Token JWT a revocar
+            exp: Expiración del token; la revocación se descarta al alcanzarla
+        """
+        clave = _digest(token)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if exp is None:
+                exp = entrada[1] if entrada is not None else time.time()
+            self._aplicar_token(clave, float(exp))
+            self._pendientes.append((f"t:{clave.hex()}:{float(exp)}", time.time()))
+
+    def revocar_usuario(self, id_usuario: int) -> None:
+        """
+        Invalida todos los tokens emitidos al usuario hasta ahora y los quita del cache.
+        Los demás workers lo aplican en la siguiente sincronización.
+
+        Args:
+            id_usuario: ID del usuario (claim `id` del token)
+        """
+        desde = time.time()
+        with self._lock:
+            self._aplicar_usuario(id_usuario, desde)
+            self._pendientes.append((f"u:{id_usuario}:{desde}", desde))
+
+    # ========================= Aplicación local (con el lock tomado) =========================
+
+    def _aplicar_token(self, clave: bytes, exp: float) -> None:
+        self._entradas.pop(clave, None)
+        self._revocados[clave] = exp
+        self._purgar_revocados()
+
+    def _aplicar_usuario(self, id_usuario: int, desde: float) -> None:
+        self._revocado_desde[id_usuario] = max(desde, self._revocado_desde.get(id_usuario, 0.0))
+        for clave in [c for c, (payload, _) in self._entradas.items() if payload.get("id") == id_usuario]:
+            del self._entradas[clave]
+
+    def _aplicar_miembro(self, miembro: str) -> None:
+        tipo, _, resto = miembro.partition(":")
+        identificador, _, valor = resto.rpartition(":")
+        try:
+            if tipo == "t":
+                self._aplicar_token(bytes.fromhex(identificador), float(valor))
+            elif tipo == "u":
+                self._aplicar_usuario(int(identificador), float(valor))
+        except ValueError:
+            logger.warning("Revocación de token con formato inválido: %s", miembro)
+
+    def _purgar_revocados(self) -> None:
+        ahora = time.time()
+        for clave in [c for c, exp in self._revocados.items() if exp <= ahora]:
+            del self._revocados[clave]
+        limite = ahora - JWT_REVOCACION_RETENCION
+        for id_usuario in [u for u, desde in self._revocado_desde.items() if desde <= limite]:
+            del self._revocado_desde[id_usuario]
+
+    # ========================= Sincronización con Redis =========================
+
+    def sincronizar(self) -> int:
+        """
+        Publica en Redis las revocaciones locales pendientes y aplica las de los demás
+        workers. Es bloqueante: desde el event loop se ejecuta en un hilo.
+
+        Returns:
+            Cantidad de revocaciones traídas de Redis
+
+        Raises:
+            redis.RedisError: Si Redis no está disponible (las pendientes se conservan)
+        """
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, []
+        try:
+            cliente = get_redis_client()
+            with cliente.pipeline(transaction=False) as pipe:
+                if pendientes:
+                    pipe.zadd(CLAVE_REVOCACIONES, dict(pendientes))
+                    pipe.zremrangebyscore(CLAVE_REVOCACIONES, "-inf", time.time() - JWT_REVOCACION_RETENCION)
+                pipe.zrangebyscore(
+                    CLAVE_REVOCACIONES, self._ultima_sincronizacion - MARGEN_RELOJ_SEGUNDOS, "+inf", withscores=True
+                )
+                traidas = pipe.execute()[-1]
+        except Exception:
+            with self._lock:
+                self._pendientes[:0] = pendientes
+            raise
+
+        with self._lock:
+            for miembro, puntaje in traidas:
+                self._aplicar_miembro(miembro)
+                self._ultima_sincronizacion = max(self._ultima_sincronizacion, puntaje)
+            self._purgar_revocados()
+        self.sincronizaciones += 1
+        return len(traidas)
+
+    async def _sincronizar_periodicamente(self) -> None:
+        while True:
+            espera = self.intervalo_revocacion
+            try:
+                await asyncio.to_thread(self.sincronizar)
+            except (redis.RedisError, ValueError) as e:
+                self.errores_redis += 1
+                espera = self.espera_error
+                log_muestreado(
+                    logger, logging.WARNING, "revocacion_tokens",
+                    "Redis no disponible para sincronizar la revocación de tokens "
+                    "(solo se aplican las locales; reintento en %.0fs): %s", espera, e
+                )
+            await asyncio.sleep(espera)
+
+    async def iniciar(self) -> None:
+        """Arranca la sincronización periódica de las revocaciones."""
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.create_task(self._sincronizar_periodicamente())
+
+    async def detener(self) -> None:
+        """Detiene la sincronización y publica las revocaciones locales pendientes."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        if self._pendientes:
+            try:
+                await asyncio.to_thread(self.sincronizar)
+            except (redis.RedisError, ValueError) as e:
+                logger.warning("No se pudieron publicar %d revocaciones de tokens: %s", len(self._pendientes), e)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna las métricas del cache.
+
+        Returns:
+            Diccionario con entradas, aciertos, fallos, tasa de aciertos y revocaciones
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+                "tokens_revocados": len(self._revocados),
+                "usuarios_revocados": len(self._revocado_desde),
+                "rechazos": self.rechazos,
+                "revocaciones_pendientes": len(self._pendientes),
+                "sincronizaciones": self.sincronizaciones,
+                "errores_redis": self.errores_redis,
+            }
+
+
+# Instancia global del cache (singleton pattern)
+_cache_tokens: Optional[CacheTokens] = None
+
+
+def get_cache_tokens() -> CacheTokens:
+    """
+    Obtiene la instancia global del cache de tokens verificados.
+
+    Returns:
+        Instancia de CacheTokens
+    """
+    global _cache_tokens
+    if _cache_tokens is None:
+        _cache_tokens = CacheTokens()
+    return _cache_tokens
@@ -3,16 +3,18 @@ Módulo de servicios de autenticación con JWT.
 
 Este módulo proporciona funciones para:
 1. Generar tokens JWT
-2. Verificar tokens JWT
+2. Verificar tokens JWT (con cache de tokens ya verificados)
 3. Autenticar usuarios con credenciales
+4. Revocar tokens (logout, cambios de rol)
 """
 
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 import jwt
-from src.dataLayer.dataAccesComponets.repositorioUsuarios import obtenerUsuario
-from src.security.components.servicioHash import evaluarContrasena
+from src.dataLayer.dataAccesComponets.repositorioUsuarios import obtener_credenciales_login
+from src.security.components.servicioHash import evaluarContrasenaAsync
+from src.security.components.cacheTokens import get_cache_tokens
 
 # Configuración de JWT
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "tu-clave-secreta-super-segura-cambiar-en-produccion")
@@ -37,6 +39,7 @@ def generar_token(usuario_data: Dict) -> str:
     payload = {
         "sub": usuario_data.get("email") or usuario_data.get("nombreDeUsuario"),  # Subject (identificador)
         "id": usuario_data.get("id"),
+        "id_persona": usuario_data.get("id_persona"),  # Persona asociada (solicitante, operador, etc.)
         "nombreDeUsuario": usuario_data.get("nombreDeUsuario"),
         "email": usuario_data.get("email"),
         "tipoUsuario": usuario_data.get("tipoUsuario"),  # Tipo de usuario (SOLICITANTE, OPERADOR_AMBULANCIA, OPERADOR_EMERGENCIA, ADMINISTRADOR)
@@ -52,29 +55,61 @@ def generar_token(usuario_data: Dict) -> str:
 def verificar_token(token: str) -> Optional[Dict]:
     """
     Verifica y decodifica un token JWT.
+    Los tokens ya verificados se sirven desde el cache hasta su expiración.
     
     Args:
         token (str): Token JWT a verificar
         
     Returns:
-        Optional[Dict]: Payload del token si es válido, None si es inválido o expirado
-        
-    Raises:
-        jwt.ExpiredSignatureError: Si el token ha expirado
-        jwt.InvalidTokenError: Si el token es inválido
+        Optional[Dict]: Payload del token si es válido, None si es inválido, expirado o revocado
     """
+    cache = get_cache_tokens()
+    payload = cache.obtener(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return None  # Token expirado
     except jwt.InvalidTokenError:
         return None  # Token inválido
 
+    if cache.esta_revocado(token, payload):
+        return None  # Token revocado
+    cache.guardar(token, payload)
+    return payload
+
+
+def revocar_token(token: str) -> None:
+    """
+    Revoca un token (logout): deja de ser aceptado hasta su expiración.
+    
+    Args:
+        token (str): Token JWT a revocar
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return  # Un token inválido o expirado ya no es aceptado
+    get_cache_tokens().revocar(token, payload.get("exp"))
+
+
+def revocar_tokens_usuario(id_usuario: int) -> None:
+    """
+    Revoca todos los tokens emitidos a un usuario hasta ahora
+    (por ejemplo, al cambiar su rol o eliminarlo).
+    
+    Args:
+        id_usuario (int): ID del usuario
+    """
+    get_cache_tokens().revocar_usuario(id_usuario)
+
 
-def autenticar_usuario(identificador: str, contrasena: str) -> Optional[Dict]:
+async def autenticar_usuario(identificador: str, contrasena: str) -> Optional[Dict]:
     """
     Autentica un usuario con su email/nombreDeUsuario y contraseña.
+    La verificación bcrypt se ejecuta en el pool de hash, fuera del event loop.
     
     Args:
         identificador (str): Email o nombre de usuario
@@ -84,22 +119,23 @@ def autenticar_usuario(identificador: str, contrasena: str) -> Optional[Dict]:
         Optional[Dict]: Diccionario con datos del usuario si la autenticación es exitosa,
             None si las credenciales son incorrectas
     """
-    # Intentar buscar por email primero, luego por nombreDeUsuario
-    usuario = obtenerUsuario(email=identificador) or obtenerUsuario(nombreDeUsuario=identificador)
+    # Buscar por email o nombreDeUsuario en una sola consulta
+    usuario = obtener_credenciales_login(identificador)
     
     # Si no se encontró el usuario, retornar None
     if not usuario:
         return None
     
     # Verificar la contraseña
-    if not evaluarContrasena(contrasena, usuario.contrasenaHasheada):
+    if not await evaluarContrasenaAsync(contrasena, usuario.contrasenaHasheada):
         return None
     
     # Retornar datos del usuario (sin la contraseña)
     return {
         "id": usuario.id,
+        "id_persona": usuario.id_persona,
         "nombreDeUsuario": usuario.nombreDeUsuario,
         "email": usuario.email,
-        "tipoUsuario": usuario.tipoUsuario.value if usuario.tipoUsuario else None,
+        "tipoUsuario": usuario.tipoUsuario or None,
     }
 
@@ -9,56 +9,179 @@ Utiliza bcrypt como algoritmo de hash, que:
 - Incorpora automáticamente un salt único por contraseña
 - Implementa un factor de trabajo adaptativo
 - Es resistente a ataques por hardware especializado
+
+Cada hash o verificación consume del orden de cientos de milisegundos de CPU, por lo
+que se ejecutan en un pool de hilos dedicado y acotado (bcrypt libera el GIL). Así un
+pico de inicios de sesión se encola en el pool en lugar de bloquear el event loop y
+los WebSockets que atiende. Los handlers async deben usar las variantes `*Async`.
 """
 
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
 import bcrypt
 
-# Generamos un salt global para el proceso de hashing
-# Nota: bcrypt.gensalt() genera un salt criptográficamente seguro
+# Factor de trabajo de bcrypt (2^rounds iteraciones). Los hashes existentes conservan
+# el suyo, por lo que cambiarlo solo afecta a los hashes nuevos.
+BCRYPT_ROUNDS: int = min(31, max(4, int(os.getenv("BCRYPT_ROUNDS", "12"))))
+# Hilos dedicados a bcrypt; por defecto, uno por CPU
+BCRYPT_HILOS: int = max(1, int(os.getenv("BCRYPT_HILOS", str(os.cpu_count() or 2))))
+
+
+class _PoolHash:
+    """Pool de hilos de bcrypt con métricas de cola."""
+
+    def __init__(self, hilos: int):
+        self.hilos = hilos
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Métricas
+        self.pendientes = 0
+        self.en_ejecucion = 0
+        self.max_pendientes = 0
+        self.completadas = 0
+        self.espera_total = 0.0
+
+    def enviar(self, funcion: Callable, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="bcrypt")
+            self.pendientes += 1
+            self.max_pendientes = max(self.max_pendientes, self.pendientes)
+            executor = self._executor
+        return executor.submit(self._ejecutar, time.monotonic(), funcion, *args)
+
+    def _ejecutar(self, encolado_en: float, funcion: Callable, *args):
+        with self._lock:
+            self.en_ejecucion += 1
+            self.espera_total += time.monotonic() - encolado_en
+        try:
+            return funcion(*args)
+        finally:
+            with self._lock:
+                self.en_ejecucion -= 1
+                self.pendientes -= 1
+                self.completadas += 1
+
+    def cerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": BCRYPT_ROUNDS,
+                "hilos": self.hilos,
+                "en_cola": self.pendientes - self.en_ejecucion,
+                "en_ejecucion": self.en_ejecucion,
+                "max_pendientes": self.max_pendientes,
+                "completadas": self.completadas,
+                "espera_media_ms": (
+                    round(self.espera_total / self.completadas * 1000, 2) if self.completadas else 0.0
+                ),
+            }
+
+
+_pool_hash = _PoolHash(BCRYPT_HILOS)
+
+
+def _hashear(contrasena: str) -> str:
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    hashed_password = bcrypt.hashpw(contrasena.encode('utf-8'), salt) # Hash de la contraseña
+    return hashed_password.decode('utf-8') # Devolvemos el hash como una cadena de texto
+
+
+def _verificar(contrasena: str, hash: str) -> bool:
+    return bcrypt.checkpw(contrasena.encode('utf-8'), hash.encode('utf-8'))
+
+
+def _validar_contrasena(contrasena: str) -> None:
+    if not isinstance(contrasena, str):
+        raise TypeError("La contraseña debe ser una cadena")
+    if not contrasena:
+        raise ValueError("La contraseña no puede estar vacía")
+
+
+def _validar_contrasena_y_hash(contrasena: str, hash: str) -> None:
+    if not isinstance(contrasena, str) or not isinstance(hash, str):
+        raise TypeError("La contraseña y el hash deben ser cadenas")
+    if not contrasena or not hash:
+        raise ValueError("La contraseña y el hash no pueden estar vacíos")
 
 
 def hasearContrasena(contrasena: str) -> str:
     """
     Genera un hash seguro para una contraseña usando bcrypt.
-    
+    Bloquea el hilo que llama hasta que el pool de bcrypt lo resuelve; desde código
+    async usar `hasearContrasenaAsync`.
+
     Args:
         contrasena (str): La contraseña en texto plano a hashear
-        
+
     Returns:
         str: El hash de la contraseña (60 caracteres)
-        
+
     Raises:
         TypeError: Si la contraseña no es una cadena
         ValueError: Si la contraseña está vacía
     """
-    if not isinstance(contrasena, str):
-        raise TypeError("La contraseña debe ser una cadena")
-    if not contrasena:
-        raise ValueError("La contraseña no puede estar vacía")
+    _validar_contrasena(contrasena)
+    return _pool_hash.enviar(_hashear, contrasena).result()
 
-    salt = bcrypt.gensalt()
 
-    hashed_password = bcrypt.hashpw(contrasena.encode('utf-8'), salt) # Hash de la contraseña
-    return hashed_password.decode('utf-8') # Devolvemos el hash como una cadena de texto
+async def hasearContrasenaAsync(contrasena: str) -> str:
+    """
+    Variante async de `hasearContrasena`: espera el hash sin bloquear el event loop.
+    """
+    _validar_contrasena(contrasena)
+    return await asyncio.wrap_future(_pool_hash.enviar(_hashear, contrasena))
+
 
 def evaluarContrasena(contrasena: str, hash: str) -> bool:
     """
     Verifica si una contraseña coincide con su hash.
-    
+    Bloquea el hilo que llama hasta que el pool de bcrypt lo resuelve; desde código
+    async usar `evaluarContrasenaAsync`.
+
     Args:
         contrasena (str): La contraseña en texto plano a verificar
         hash (str): El hash contra el cual verificar la contraseña
-        
+
     Returns:
         bool: True si la contraseña coincide con el hash, False en caso contrario
-        
+
     Raises:
         TypeError: Si la contraseña o el hash no son cadenas
         ValueError: Si la contraseña o el hash están vacíos
     """
-    if not isinstance(contrasena, str) or not isinstance(hash, str):
-        raise TypeError("La contraseña y el hash deben ser cadenas")
-    if not contrasena or not hash:
-        raise ValueError("La contraseña y el hash no pueden estar vacíos")
-        
-    return bcrypt.checkpw(contrasena.encode('utf-8'), hash.encode('utf-8'))
+    _validar_contrasena_y_hash(contrasena, hash)
+    return _pool_hash.enviar(_verificar, contrasena, hash).result()
+
+
+async def evaluarContrasenaAsync(contrasena: str, hash: str) -> bool:
+    """
+    Variante async de `evaluarContrasena`: espera la verificación sin bloquear el event loop.
+    """
+    _validar_contrasena_y_hash(contrasena, hash)
+    return await asyncio.wrap_future(_pool_hash.enviar(_verificar, contrasena, hash))
+
+
+def estadisticas_hash() -> dict:
+    """
+    Retorna las métricas del pool de bcrypt.
+
+    Returns:
+        Diccionario con factor de trabajo, hilos, profundidad de la cola, tareas en
+        ejecución, máximo de pendientes observado y espera media en cola
+    """
+    return _pool_hash.estadisticas()
+
+
+def cerrar_pool_hash() -> None:
+    """Espera las tareas en curso y libera los hilos del pool de bcrypt."""
+    _pool_hash.cerrar()
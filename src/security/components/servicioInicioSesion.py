@@ -5,8 +5,8 @@ Proporciona funcionalidad para autenticar usuarios y generar tokens de acceso.
 
 from typing import Optional, Dict
 from fastapi import HTTPException, status
-from src.dataLayer.dataAccesComponets.repositorioUsuarios import obtenerUsuario
-from src.security.components.servicioHash import evaluarContrasena
+from src.dataLayer.dataAccesComponets.repositorioUsuarios import obtener_credenciales_login
+from src.security.components.servicioHash import evaluarContrasenaAsync
 from src.security.components.servicioAutenticacion import generar_token, verificar_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from pydantic import BaseModel, EmailStr, Field
 
@@ -61,11 +61,13 @@ async def login(datos_login: LoginData) -> TokenResponse:
         # Determinar el identificador (username o email)
         identificador = datos_login.username or datos_login.email
         
-        # Buscar usuario
-        usuario = obtenerUsuario(
-            nombreDeUsuario=datos_login.username if datos_login.username else None,
-            email=datos_login.email if datos_login.email else None
-        )
+        # Buscar usuario (email o nombreDeUsuario en una sola consulta)
+        usuario = obtener_credenciales_login(identificador)
+        # Si se enviaron ambos, deben corresponder al mismo usuario
+        if usuario and datos_login.username and datos_login.email and (
+            usuario.nombreDeUsuario != datos_login.username or usuario.email != datos_login.email
+        ):
+            usuario = None
         
         if not usuario:
             raise HTTPException(
@@ -75,7 +77,7 @@ async def login(datos_login: LoginData) -> TokenResponse:
             )
             
         # Verificar contraseña
-        if not evaluarContrasena(datos_login.password, usuario.contrasenaHasheada):
+        if not await evaluarContrasenaAsync(datos_login.password, usuario.contrasenaHasheada):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciales incorrectas",
@@ -85,9 +87,10 @@ async def login(datos_login: LoginData) -> TokenResponse:
         # Preparar datos del usuario para el token
         usuario_data = {
             "id": usuario.id,
+            "id_persona": usuario.id_persona,
             "nombreDeUsuario": usuario.nombreDeUsuario,
             "email": usuario.email,
-            "tipoUsuario": usuario.tipoUsuario.value if usuario.tipoUsuario else None
+            "tipoUsuario": usuario.tipoUsuario or None
         }
         
         # Generar token